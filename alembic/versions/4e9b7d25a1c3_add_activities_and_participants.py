@@ -0,0 +1,62 @@
+"""add activities and participants
+
+Revision ID: 4e9b7d25a1c3
+Revises: 8c4f2e71d0a6
+Create Date: 2026-10-19 16:42:05.318227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e9b7d25a1c3'
+down_revision: Union[str, Sequence[str], None] = '8c4f2e71d0a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('activities',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('activity_date', sa.Date(), nullable=False),
+    sa.Column('start_minute', sa.Integer(), nullable=False),
+    sa.Column('end_minute', sa.Integer(), nullable=False),
+    sa.Column('region_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['region_id'], ['regions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('activities', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_activities_activity_date'), ['activity_date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_activities_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_activities_name'), ['name'], unique=False)
+
+    op.create_table('activity_participants',
+    sa.Column('activity_id', sa.Integer(), nullable=False),
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['activity_id'], ['activities.id'], ),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.PrimaryKeyConstraint('activity_id', 'member_id'),
+    sqlite_with_rowid=False
+    )
+    with op.batch_alter_table('activity_participants', schema=None) as batch_op:
+        batch_op.create_index('ix_activity_participants_member_activity', ['member_id', 'activity_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('activity_participants', schema=None) as batch_op:
+        batch_op.drop_index('ix_activity_participants_member_activity')
+
+    op.drop_table('activity_participants')
+    with op.batch_alter_table('activities', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_activities_name'))
+        batch_op.drop_index(batch_op.f('ix_activities_id'))
+        batch_op.drop_index(batch_op.f('ix_activities_activity_date'))
+
+    op.drop_table('activities')
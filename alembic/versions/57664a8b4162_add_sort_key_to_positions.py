@@ -0,0 +1,44 @@
+"""add sort key to positions
+
+Revision ID: 57664a8b4162
+Revises: cf6523b55a83
+Create Date: 2026-10-19 12:41:07.264910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '57664a8b4162'
+down_revision: Union[str, Sequence[str], None] = 'cf6523b55a83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('positions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sort_key', sa.String(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_positions_sort_key'), ['sort_key'], unique=False)
+
+    # 由根節點往下計算現有職務的深度優先排序鍵
+    op.execute("""
+        WITH RECURSIVE tree(id, sort_key) AS (
+            SELECT id, printf('%06d.%08d/', rank, id)
+            FROM positions WHERE parent_id IS NULL
+            UNION ALL
+            SELECT p.id, tree.sort_key || printf('%06d.%08d/', p.rank, p.id)
+            FROM positions AS p JOIN tree ON p.parent_id = tree.id
+        )
+        UPDATE positions SET sort_key = (SELECT tree.sort_key FROM tree WHERE tree.id = positions.id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('positions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_positions_sort_key'))
+        batch_op.drop_column('sort_key')
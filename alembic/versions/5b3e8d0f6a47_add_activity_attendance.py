@@ -0,0 +1,42 @@
+"""add activity attendance
+
+Revision ID: 5b3e8d0f6a47
+Revises: c7a1e5f39d20
+Create Date: 2026-10-19 19:12:27.551904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b3e8d0f6a47'
+down_revision: Union[str, Sequence[str], None] = 'c7a1e5f39d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('activity_attendance',
+    sa.Column('activity_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Integer(), nullable=False),
+    sa.Column('expected', sa.LargeBinary(), nullable=False),
+    sa.Column('attended', sa.LargeBinary(), nullable=False),
+    sa.Column('expected_count', sa.Integer(), nullable=False),
+    sa.Column('attended_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['activity_id'], ['activities.id'], ),
+    sa.PrimaryKeyConstraint('activity_id', 'day')
+    )
+    with op.batch_alter_table('activity_attendance', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_activity_attendance_day'), ['day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('activity_attendance', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_activity_attendance_day'))
+
+    op.drop_table('activity_attendance')
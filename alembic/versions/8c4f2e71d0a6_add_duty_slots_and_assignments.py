@@ -0,0 +1,69 @@
+"""add duty slots and assignments
+
+Revision ID: 8c4f2e71d0a6
+Revises: d52a9c8e1f37
+Create Date: 2026-10-19 15:48:31.772014
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f2e71d0a6'
+down_revision: Union[str, Sequence[str], None] = 'd52a9c8e1f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('duty_slots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('required', sa.Integer(), nullable=False),
+    sa.Column('region_id', sa.Integer(), nullable=True),
+    sa.Column('weekdays', sa.Integer(), nullable=False),
+    sa.Column('start_minute', sa.Integer(), nullable=False),
+    sa.Column('end_minute', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['region_id'], ['regions.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key')
+    )
+    with op.batch_alter_table('duty_slots', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_duty_slots_id'), ['id'], unique=False)
+
+    op.create_table('duty_slot_positions',
+    sa.Column('slot_id', sa.Integer(), nullable=False),
+    sa.Column('position_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['position_id'], ['positions.id'], ),
+    sa.ForeignKeyConstraint(['slot_id'], ['duty_slots.id'], ),
+    sa.PrimaryKeyConstraint('slot_id', 'position_id')
+    )
+    op.create_table('duty_assignments',
+    sa.Column('day', sa.Integer(), nullable=False),
+    sa.Column('slot_id', sa.Integer(), nullable=False),
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.ForeignKeyConstraint(['slot_id'], ['duty_slots.id'], ),
+    sa.PrimaryKeyConstraint('day', 'slot_id', 'member_id'),
+    sqlite_with_rowid=False
+    )
+    with op.batch_alter_table('duty_assignments', schema=None) as batch_op:
+        batch_op.create_index('ix_duty_assignments_member_day', ['member_id', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('duty_assignments', schema=None) as batch_op:
+        batch_op.drop_index('ix_duty_assignments_member_day')
+
+    op.drop_table('duty_assignments')
+    op.drop_table('duty_slot_positions')
+    with op.batch_alter_table('duty_slots', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_duty_slots_id'))
+
+    op.drop_table('duty_slots')
@@ -0,0 +1,32 @@
+"""add activity recurrence
+
+Revision ID: c7a1e5f39d20
+Revises: 4e9b7d25a1c3
+Create Date: 2026-10-19 18:05:41.902311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a1e5f39d20'
+down_revision: Union[str, Sequence[str], None] = '4e9b7d25a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('activities', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recurrence', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('recurrence_end', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('activities', schema=None) as batch_op:
+        batch_op.drop_column('recurrence_end')
+        batch_op.drop_column('recurrence')
@@ -0,0 +1,50 @@
+"""add materialized path to regions
+
+Revision ID: cf6523b55a83
+Revises: 650419adcbee
+Create Date: 2026-10-19 12:20:41.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cf6523b55a83'
+down_revision: Union[str, Sequence[str], None] = '650419adcbee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('regions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('path', sa.String(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_regions_path'), ['path'], unique=False)
+
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_members_region_id'), ['region_id'], unique=False)
+
+    # 由根節點往下計算現有地區的物化路徑
+    op.execute("""
+        WITH RECURSIVE tree(id, path) AS (
+            SELECT id, '/' || printf('%08d', id) || '/'
+            FROM regions WHERE parent_id IS NULL
+            UNION ALL
+            SELECT r.id, tree.path || printf('%08d', r.id) || '/'
+            FROM regions AS r JOIN tree ON r.parent_id = tree.id
+        )
+        UPDATE regions SET path = (SELECT tree.path FROM tree WHERE tree.id = regions.id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_members_region_id'))
+
+    with op.batch_alter_table('regions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_regions_path'))
+        batch_op.drop_column('path')
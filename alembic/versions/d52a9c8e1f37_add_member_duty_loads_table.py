@@ -0,0 +1,35 @@
+"""add member duty loads table
+
+Revision ID: d52a9c8e1f37
+Revises: b3e1f0c27a94
+Create Date: 2026-10-19 14:22:09.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd52a9c8e1f37'
+down_revision: Union[str, Sequence[str], None] = 'b3e1f0c27a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('member_duty_loads',
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('load', sa.Float(), nullable=False),
+    sa.Column('as_of', sa.Date(), nullable=False),
+    sa.Column('last_assigned', sa.Date(), nullable=True),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.PrimaryKeyConstraint('member_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('member_duty_loads')
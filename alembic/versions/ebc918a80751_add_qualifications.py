@@ -0,0 +1,50 @@
+"""add qualifications
+
+Revision ID: ebc918a80751
+Revises: 5b3e8d0f6a47
+Create Date: 2026-10-19 20:41:08.512634
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ebc918a80751'
+down_revision: Union[str, Sequence[str], None] = '5b3e8d0f6a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    qualifications = op.create_table('qualifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('bit', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('bit'),
+    sa.UniqueConstraint('name')
+    )
+    with op.batch_alter_table('qualifications', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_qualifications_id'), ['id'], unique=False)
+    op.bulk_insert(qualifications, [{'name': '教學資格', 'bit': 0, 'description': '可擔任研討會講師'}])
+
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('qualification_mask', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index('ix_members_eligibility', ['is_schedulable', 'region_id', 'qualification_mask'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.drop_index('ix_members_eligibility')
+        batch_op.drop_column('qualification_mask')
+
+    with op.batch_alter_table('qualifications', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_qualifications_id'))
+
+    op.drop_table('qualifications')
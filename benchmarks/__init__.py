@@ -0,0 +1 @@
+"""效能量測工具：測試資料產生器與基準測試。"""
@@ -0,0 +1,360 @@
+"""儲存庫與 ViewModel 熱點路徑的基準測試。
+
+量測 MemberRepository.search (各排序欄位與篩選條件)、get_possible_parents、
+get_all_sorted、MemberImporter.run_import、MemberDialogViewModel.save、
+活動參與者的批次指派與活動分頁載入參與者、重複活動在查詢區間內的展開、出席點陣圖的彙總、
+依資格與地區子樹篩選會員 (SQL 與 NumPy)、組合篩選條件的編譯與求值，以及地區/職務樹在 display_items 中的建立時間
+(Qt offscreen 平台)。
+
+用法::
+
+    python -m benchmarks.bench_hot_paths --scale 10k --scale 100k
+    python -m benchmarks.bench_hot_paths --update-baseline
+"""
+
+import itertools
+import os
+import sys
+from datetime import date
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.harness import BenchmarkResult, measure, run_cli, working_copy
+from models import Activity, Member, MemberPosition, Position, Region
+from repositories.activity_participant_repository import ActivityParticipantRepository
+from repositories.member_repository import MemberRepository
+from repositories.position_repository import PositionRepository
+from repositories.region_repository import RegionRepository
+
+SUITE = "hot_paths"
+
+SORT_COLUMNS = {None: "none", 0: "name", 1: "phone", 2: "schedulable", 3: "region"}
+IMPORT_ROWS = 200
+RECURRING_ACTIVITIES = 2_000
+ATTENDANCE_ACTIVITIES = 10
+ATTENDANCE_WEEKS = 52
+ATTENDANCE_RATIO = 0.05
+# 組合篩選案例中，當天已排班的會員為 1 / FILTER_DUTY_RATIO
+FILTER_DUTY_RATIO = 10
+RECURRENCE_RULES = ("FREQ=WEEKLY;BYDAY=SA", "FREQ=WEEKLY;INTERVAL=2;BYDAY=SU,WE",
+                    "FREQ=MONTHLY;BYDAY=2SU", "FREQ=MONTHLY;BYMONTHDAY=15")
+
+
+def _search_filters(session):
+    """返回 (篩選名稱, 搜尋字詞, 地區 ID) 的組合。"""
+    busiest_region_id = session.execute(
+        select(Member.region_id).group_by(Member.region_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    # 頂層地區的篩選包含整棵子樹，是地區篩選最重的情況
+    top_region_id = session.execute(select(Region.id).where(Region.parent_id.is_(None)).limit(1)).scalar()
+    return [
+        ("none", None, None),
+        ("name", "陳", None),
+        ("region", None, busiest_region_id),
+        ("name+region", "陳", busiest_region_id),
+        ("region_subtree", None, top_region_id),
+    ]
+
+
+def _bench_repositories(scale, repeat, session):
+    results = []
+    member_repo = MemberRepository(session)
+    for (filter_name, term, region_id), (column, column_name) in itertools.product(
+            _search_filters(session), SORT_COLUMNS.items()):
+        results.append(measure(
+            f"{scale}/member_search/filter={filter_name}/sort={column_name}",
+            lambda: member_repo.search(term, region_id, column, Qt.AscendingOrder),
+            repeat=repeat,
+        ))
+
+    region_repo = RegionRepository(session)
+    position_repo = PositionRepository(session)
+    # 以第一個頂層節點為例，排除的後代最多，是最慢的情況
+    top_region_id = session.execute(select(Region.id).where(Region.parent_id.is_(None)).limit(1)).scalar()
+    top_position_id = session.execute(select(Position.id).where(Position.parent_id.is_(None)).limit(1)).scalar()
+    results.append(measure(f"{scale}/region_possible_parents/new",
+                           lambda: region_repo.get_possible_parents(None), repeat=repeat))
+    results.append(measure(f"{scale}/region_possible_parents/top_level",
+                           lambda: region_repo.get_possible_parents(top_region_id), repeat=repeat))
+    results.append(measure(f"{scale}/position_possible_parents/top_level",
+                           lambda: position_repo.get_possible_parents(top_position_id), repeat=repeat))
+    results.append(measure(f"{scale}/position_get_all_sorted",
+                           lambda: position_repo.get_all_sorted(), repeat=repeat))
+    return results
+
+
+def _bench_region_proximity(scale, repeat, session):
+    import numpy as np
+    from services.region_lca_index import RegionLcaIndex
+
+    parents = dict(session.execute(select(Region.id, Region.parent_id)).all())
+    # 每位會員所屬地區對一個固定地區的距離，模擬排班時的批次查詢
+    member_regions = np.array([region_id for (region_id,) in session.execute(
+        select(Member.region_id).where(Member.region_id.isnot(None)))], dtype=np.int64)
+    target = np.full(len(member_regions), member_regions[0])
+    index = RegionLcaIndex(parents)
+    return [
+        measure(f"{scale}/region_lca_index/build", lambda: RegionLcaIndex(parents), repeat=repeat),
+        measure(f"{scale}/region_lca_index/distance_many/{len(member_regions)}",
+                lambda: index.distance_many(member_regions, target), repeat=repeat),
+    ]
+
+
+def _bench_importer(scale, repeat, engine):
+    import pandas as pd
+    from services.member_importer import MemberImporter
+
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as session:
+        region_names = [name for (name,) in session.execute(select(Region.name).limit(50))]
+        position_names = [name for (name,) in session.execute(select(Position.name).limit(20))]
+
+    importer = MemberImporter(session_factory)
+    run_counter = itertools.count()
+    state = {}
+
+    def prepare():
+        run = next(run_counter)
+        state["dataframe"] = pd.DataFrame({
+            "姓名": [f"匯入{run}-{i}" for i in range(IMPORT_ROWS)],
+            "地區": [region_names[i % len(region_names)] for i in range(IMPORT_ROWS)],
+            "職務": [position_names[i % len(position_names)] for i in range(IMPORT_ROWS)],
+            "電話": [f"08{run:03d}{i:05d}" for i in range(IMPORT_ROWS)],
+        })
+
+    return [measure(f"{scale}/member_import/{IMPORT_ROWS}_rows",
+                    lambda: list(importer.run_import(state["dataframe"])),
+                    repeat=repeat, setup=prepare)]
+
+
+def _bench_member_dialog_save(scale, repeat, session):
+    from viewmodels.member_dialog_viewmodel import MemberDialogViewModel
+
+    member_ids = [member_id for (member_id,) in session.execute(select(Member.id).limit(repeat + 1))]
+    position_ids = [position_id for (position_id,) in session.execute(select(Position.id).limit(5))]
+    members = iter(member_ids)
+    state = {}
+
+    def prepare():
+        member = session.get(Member, next(members))
+        viewmodel = MemberDialogViewModel(session, member_data=member)
+        viewmodel.is_schedulable = not viewmodel.is_schedulable
+        for mp in list(viewmodel.assigned_positions):
+            viewmodel.remove_position(mp.position_id)
+        viewmodel.add_position(position_ids[0], is_primary=True)
+        viewmodel.add_position(position_ids[1])
+        state["viewmodel"] = viewmodel
+
+    return [measure(f"{scale}/member_dialog_save", lambda: state["viewmodel"].save(),
+                    repeat=repeat, setup=prepare)]
+
+
+def _bench_tree_widgets(scale, repeat, session):
+    from viewmodels.position_list_viewmodel import PositionListViewModel
+    from viewmodels.region_list_viewmodel import RegionListViewModel
+    from views.position_list_widget import PositionListWidget
+    from views.region_list_widget import RegionListWidget
+
+    QApplication.instance() or QApplication(sys.argv[:1])
+    region_widget = RegionListWidget(RegionListViewModel(session))
+    position_widget = PositionListWidget(PositionListViewModel(session))
+    regions = RegionRepository(session).get_all()
+    positions = PositionRepository(session).get_all_sorted()
+
+    return [
+        measure(f"{scale}/region_tree_display_items/{len(regions)}_nodes",
+                lambda: region_widget.display_items(regions), repeat=repeat),
+        measure(f"{scale}/position_tree_display_items/{len(positions)}_nodes",
+                lambda: position_widget.display_items(positions), repeat=repeat),
+    ]
+
+
+def _bench_activity_participants(scale, repeat, session):
+    """以 INSERT ... SELECT 批次指派活動參與者，以及活動分頁切換活動時載入參與者。"""
+    from viewmodels.activity_viewmodel import ActivityViewModel
+    from views.activity_widget import ActivityWidget
+
+    QApplication.instance() or QApplication(sys.argv[:1])
+    activity = Activity(name="基準測試活動", activity_date=date(2026, 6, 1), start_minute=14 * 60, end_minute=16 * 60)
+    session.add(activity)
+    session.commit()
+    repository = ActivityParticipantRepository(session)
+    top_region_id = session.scalars(select(Region.id).where(Region.parent_id.is_(None)).order_by(Region.id)).first()
+    position_id = session.scalars(
+        select(MemberPosition.position_id).group_by(MemberPosition.position_id).order_by(func.count().desc())
+    ).first()
+
+    def clear():
+        repository.remove_members(activity.id)
+        session.commit()
+
+    def assign(region_id=None, position_id=None):
+        repository.assign_matching(activity.id, region_id, position_id)
+        session.commit()
+
+    results = [
+        measure(f"{scale}/activity_assign/region_subtree_and_position",
+                lambda: assign(top_region_id, position_id), repeat=repeat, setup=clear),
+        measure(f"{scale}/activity_assign/all_schedulable", assign, repeat=repeat, setup=clear),
+    ]
+    viewmodel = ActivityViewModel(session)
+    widget = ActivityWidget(viewmodel)
+    result = measure(f"{scale}/activity_tab_select_activity", lambda: viewmodel.select_activity(activity),
+                     repeat=repeat)
+    result.extra = {"participants": viewmodel.participants.rowCount()}
+    results.append(result)
+    widget.deleteLater()
+    return results
+
+
+def _bench_recurrence(scale, repeat, session):
+    """行事曆查詢：從多年前開始、沒有結束的重複活動只展開查詢的區間 (冷快取與熱快取)。"""
+    from services.recurrence import clear_cache, occurrences_between
+
+    session.add_all(
+        Activity(name=f"重複活動 {i}", activity_date=date(2000 + i % 20, i % 12 + 1, i % 28 + 1),
+                 start_minute=19 * 60, end_minute=21 * 60, recurrence=RECURRENCE_RULES[i % len(RECURRENCE_RULES)])
+        for i in range(RECURRING_ACTIVITIES)
+    )
+    session.commit()
+    windows = {"day": (date(2026, 6, 6), date(2026, 6, 6)), "month": (date(2026, 6, 1), date(2026, 6, 30))}
+    results = []
+    for window_name, (window_start, window_end) in windows.items():
+        for cache_name, setup in (("cold", clear_cache), ("cached", None)):
+            result = measure(f"{scale}/recurrence_occurrences/{window_name}/{cache_name}",
+                             lambda: occurrences_between(session, window_start, window_end),
+                             repeat=repeat, setup=setup)
+            result.extra = {"activities": RECURRING_ACTIVITIES,
+                            "occurrences": len(occurrences_between(session, window_start, window_end))}
+            results.append(result)
+    return results
+
+
+def _bench_attendance(scale, repeat, session):
+    """一年份每週活動的出席點陣圖：依地區子樹、部門、職務彙總 (冷快取與熱快取) 與任意會員集合。"""
+    import random
+    from datetime import timedelta
+    from services.attendance import AttendanceStats, record_attendance
+
+    rng = random.Random(47)
+    member_ids = session.scalars(select(Member.id)).all()
+    activities = [Activity(name=f"出席活動 {i}", activity_date=date(2025, 1, 4), start_minute=19 * 60,
+                           end_minute=21 * 60, recurrence="FREQ=WEEKLY;BYDAY=SA") for i in range(ATTENDANCE_ACTIVITIES)]
+    session.add_all(activities)
+    session.commit()
+    for activity in activities:
+        for week in range(ATTENDANCE_WEEKS):
+            record_attendance(session, activity.id, activity.activity_date + timedelta(weeks=week),
+                              rng.sample(member_ids, int(len(member_ids) * ATTENDANCE_RATIO)))
+    session.commit()
+
+    stats = AttendanceStats.for_session(session)
+    start, end = date(2025, 1, 1), date(2025, 12, 31)
+    top_region_id = session.scalars(select(Region.id).where(Region.parent_id.is_(None)).order_by(Region.id)).first()
+    subtree = session.scalars(select(Member.id).where(
+        Member.region_id.in_(RegionRepository(session).subtree_ids_query(top_region_id)))).all()
+    extra = {"bitmaps": ATTENDANCE_ACTIVITIES * ATTENDANCE_WEEKS, "members": len(member_ids)}
+    results = []
+    for name, aggregate in (("region", stats.by_region), ("department", stats.by_department),
+                            ("position", stats.by_position)):
+        results.append(measure(f"{scale}/attendance_by_{name}/cold", lambda: aggregate(start, end),
+                               repeat=repeat, setup=stats.invalidate))
+        results.append(measure(f"{scale}/attendance_by_{name}/cached", lambda: aggregate(start, end), repeat=repeat))
+    results.append(measure(f"{scale}/attendance_for_members/{len(subtree)}",
+                           lambda: stats.for_members(subtree, start, end), repeat=repeat))
+    for result in results:
+        result.extra = extra
+    return results
+
+
+def _bench_eligibility(scale, repeat, session):
+    """「具備兩種資格、位於某個二級地區子樹、可排班」：索引查詢、欄位陣列 (冷/熱) 與只依資格篩選。"""
+    from services.eligibility import EligibilityService
+
+    top_region_id = session.scalars(select(Region.id).where(Region.parent_id.is_(None)).order_by(Region.id)).first()
+    region_id = session.scalars(select(Region.id).where(Region.parent_id == top_region_id).order_by(Region.id)).first()
+    # 位元 0 與 3 (教學資格、會場引導)
+    required_mask = 0b1001
+    repository = MemberRepository(session)
+    service = EligibilityService.for_session(session)
+    extra = {"matches": len(repository.get_eligible_ids(required_mask, region_id))}
+    results = [
+        measure(f"{scale}/eligibility/sql_index", lambda: repository.get_eligible_ids(required_mask, region_id),
+                repeat=repeat),
+        measure(f"{scale}/eligibility/numpy_cold", lambda: service.eligible_ids(required_mask, region_id),
+                repeat=repeat, setup=service.members_changed),
+        measure(f"{scale}/eligibility/numpy_cached", lambda: service.eligible_ids(required_mask, region_id),
+                repeat=repeat),
+        measure(f"{scale}/eligibility/numpy_cached_all_regions", lambda: service.eligible_ids(required_mask),
+                repeat=repeat),
+    ]
+    for result in results:
+        result.extra = extra
+    return results
+
+
+def _bench_member_filter(scale, repeat, session):
+    """「可排班、地區子樹、持有三種職務之一、具備教學資格、當天未排班」：SQL (快取與重新建立陳述式) 與記憶體求值。"""
+    import random
+    from repositories.duty_assignment_repository import DutyAssignmentRepository
+    from repositories.member_filter import (AssignedOn, HasQualifications, HoldsPositions, InRegionSubtree,
+                                            MemberFilterRepository, Schedulable, clear_statement_cache)
+    from services.eligibility import EligibilityService
+
+    rng = random.Random(50)
+    member_ids = session.scalars(select(Member.id)).all()
+    day = 20_000
+    DutyAssignmentRepository(session).bulk_insert(
+        [(day, 1, member_id) for member_id in rng.sample(member_ids, len(member_ids) // FILTER_DUTY_RATIO)])
+    session.commit()
+
+    top_region_id = session.scalars(select(Region.id).where(Region.parent_id.is_(None)).order_by(Region.id)).first()
+    position_ids = session.scalars(select(Position.id).order_by(Position.id).limit(3)).all()
+    criteria = (Schedulable() & InRegionSubtree(top_region_id) & HoldsPositions(position_ids)
+                & HasQualifications(1) & ~AssignedOn(day))
+    repository = MemberFilterRepository(session)
+    service = EligibilityService.for_session(session)
+    extra = {"matches": repository.count(criteria)}
+    results = [
+        measure(f"{scale}/member_filter/sql_cached_statement", lambda: repository.get_ids(criteria), repeat=repeat),
+        measure(f"{scale}/member_filter/sql_new_statement", lambda: repository.get_ids(criteria),
+                repeat=repeat, setup=clear_statement_cache),
+        measure(f"{scale}/member_filter/in_memory", lambda: service.evaluate(criteria), repeat=repeat),
+        measure(f"{scale}/member_filter/in_memory_without_duties",
+                lambda: service.evaluate(Schedulable() & InRegionSubtree(top_region_id)
+                                         & HoldsPositions(position_ids) & HasQualifications(1)),
+                repeat=repeat),
+    ]
+    for result in results:
+        result.extra = extra
+    return results
+
+
+def run_cases(scale: str, repeat: int) -> list[BenchmarkResult]:
+    """對指定規模的測試資料庫執行所有案例。"""
+    engine = create_engine(f"sqlite:///{working_copy(scale)}")
+    session = sessionmaker(bind=engine)()
+    try:
+        results = _bench_repositories(scale, repeat, session)
+        results += _bench_tree_widgets(scale, repeat, session)
+        results += _bench_member_dialog_save(scale, repeat, session)
+        results += _bench_activity_participants(scale, repeat, session)
+        results += _bench_recurrence(scale, repeat, session)
+        results += _bench_attendance(scale, repeat, session)
+        results += _bench_eligibility(scale, repeat, session)
+        results += _bench_member_filter(scale, repeat, session)
+        results += _bench_region_proximity(scale, repeat, session)
+        results += _bench_importer(scale, repeat, engine)
+        return results
+    finally:
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(run_cli(SUITE, run_cases))
@@ -0,0 +1,331 @@
+"""排班引擎的基準測試。
+
+以測試資料庫中的可排班會員 (含可排班日限制) 排一整年的班：每天上午/下午會館值班、
+平日晚間值班、限定職務的週六幹部班，以及每個頂層地區 (限子樹會員) 的週日座談。
+另外量測依頂層地區分割後以 1..N 個行程平行求解、多情境模擬，以及會員資料變動後的
+增量修補與整年重新求解，以及排班紀錄的批次寫入與「某天某地區誰值班」、
+「某位會員接下來的排班」查詢 (在約一百萬筆歷史紀錄上)、整份行事曆的重複排班檢查，
+以及一季數百場研討會的講師最佳指派。
+
+用法::
+
+    python -m benchmarks.bench_scheduling --scale 10k
+    python -m benchmarks.bench_scheduling --update-baseline
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.harness import BenchmarkResult, measure, run_cli, working_copy
+from models import Activity, Member, MemberPosition, Region
+from repositories.duty_assignment_repository import DutyAssignmentRepository, day_key
+from repositories.duty_slot_repository import DutySlotRepository
+from repositories.member_filter import MemberFilterRepository, member_criteria
+from services.region_lca_index import RegionProximityService
+from services.scheduling import (AvailabilityStore, Booking, ConflictIndex, DutyLoadCounters, Scenario, ScheduleSolver,
+                                 SlotDefinition, build_problem, find_conflicts, find_duty_conflicts, lecture_sessions,
+                                 load_duty_bookings, partition_problem, plan_lecturers, repair_schedule, repair_stored_duties,
+                                 run_simulations, save_schedule, solve_lecturer_assignment, solve_parallel)
+from services.scheduling.lecturers import lecturer_costs, region_distances
+
+SUITE = "scheduling"
+
+START = date(2026, 1, 1)
+END = date(2026, 12, 31)
+WEEKDAYS = frozenset(range(5))
+# 增量修補案例中資料變動的會員數
+REPAIR_SIZES = (1, 50)
+# 模擬「某地區少了約 20% 會員」時移除的人數
+SCALES_REGION_LOSS = {"10k": 300, "100k": 3000, "1m": 30000}
+# 儲存案例寫入的歷史排班紀錄數 (排在 START 之前的年份)
+STORAGE_HISTORY_ROWS = 1_000_000
+# 講師指派案例：一季的場次數與具講師資格的會員數上限
+LECTURE_SESSIONS = 400
+LECTURER_LIMIT = 500
+LECTURE_SEASON_DAYS = 90
+
+
+def year_definitions(session) -> list[SlotDefinition]:
+    """建立基準測試使用的班別定義。"""
+    top_region_ids = session.scalars(select(Region.id).where(Region.parent_id.is_(None)).order_by(Region.id)).all()
+    # 持有人數最少的三個職務，讓限定職務的班別成為最難排的班別
+    scarce_position_ids = session.scalars(
+        select(MemberPosition.position_id).group_by(MemberPosition.position_id).order_by(func.count()).limit(3)
+    ).all()
+    definitions = [
+        SlotDefinition("hall_am", "會館值班 (上午)", 2, start_minute=9 * 60, end_minute=12 * 60),
+        SlotDefinition("hall_pm", "會館值班 (下午)", 2, start_minute=13 * 60, end_minute=17 * 60),
+        SlotDefinition("hall_eve", "會館值班 (晚間)", 3, weekdays=WEEKDAYS, start_minute=19 * 60, end_minute=21 * 60),
+        SlotDefinition("leaders", "幹部值班", 3, position_ids=frozenset(scarce_position_ids),
+                       weekdays=frozenset({5}), start_minute=10 * 60, end_minute=12 * 60),
+    ]
+    definitions += [
+        SlotDefinition(f"meeting_{region_id}", "地區座談", 4, region_id=region_id,
+                       weekdays=frozenset({6}), start_minute=14 * 60, end_minute=16 * 60)
+        for region_id in top_region_ids
+    ]
+    return definitions
+
+
+def regional_definitions(session) -> list[SlotDefinition]:
+    """每個頂層地區各自的班別 (彼此沒有共用會員)，用於平行求解。"""
+    top_region_ids = session.scalars(select(Region.id).where(Region.parent_id.is_(None)).order_by(Region.id)).all()
+    definitions = []
+    for region_id in top_region_ids:
+        definitions += [
+            SlotDefinition(f"hall_am_{region_id}", "地區會館 (上午)", 3, region_id=region_id,
+                           start_minute=9 * 60, end_minute=12 * 60),
+            SlotDefinition(f"hall_pm_{region_id}", "地區會館 (下午)", 3, region_id=region_id,
+                           start_minute=13 * 60, end_minute=17 * 60),
+            SlotDefinition(f"hall_eve_{region_id}", "地區會館 (晚間)", 2, region_id=region_id, weekdays=WEEKDAYS,
+                           start_minute=19 * 60, end_minute=21 * 60),
+            SlotDefinition(f"meeting_{region_id}", "地區座談", 6, region_id=region_id,
+                           weekdays=frozenset({6}), start_minute=14 * 60, end_minute=16 * 60),
+        ]
+    return definitions
+
+
+def _bench_fairness(scale, repeat, session, problem):
+    """累加整年排班到負擔計數器、寫回資料庫，以及下一次排班前的換算。"""
+    schedule = ScheduleSolver(problem).solve()
+
+    def record_and_save():
+        # 每次都從空的計數器開始，重複量測不會把同一年的負擔累加好幾次
+        counters = DutyLoadCounters()
+        counters.record_schedule(schedule)
+        counters.save(session)
+        session.commit()
+
+    results = [measure(f"{scale}/fairness/record_and_save_year", record_and_save, repeat=repeat)]
+    loaded = DutyLoadCounters.load(session)
+    next_year = problem.copy()
+    results.append(measure(f"{scale}/fairness/load_counters", lambda: DutyLoadCounters.load(session), repeat=repeat))
+    results.append(measure(f"{scale}/fairness/apply_to_problem", lambda: loaded.apply_to(next_year), repeat=repeat))
+    results.append(measure(f"{scale}/fairness/solve_year_with_history",
+                           lambda: ScheduleSolver(next_year).solve(), repeat=repeat))
+    return results
+
+
+def _bench_parallel(scale, repeat, session):
+    """依頂層地區分割後，以 1..N 個行程求解。行程池預先建立，不計入啟動時間。"""
+    problem = build_problem(session, START, END, regional_definitions(session))
+    partitions = partition_problem(problem)
+    results = [measure(f"{scale}/solve_parallel/partition/{len(partitions)}_parts",
+                       lambda: partition_problem(problem), repeat=repeat)]
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            result = measure(f"{scale}/solve_parallel/workers={workers}",
+                             lambda: solve_parallel(problem, max_workers=workers, executor=pool),
+                             repeat=repeat)
+        result.extra = {"cpu_count": os.cpu_count()}
+        results.append(result)
+    return results
+
+
+def _bench_simulation(scale, repeat, session, definitions):
+    """以記憶體快照平行模擬四個情境 (含目前)。"""
+    top_region_id = session.scalars(select(Region.id).where(Region.parent_id.is_(None)).order_by(Region.id)).first()
+    scenarios = [
+        Scenario("地區少 20%", region_member_losses=((top_region_id, SCALES_REGION_LOSS[scale]),)),
+        Scenario("週六加班", add_definitions=(SlotDefinition("saturday_extra", "週六加班", 10, weekdays=frozenset({5}),
+                                                              start_minute=18 * 60, end_minute=20 * 60),)),
+        Scenario("取消晚間", remove_definition_keys=frozenset({"hall_eve"})),
+    ]
+    return [
+        measure(f"{scale}/simulation/{len(scenarios) + 1}_scenarios/workers={workers}",
+                lambda: run_simulations(session, START, END, definitions, scenarios, max_workers=workers),
+                repeat=repeat)
+        for workers in sorted({1, os.cpu_count() or 1})
+    ]
+
+
+def _bench_repair(scale, repeat, session, definitions):
+    """將已排班的會員改為不可排班後，比較增量修補與整年重新求解。"""
+    results = []
+    for size in REPAIR_SIZES:
+        schedule = ScheduleSolver(build_problem(session, START, END, definitions)).solve()
+        member_ids = list(dict.fromkeys(member_id for _, _, member_id in schedule.rows()))[:size]
+        session.query(Member).filter(Member.id.in_(member_ids)).update({Member.is_schedulable: 0})
+        session.commit()
+        results.append(measure(f"{scale}/repair/{size}_members",
+                               lambda: repair_schedule(session, schedule, member_ids), repeat=repeat))
+        results.append(measure(f"{scale}/repair/full_resolve_after_{size}_members",
+                               lambda: ScheduleSolver(build_problem(session, START, END, definitions)).solve(),
+                               repeat=repeat))
+    return results
+
+
+def _bench_storage(scale, repeat, session, problem):
+    """寫入整年排班與約一百萬筆歷史紀錄，再量測單次查詢與已儲存排班的修補。"""
+    schedule = ScheduleSolver(problem).solve()
+
+    def save():
+        save_schedule(session, schedule)
+        session.commit()
+
+    results = [measure(f"{scale}/storage/save_year", save, repeat=repeat)]
+
+    # 以固定亂數種子產生歷史紀錄：每天約 300 人次，往 START 之前延伸
+    slot_ids = list(DutySlotRepository(session).get_ids().values())
+    rng = np.random.default_rng(0)
+    per_day = 300
+    days = day_key(START) - 1 - np.arange(STORAGE_HISTORY_ROWS) // per_day
+    history = zip(days.tolist(), rng.choice(slot_ids, STORAGE_HISTORY_ROWS).tolist(),
+                  rng.choice(problem.member_ids, STORAGE_HISTORY_ROWS).tolist())
+    repository = DutyAssignmentRepository(session)
+
+    def bulk_insert():
+        repository.bulk_insert(history)
+        session.commit()
+
+    results.append(measure(f"{scale}/storage/bulk_insert_{STORAGE_HISTORY_ROWS}_history_rows", bulk_insert,
+                           repeat=1, warmup=0))
+
+    top_region_path = session.scalars(
+        select(Region.path).where(Region.parent_id.is_(None)).order_by(Region.id)
+    ).first()
+    subtree_path = session.scalars(
+        select(Region.path).where(Region.path.startswith(top_region_path), Region.parent_id.is_not(None))
+        .order_by(Region.id)
+    ).first() or top_region_path
+    day = day_key(START + timedelta(days=180))
+    member_id = next(member_id for _, _, member_id in schedule.rows())
+    results.append(measure(f"{scale}/storage/on_duty_region_subtree",
+                           lambda: repository.on_duty(day, subtree_path), repeat=repeat * 20))
+    results.append(measure(f"{scale}/storage/on_duty_all",
+                           lambda: repository.on_duty(day), repeat=repeat * 20))
+    results.append(measure(f"{scale}/storage/next_10_duties",
+                           lambda: repository.next_duties(member_id, day_key(START)), repeat=repeat * 20))
+
+    session.query(Member).filter(Member.id == member_id).update({Member.is_schedulable: 0})
+    session.commit()
+    results.append(measure(f"{scale}/storage/repair_stored_1_member",
+                           lambda: repair_stored_duties(session, [member_id], START), setup=session.rollback,
+                           repeat=repeat))
+    return results
+
+
+def _bench_conflicts(scale, repeat, session):
+    """在儲存案例寫入的整份行事曆 (含歷史紀錄) 上檢查重複排班，以及逐筆新增時的即時檢查。"""
+    first = START - timedelta(days=STORAGE_HISTORY_ROWS // 300 + 1)
+    bookings = load_duty_bookings(session, first, END)
+    index = ConflictIndex(bookings)
+    probe = Booking(bookings[-1].start + 30, bookings[-1].end + 30, bookings[-1].member_id, "activity")
+    results = [
+        measure(f"{scale}/conflicts/load_and_sweep_calendar", lambda: find_duty_conflicts(session, first, END),
+                repeat=repeat),
+        measure(f"{scale}/conflicts/sweep_{len(bookings)}_bookings", lambda: find_conflicts(bookings), repeat=repeat),
+        measure(f"{scale}/conflicts/build_index", lambda: ConflictIndex(bookings), repeat=repeat),
+        measure(f"{scale}/conflicts/check_one_booking", lambda: index.conflicts_with(probe), repeat=repeat * 20),
+    ]
+    results[1].extra = {"conflicts": len(find_conflicts(bookings))}
+    return results
+
+
+def _bench_lecturers(scale, repeat):
+    """一季 LECTURE_SESSIONS 場研討會 (分散在各地區) 指派講師：每位講師最多兩場。
+
+    使用新的資料庫複本：前面的案例會寫入 START 之後的排班與負擔，講師指派應以
+    START 之前一年的排班作為負擔歷史，與實際使用時相同。
+    """
+    engine = create_engine(f"sqlite:///{working_copy(scale)}")
+    session = sessionmaker(bind=engine)()
+    try:
+        history = build_problem(session, START.replace(year=START.year - 1), START - timedelta(days=1),
+                                year_definitions(session))
+        counters = DutyLoadCounters()
+        counters.record_schedule(ScheduleSolver(history).solve())
+        counters.save(session)
+        session.commit()
+        return _plan_lecturers(scale, repeat, session)
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _plan_lecturers(scale, repeat, session):
+    rng = np.random.default_rng(48)
+    region_ids = session.scalars(select(Region.id)).all()
+    session.add_all(
+        Activity(name=f"研討會 {i}", activity_date=START + timedelta(days=int(rng.integers(LECTURE_SEASON_DAYS))),
+                 start_minute=int(start), end_minute=int(start) + 120, region_id=int(rng.choice(region_ids)))
+        for i, start in enumerate(rng.choice([10 * 60, 14 * 60, 19 * 60], LECTURE_SESSIONS))
+    )
+    session.commit()
+    # 持有人數最少的職務依序加入，直到講師人數接近上限 (至少一個職務)
+    position_ids, lecturers = [], 0
+    for position_id, count in session.execute(
+        select(MemberPosition.position_id, func.count()).group_by(MemberPosition.position_id).order_by(func.count())
+    ):
+        if position_ids and lecturers + count > LECTURER_LIMIT:
+            break
+        position_ids.append(position_id)
+        lecturers += count
+    end = START + timedelta(days=LECTURE_SEASON_DAYS - 1)
+    result = measure(f"{scale}/lecturers/plan_{LECTURE_SESSIONS}_sessions",
+                     lambda: plan_lecturers(session, START, end, position_ids), repeat=repeat)
+    plan = plan_lecturers(session, START, end, position_ids)
+    result.extra = {"lecturers": lecturers, "unassigned": len(plan.unassigned), "rounds": plan.rounds,
+                    "total_cost": round(plan.total_cost, 1)}
+
+    # 另以隨機的小數負擔 (同值很少、較難求解) 直接量測指派本身
+    sessions = lecture_sessions(session, START, end)
+    lecturer_rows = MemberFilterRepository(session).get_rows(member_criteria(position_ids=position_ids),
+                                                             Member.id, Member.region_id)
+    lecturer_ids = [member_id for member_id, _ in lecturer_rows]
+    distances = region_distances(RegionProximityService.for_session(session).index,
+                                 [lecture.region_id for lecture in sessions],
+                                 [region_id for _, region_id in lecturer_rows])
+    cost = lecturer_costs(distances, rng.random(len(lecturer_ids)) * 3, np.ones(distances.shape, dtype=bool))
+    fractional = measure(f"{scale}/lecturers/solve_{LECTURE_SESSIONS}_sessions_fractional_loads",
+                         lambda: solve_lecturer_assignment(sessions, lecturer_ids, cost, 2), repeat=repeat)
+    fractional_plan = solve_lecturer_assignment(sessions, lecturer_ids, cost, 2)
+    fractional.extra = {"lecturers": len(lecturer_ids), "rounds": fractional_plan.rounds,
+                        "total_cost": round(fractional_plan.total_cost, 1)}
+    return [result, fractional]
+
+
+def run_cases(scale: str, repeat: int) -> list[BenchmarkResult]:
+    """對指定規模的測試資料庫執行所有案例。"""
+    engine = create_engine(f"sqlite:///{working_copy(scale)}")
+    session = sessionmaker(bind=engine)()
+    try:
+        definitions = year_definitions(session)
+        problem = build_problem(session, START, END, definitions)
+        store = AvailabilityStore(session)
+        results = [
+            measure(f"{scale}/availability/day_bitsets_year",
+                    lambda: store.day_bitsets(problem.member_ids, START, END), repeat=repeat),
+            measure(f"{scale}/availability/common_days_year",
+                    lambda: store.common_days(START.year, problem.member_ids), repeat=repeat),
+            measure(f"{scale}/build_problem/{len(definitions)}_definitions",
+                    lambda: build_problem(session, START, END, definitions), repeat=repeat),
+            measure(f"{scale}/solve_year/greedy",
+                    lambda: ScheduleSolver(problem).solve(local_search=False), repeat=repeat),
+        ]
+        full = measure(f"{scale}/solve_year/greedy+local_search",
+                       lambda: ScheduleSolver(problem).solve(), repeat=repeat)
+        metrics = ScheduleSolver(problem).solve().metrics
+        full.extra = {"assigned": metrics.assigned, "unfilled": metrics.unfilled, "load_std": metrics.load_std}
+        results.append(full)
+        results += _bench_fairness(scale, repeat, session, problem)
+        results += _bench_parallel(scale, repeat, session)
+        results += _bench_simulation(scale, repeat, session, definitions)
+        results += _bench_repair(scale, repeat, session, definitions)
+        results += _bench_storage(scale, repeat, session, build_problem(session, START, END, definitions))
+        results += _bench_conflicts(scale, repeat, session)
+        results += _bench_lecturers(scale, repeat)
+        return results
+    finally:
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(run_cli(SUITE, run_cases))
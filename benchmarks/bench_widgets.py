@@ -0,0 +1,186 @@
+"""清單與樹狀 Widget 的繪製效能基準測試。
+
+在 Qt offscreen 平台上執行真正的 MemberListWidget、RegionListWidget 與
+PositionListWidget，餵入 1k–100k 筆資料列/節點，量測：
+
+* populate：display_items() 建立所有列或節點的時間。
+* filter：套用搜尋篩選的時間。樹狀 Widget 在客戶端篩選；會員清單的篩選在資料庫
+  完成，這裡量測的是以篩選結果重新填入表格的時間。
+* scroll_repaint：逐頁捲動並同步重繪 viewport 的時間。
+* 記憶體：populate 期間的 Python 配置峰值 (tracemalloc)、行程 RSS 增量與 RSS 峰值。
+
+用法::
+
+    python -m benchmarks.bench_widgets --scale 1k --scale 10k --scale 100k
+"""
+
+import gc
+import os
+import resource
+import sys
+import tracemalloc
+from types import SimpleNamespace
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.fixture_generator import SURNAMES
+from benchmarks.harness import BenchmarkResult, measure, run_cli, working_copy
+
+SUITE = "widgets"
+
+ROW_COUNTS = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+}
+
+SCROLL_STEPS = 50
+TREE_FANOUT = 5
+WINDOW_SIZE = (1200, 800)
+
+
+def _peak_rss_mb() -> float:
+    """行程啟動以來的常駐記憶體峰值 (MB)。"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 的單位是 bytes，Linux 是 KB
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _current_rss_mb() -> float:
+    """目前行程的常駐記憶體 (MB)。Linux 讀取 /proc，其他平台退回使用峰值。"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return _peak_rss_mb()
+
+
+def _make_members(count):
+    regions = [SimpleNamespace(id=i, name=f"地區{i:03d}") for i in range(1, 201)]
+    return [
+        SimpleNamespace(
+            id=i + 1,
+            name=f"{SURNAMES[i % len(SURNAMES)]}會員{i:06d}",
+            phone_number=f"09{i:08d}",
+            is_schedulable=0 if i % 5 == 0 else 1,
+            region=regions[i % len(regions)],
+        )
+        for i in range(count)
+    ]
+
+
+def _make_tree_nodes(count):
+    """以廣度優先順序建立 count 個節點，每個節點 TREE_FANOUT 個子節點。"""
+    nodes = []
+    for i in range(count):
+        node_id = i + 1
+        parent_id = None if i < TREE_FANOUT else (i - TREE_FANOUT) // TREE_FANOUT + 1
+        nodes.append(SimpleNamespace(id=node_id, name=f"節點{node_id:06d}", parent_id=parent_id, rank=i % TREE_FANOUT))
+    return nodes
+
+
+def _process_events():
+    QApplication.processEvents()
+
+
+def _measure_memory(widget, items):
+    """量測一次 populate 的記憶體使用。"""
+    widget.display_items([])
+    _process_events()
+    gc.collect()
+    rss_before = _current_rss_mb()
+    tracemalloc.start()
+    widget.display_items(items)
+    _process_events()
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "python_peak_mb": round(python_peak / (1024 * 1024), 2),
+        "rss_delta_mb": round(_current_rss_mb() - rss_before, 2),
+        "process_peak_rss_mb": round(_peak_rss_mb(), 2),
+    }
+
+
+def _scroll_repaint(view):
+    scrollbar = view.verticalScrollBar()
+    maximum = scrollbar.maximum()
+    for step in range(SCROLL_STEPS + 1):
+        scrollbar.setValue(maximum * step // SCROLL_STEPS)
+        view.viewport().repaint()
+
+
+def _bench_widget(label, widget, view, items, filter_action, repeat, scale):
+    widget.resize(*WINDOW_SIZE)
+    widget.show()
+    _process_events()
+
+    def populate():
+        widget.display_items(items)
+        _process_events()
+
+    results = [measure(f"{scale}/{label}/populate", populate, repeat=repeat)]
+    results[0].extra.update(_measure_memory(widget, items))
+    results.append(measure(f"{scale}/{label}/filter", filter_action, repeat=repeat))
+    populate()
+    results.append(measure(f"{scale}/{label}/scroll_repaint", lambda: _scroll_repaint(view), repeat=repeat))
+
+    widget.close()
+    widget.deleteLater()
+    _process_events()
+    return results
+
+
+def run_cases(scale: str, repeat: int) -> list[BenchmarkResult]:
+    """以指定的資料列數量測三個 Widget。"""
+    from viewmodels.member_list_viewmodel import MemberListViewModel
+    from viewmodels.position_list_viewmodel import PositionListViewModel
+    from viewmodels.region_list_viewmodel import RegionListViewModel
+    from views.member_list_widget import MemberListWidget
+    from views.position_list_widget import PositionListWidget
+    from views.region_list_widget import RegionListWidget
+
+    QApplication.instance() or QApplication(sys.argv[:1])
+    count = ROW_COUNTS[scale]
+    # Widget 建構時需要 ViewModel 載入下拉選單等資料，使用測試資料庫即可
+    engine = create_engine(f"sqlite:///{working_copy('10k')}")
+    session = sessionmaker(bind=engine)()
+    results = []
+    try:
+        members = _make_members(count)
+        filtered_members = [m for m in members if m.name.startswith(SURNAMES[0])]
+        member_widget = MemberListWidget(MemberListViewModel(session))
+
+        def filter_members():
+            member_widget.display_items(members)
+            member_widget.display_items(filtered_members)
+            _process_events()
+
+        results += _bench_widget("member_list", member_widget, member_widget.table_widget,
+                                 members, filter_members, repeat, scale)
+
+        nodes = _make_tree_nodes(count)
+        for label, widget_class, viewmodel_class in (
+                ("region_tree", RegionListWidget, RegionListViewModel),
+                ("position_tree", PositionListWidget, PositionListViewModel)):
+            widget = widget_class(viewmodel_class(session))
+
+            def filter_tree(widget=widget):
+                # 先清除再輸入，確保每次都是一次完整的篩選
+                widget.search_input.setText("")
+                widget.search_input.setText("99")
+                _process_events()
+
+            results += _bench_widget(label, widget, widget.tree_widget, nodes, filter_tree, repeat, scale)
+    finally:
+        session.close()
+        engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(run_cli(SUITE, run_cases, default_scales=("1k", "10k"), scale_choices=ROW_COUNTS))
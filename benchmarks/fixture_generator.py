@@ -0,0 +1,334 @@
+"""大量測試資料產生器。
+
+建立具備正式環境規模的 SQLite 測試資料庫 (fixture)，用於量測各項效能功能：
+多層地區樹、具有 rank 的職務樹、部門、資格目錄，以及每位會員一到三個 MemberPosition。
+所有資料皆以批次 INSERT 寫入，十萬筆會員約兩秒、一百萬筆約十餘秒即可完成。
+
+用法::
+
+    python -m benchmarks.fixture_generator --scale 100k
+    python -m benchmarks.fixture_generator --members 50000 --depth 5 --fanout 4 --out /tmp/custom.db
+"""
+
+import argparse
+import logging
+import os
+import random
+from dataclasses import dataclass
+from operator import itemgetter
+from time import perf_counter
+
+from sqlalchemy import create_engine, event, insert, inspect, text
+from sqlalchemy.engine import Engine
+
+from models import Base, Department, Member, MemberAvailability, MemberPosition, Position, Qualification, Region
+from repositories.position_repository import make_sort_key
+from repositories.region_repository import make_path
+from services.scheduling.availability import month_days, pack_days, weekday_days
+from services.database_bootstrap import (PROJECT_ROOT, create_schema, get_code_head_revision, mark_seeded,
+                                         missing_columns, read_schema_state)
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_DIR = os.path.join(PROJECT_ROOT, "data", "fixtures")
+# 產生器寫入的資料內容改變時 (例如開始填入新的欄位) 請遞增；記錄在 PRAGMA application_id
+FIXTURE_VERSION = 1
+
+# 預設的資料規模
+SCALES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+DEPARTMENT_NAMES = ["壯年部", "婦人部", "男子部", "女子部"]
+REGION_LEVEL_LABELS = ["方面", "本部", "支部", "地區", "組", "班"]
+POSITION_LEVEL_LABELS = ["長", "副長", "幹事", "委員"]
+# (資格名稱, 具備的會員比例)，依序佔用位元 0, 1, 2...
+QUALIFICATIONS = [("教學資格", 0.15), ("司儀", 0.2), ("音響", 0.1), ("會場引導", 0.4),
+                  ("急救", 0.05), ("翻譯", 0.03), ("攝影", 0.08), ("駕駛", 0.25)]
+SURNAMES = "陳林黃張李王吳劉蔡楊許鄭謝洪郭邱曾廖賴徐周葉蘇莊呂江何蕭羅高潘簡朱鍾游彭詹胡施沈余盧梁趙顏柯翁魏孫戴"
+GIVEN_CHARS = "家志明俊偉建國文華美玲淑惠雅婷怡君宗翰冠宇承恩柏宏佳穎心怡子涵雨萱品妍宥廷庭瑋"
+
+_INSERT_BATCH_SIZE = 50_000
+# 與 10^8 互質，i * _PHONE_STRIDE mod 10^8 對每個 i 都不同，確保電話號碼唯一
+_PHONE_STRIDE = 7919
+
+
+@dataclass
+class FixtureSpec:
+    """測試資料庫的規模設定。
+
+    Attributes:
+        members (int): 會員數。
+        region_depth (int): 地區樹的層數。
+        region_fanout (int): 每個地區的子地區數。
+        position_roots (int): 頂層職務數。
+        position_depth (int): 職務樹的層數。
+        position_fanout (int): 每個職務的子職務數。
+        schedulable_ratio (float): 可排班會員的比例。
+        restricted_ratio (float): 設定了可排班日 (例如某月不行、只有週末) 的會員比例。
+        availability_year (int): 可排班日資料的年份。
+        seed (int): 亂數種子，相同設定會產生相同的資料庫。
+    """
+    members: int = 10_000
+    region_depth: int = 4
+    region_fanout: int = 5
+    position_roots: int = 4
+    position_depth: int = 3
+    position_fanout: int = 3
+    schedulable_ratio: float = 0.8
+    restricted_ratio: float = 0.3
+    availability_year: int = 2026
+    seed: int = 20251019
+
+
+def fixture_path(scale: str) -> str:
+    """返回預設規模測試資料庫的檔案路徑。
+
+    Args:
+        scale (str): SCALES 中的鍵值，例如 "100k"。
+
+    Returns:
+        str: 資料庫檔案路徑。
+    """
+    return os.path.join(FIXTURE_DIR, f"members_{scale}.db")
+
+
+def fixture_is_current(path: str) -> bool:
+    """檢查既有的測試資料庫是否與目前的程式碼相符。
+
+    遷移版本必須是程式碼的 head、模型的資料表與欄位都存在，且產生器版本 (FIXTURE_VERSION) 相同；
+    否則是結構變更前產生的舊資料庫，應重新產生。
+
+    Args:
+        path (str): 資料庫檔案路徑。
+
+    Returns:
+        bool: 可以直接使用時返回 True。
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        revision, _ = read_schema_state(engine)
+        if revision is None or revision != get_code_head_revision():
+            return False
+        if not set(Base.metadata.tables).issubset(inspect(engine).get_table_names()) or missing_columns(engine):
+            return False
+        with engine.connect() as connection:
+            return connection.execute(text("PRAGMA application_id")).scalar() == FIXTURE_VERSION
+    finally:
+        engine.dispose()
+
+
+def ensure_fixture(scale: str) -> str:
+    """取得預設規模的測試資料庫；不存在或與目前的資料庫結構不符時重新產生。
+
+    Args:
+        scale (str): SCALES 中的鍵值，例如 "100k"。
+
+    Returns:
+        str: 資料庫檔案路徑。
+    """
+    path = fixture_path(scale)
+    if os.path.exists(path):
+        if fixture_is_current(path):
+            return path
+        logger.info(f"Fixture {path} does not match the current schema; regenerating.")
+    generate_fixture(path, FixtureSpec(members=SCALES[scale]))
+    return path
+
+
+def _enable_bulk_load_pragmas(engine: Engine):
+    # 測試資料庫可隨時重建，因此關閉日誌與同步以換取寫入速度
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode = OFF")
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA cache_size = -262144")
+        cursor.close()
+
+
+def _insert_batched(connection, table, columns, rows):
+    """以 DB-API executemany 批次寫入 tuple 資料列，略過 ORM 與 dict 參數的額外開銷。"""
+    statement = insert(table).compile(dialect=connection.dialect, column_keys=columns)
+    # 編譯後的參數順序依資料表欄位順序排列，必要時重新排列 tuple
+    order = [columns.index(key) for key in statement.positiontup]
+    if order != list(range(len(columns))):
+        reorder = itemgetter(*order)
+        rows = [reorder(row) for row in rows]
+    sql = str(statement)
+    for start in range(0, len(rows), _INSERT_BATCH_SIZE):
+        connection.exec_driver_sql(sql, rows[start:start + _INSERT_BATCH_SIZE])
+
+
+def _build_tree(level_labels, roots, depth, fanout):
+    """以廣度優先順序產生樹狀節點 (id, name, parent_id, rank, level)。"""
+    nodes = []
+    current_level = []
+    for i in range(roots):
+        node_id = len(nodes) + 1
+        nodes.append((node_id, f"{level_labels[0]}{i + 1:02d}", None, i, 0))
+        current_level.append(node_id)
+
+    for level in range(1, depth):
+        label = level_labels[min(level, len(level_labels) - 1)]
+        next_level = []
+        for parent_id in current_level:
+            for i in range(fanout):
+                node_id = len(nodes) + 1
+                nodes.append((node_id, f"{label}{parent_id}-{i + 1:02d}", parent_id, i, level))
+                next_level.append(node_id)
+        current_level = next_level
+    return nodes
+
+
+def _name_pool() -> list[str]:
+    """所有「姓 + 一到兩字名」的組合，抽樣時直接從中挑選。"""
+    singles = [surname + c for surname in SURNAMES for c in GIVEN_CHARS]
+    doubles = [surname + a + b for surname in SURNAMES for a in GIVEN_CHARS for b in GIVEN_CHARS]
+    return singles + doubles
+
+
+def generate_fixture(path: str, spec: FixtureSpec) -> str:
+    """依據設定產生一個新的測試資料庫，若檔案已存在會被覆寫。
+
+    Args:
+        path (str): 輸出的 SQLite 檔案路徑。
+        spec (FixtureSpec): 資料規模設定。
+
+    Returns:
+        str: 輸出的檔案路徑。
+    """
+    started = perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+
+    engine = create_engine(f"sqlite:///{path}")
+    _enable_bulk_load_pragmas(engine)
+    create_schema(engine)
+    rng = random.Random(spec.seed)
+
+    regions = _build_tree(REGION_LEVEL_LABELS, spec.region_fanout, spec.region_depth, spec.region_fanout)
+    positions = _build_tree(POSITION_LEVEL_LABELS, spec.position_roots, spec.position_depth, spec.position_fanout)
+    deepest_level = spec.region_depth - 1
+    leaf_region_ids = [r[0] for r in regions if r[4] == deepest_level]
+    inner_region_ids = [r[0] for r in regions if r[4] != deepest_level] or leaf_region_ids
+    position_ids = [p[0] for p in positions]
+
+    # 以整批抽樣產生各欄位，避免逐筆呼叫 random 的開銷
+    n = spec.members
+    names = rng.choices(_name_pool(), k=n)
+    # 大部分會員屬於最底層地區，少數 (幹部) 直接屬於上層地區
+    leaf_picks = rng.choices(leaf_region_ids, k=n)
+    inner_picks = rng.choices(inner_region_ids, k=n)
+    inner_flags = rng.choices((False, True), weights=(0.9, 0.1), k=n)
+    schedulable = rng.choices((1, 0), weights=(spec.schedulable_ratio, 1 - spec.schedulable_ratio), k=n)
+    has_phone = rng.choices((True, False), weights=(0.9, 0.1), k=n)
+    departments = rng.choices(range(1, len(DEPARTMENT_NAMES) + 1), k=n)
+    qualification_masks = [0] * n
+    for bit, (_, ratio) in enumerate(QUALIFICATIONS):
+        for i, granted in enumerate(rng.choices((1, 0), weights=(ratio, 1 - ratio), k=n)):
+            qualification_masks[i] |= granted << bit
+
+    member_rows = [
+        (
+            i + 1,
+            names[i],
+            f"09{(i * _PHONE_STRIDE) % 100_000_000:08d}" if has_phone[i] else None,
+            schedulable[i],
+            inner_picks[i] if inner_flags[i] else leaf_picks[i],
+            departments[i],
+            qualification_masks[i],
+        )
+        for i in range(n)
+    ]
+
+    # 每位會員一到三個不重複的職務：以第一個職務的位置加上遞增的位移量取得其餘職務
+    position_count = len(position_ids)
+    counts = rng.choices((1, 2, 3), weights=(0.6, 0.3, 0.1), k=n)
+    first_picks = rng.choices(range(position_count), k=n)
+    offsets = rng.choices(range(1, max(position_count // 3, 2)), k=2 * n)
+    member_position_rows = []
+    for i in range(n):
+        index = first_picks[i]
+        member_position_rows.append((i + 1, position_ids[index], True))
+        for extra in range(min(counts[i], position_count) - 1):
+            index = (index + offsets[2 * i + extra]) % position_count
+            member_position_rows.append((i + 1, position_ids[index], False))
+
+    # 部分會員有可排班日限制：某一個月不能排班，或只有週末可以
+    year = spec.availability_year
+    patterns = [pack_days(~month_days(year, [month])) for month in range(1, 13)]
+    patterns.append(pack_days(weekday_days(year, [5, 6])))
+    restricted = rng.choices((True, False), weights=(spec.restricted_ratio, 1 - spec.restricted_ratio), k=n)
+    pattern_picks = rng.choices(patterns, k=n)
+    availability_rows = [(i + 1, year, pattern_picks[i]) for i in range(n) if restricted[i]]
+
+    with engine.begin() as connection:
+        # 先移除次要索引，資料寫入後再一次建立，比逐筆維護索引快得多
+        member_indexes = list(Member.__table__.indexes)
+        for index in member_indexes:
+            index.drop(connection)
+
+        _insert_batched(connection, Department.__table__, ["id", "name"],
+                        [(i + 1, name) for i, name in enumerate(DEPARTMENT_NAMES)])
+        # 節點以廣度優先順序排列，父節點的 path 一定先算出來
+        region_paths = {}
+        for region_id, _, parent_id, _, _ in regions:
+            region_paths[region_id] = make_path(region_paths.get(parent_id), region_id)
+        _insert_batched(connection, Region.__table__, ["id", "name", "parent_id", "path"],
+                        [(r[0], r[1], r[2], region_paths[r[0]]) for r in regions])
+        position_sort_keys = {}
+        for position_id, _, parent_id, rank, _ in positions:
+            position_sort_keys[position_id] = make_sort_key(position_sort_keys.get(parent_id), rank, position_id)
+        _insert_batched(connection, Position.__table__, ["id", "name", "parent_id", "rank", "sort_key"],
+                        [(p[0], p[1], p[2], p[3], position_sort_keys[p[0]]) for p in positions])
+        # create_schema 不會執行遷移中的預設資格，這裡建立完整的資格目錄
+        _insert_batched(connection, Qualification.__table__, ["id", "name", "bit"],
+                        [(bit + 1, name, bit) for bit, (name, _) in enumerate(QUALIFICATIONS)])
+        _insert_batched(connection, Member.__table__,
+                        ["id", "name", "phone_number", "is_schedulable", "region_id", "department_id",
+                         "qualification_mask"],
+                        member_rows)
+        _insert_batched(connection, MemberPosition.__table__, ["member_id", "position_id", "is_primary"],
+                        member_position_rows)
+        _insert_batched(connection, MemberAvailability.__table__, ["member_id", "year", "bitmap"], availability_rows)
+
+        for index in member_indexes:
+            index.create(connection)
+
+    mark_seeded(engine)
+    with engine.begin() as connection:
+        # PRAGMA 不支援參數綁定，這裡的值一定是整數
+        connection.execute(text(f"PRAGMA application_id = {int(FIXTURE_VERSION)}"))
+    engine.dispose()
+    logger.info(
+        f"Generated fixture {path}: {spec.members} members, {len(regions)} regions, "
+        f"{len(positions)} positions, {len(member_position_rows)} assignments, "
+        f"{len(availability_rows)} availability bitmaps "
+        f"in {perf_counter() - started:.1f} s."
+    )
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="產生大量會員資料的測試資料庫。")
+    parser.add_argument("--scale", choices=sorted(SCALES), help="使用預設規模並輸出到 data/fixtures/。")
+    parser.add_argument("--members", type=int, default=FixtureSpec.members, help="會員數。")
+    parser.add_argument("--depth", type=int, default=FixtureSpec.region_depth, help="地區樹的層數。")
+    parser.add_argument("--fanout", type=int, default=FixtureSpec.region_fanout, help="每個地區的子地區數。")
+    parser.add_argument("--seed", type=int, default=FixtureSpec.seed, help="亂數種子。")
+    parser.add_argument("--out", help="輸出的資料庫檔案路徑。")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)-8s - %(message)s")
+    members = SCALES[args.scale] if args.scale else args.members
+    out = args.out or (fixture_path(args.scale) if args.scale else os.path.join(FIXTURE_DIR, f"members_{members}.db"))
+    spec = FixtureSpec(members=members, region_depth=args.depth, region_fanout=args.fanout, seed=args.seed)
+    generate_fixture(out, spec)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""基準測試的共用工具。
+
+提供計時、結果輸出為 JSON，以及與已儲存基準 (baseline) 比較的功能。
+各個 bench_*.py 腳本只需定義要量測的案例，再呼叫 run_cli()。
+
+基準檔案 (benchmarks/baselines/<suite>.json) 不納入版本控制：量測值取決於執行的機器，
+別台機器的基準沒有比較意義。第一次在某台機器上執行前，先以 --update-baseline 建立基準::
+
+    python -m benchmarks.bench_hot_paths --update-baseline
+
+沒有基準時只會輸出結果並提示建立基準，不做退步比較 (結束碼為 0)。
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from time import perf_counter
+from typing import Callable, Iterable
+
+from benchmarks.fixture_generator import SCALES, ensure_fixture
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCHMARK_DIR, "baselines")
+RESULT_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+# 與基準相比慢超過此比例才視為退步
+DEFAULT_TOLERANCE = 0.25
+# 差距小於此毫秒數時視為量測雜訊，不判定退步
+NOISE_FLOOR_MS = 1.0
+
+# working_copy() 建立的 (行程 ID, 暫存目錄)；run_cli() 結束或程式結束時刪除
+_working_dirs: list[tuple[int, str]] = []
+
+
+@dataclass
+class BenchmarkResult:
+    """單一案例的量測結果 (毫秒)。"""
+    name: str
+    median_ms: float
+    min_ms: float
+    max_ms: float
+    runs: int
+    extra: dict = field(default_factory=dict)
+
+
+@dataclass
+class Regression:
+    """與基準比較後判定為退步的案例。"""
+    name: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ms / self.baseline_ms if self.baseline_ms else float("inf")
+
+
+def measure(name: str, func: Callable[[], object], repeat: int = 5, warmup: int = 1,
+            setup: Callable[[], None] | None = None) -> BenchmarkResult:
+    """重複執行 func 並記錄每次耗時。
+
+    Args:
+        name (str): 案例名稱。
+        func (Callable[[], object]): 要量測的函式。
+        repeat (int): 正式量測的次數。
+        warmup (int): 量測前先執行而不計時的次數。
+        setup (Callable[[], None] | None): 每次執行前呼叫、不計入時間的準備函式。
+
+    Returns:
+        BenchmarkResult: 量測結果。
+    """
+    timings = []
+    for i in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        started = perf_counter()
+        func()
+        elapsed = (perf_counter() - started) * 1000
+        if i >= warmup:
+            timings.append(elapsed)
+
+    result = BenchmarkResult(
+        name=name,
+        median_ms=round(statistics.median(timings), 3),
+        min_ms=round(min(timings), 3),
+        max_ms=round(max(timings), 3),
+        runs=repeat,
+    )
+    logger.info(f"{name:<60} median {result.median_ms:>10.2f} ms  (min {result.min_ms:.2f}, max {result.max_ms:.2f})")
+    return result
+
+
+def working_copy(scale: str) -> str:
+    """複製一份測試資料庫到暫存目錄，讓會寫入資料的案例不影響原本的 fixture。
+
+    暫存目錄在 run_cli() 結束時 (直接呼叫時則在程式結束時) 由 remove_working_copies() 刪除。
+
+    Args:
+        scale (str): SCALES 中的鍵值。
+
+    Returns:
+        str: 暫存資料庫檔案路徑。
+    """
+    source = ensure_fixture(scale)
+    directory = tempfile.mkdtemp(prefix="sgiplan_bench_")
+    _working_dirs.append((os.getpid(), directory))
+    target = os.path.join(directory, os.path.basename(source))
+    shutil.copyfile(source, target)
+    return target
+
+
+def remove_working_copies():
+    """刪除這個行程以 working_copy() 建立的暫存資料庫。
+
+    只刪除自己建立的目錄：以 fork 建立的子行程會繼承清單，但不能刪除父行程仍在使用的複本。
+    """
+    pid = os.getpid()
+    remaining = []
+    for owner, directory in _working_dirs:
+        if owner == pid:
+            shutil.rmtree(directory, ignore_errors=True)
+        else:
+            remaining.append((owner, directory))
+    _working_dirs[:] = remaining
+
+
+atexit.register(remove_working_copies)
+
+
+def write_results(path: str, suite: str, results: Iterable[BenchmarkResult]):
+    """將量測結果寫成 JSON 檔案。"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    payload = {
+        "suite": suite,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "machine": platform.platform(),
+        "results": {r.name: asdict(r) for r in results},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path: str) -> dict[str, dict]:
+    """讀取 write_results() 產生的 JSON，返回 案例名稱 -> 結果。"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare_with_baseline(results: Iterable[BenchmarkResult], baseline: dict[str, dict],
+                          tolerance: float = DEFAULT_TOLERANCE) -> list[Regression]:
+    """比較量測結果與基準，找出變慢超過容許範圍的案例。
+
+    Args:
+        results (Iterable[BenchmarkResult]): 本次量測結果。
+        baseline (dict[str, dict]): load_results() 讀出的基準。
+        tolerance (float): 容許的變慢比例，例如 0.25 代表 25%。
+
+    Returns:
+        list[Regression]: 退步的案例；基準中沒有的案例會被略過。
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            continue
+        baseline_ms = reference["median_ms"]
+        limit = baseline_ms * (1 + tolerance)
+        if result.median_ms > limit and result.median_ms - baseline_ms > NOISE_FLOOR_MS:
+            regressions.append(Regression(result.name, baseline_ms, result.median_ms))
+    return regressions
+
+
+def run_cli(suite: str, run_cases: Callable[[str, int], list[BenchmarkResult]], argv=None,
+            default_scales=("10k",), scale_choices=SCALES) -> int:
+    """基準測試腳本的共用命令列進入點。
+
+    Args:
+        suite (str): 測試套件名稱，同時作為結果與基準檔案的檔名。
+        run_cases (Callable[[str, int], list[BenchmarkResult]]): 依 (規模, 重複次數) 執行案例的函式。
+        argv (list[str] | None): 命令列參數，預設使用 sys.argv。
+        default_scales (tuple[str, ...]): 未指定 --scale 時使用的規模。
+        scale_choices (Iterable[str]): --scale 可用的選項，預設為測試資料庫的規模。
+
+    Returns:
+        int: 程式結束碼，有退步時為 1。
+    """
+    parser = argparse.ArgumentParser(description=f"執行 {suite} 基準測試並與基準比較。")
+    parser.add_argument("--scale", action="append", choices=sorted(scale_choices),
+                        help="測試資料規模，可重複指定。")
+    parser.add_argument("--repeat", type=int, default=5, help="每個案例的量測次數。")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="容許的變慢比例 (預設 0.25 = 25%%)。")
+    parser.add_argument("--baseline", default=os.path.join(BASELINE_DIR, f"{suite}.json"),
+                        help="基準檔案路徑。")
+    parser.add_argument("--output", default=os.path.join(RESULT_DIR, f"{suite}.json"),
+                        help="結果輸出路徑。")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="以本次結果覆寫基準檔案。")
+    args = parser.parse_args(argv)
+
+    # 只顯示基準測試本身的訊息，被量測程式碼的 log 會干擾輸出也會影響計時
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)-8s - %(message)s")
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+    results = []
+    try:
+        for scale in args.scale or default_scales:
+            results.extend(run_cases(scale, args.repeat))
+    finally:
+        remove_working_copies()
+
+    write_results(args.output, suite, results)
+    logger.info(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        write_results(args.baseline, suite, results)
+        logger.info(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        logger.warning(f"No baseline at {args.baseline}; regressions were NOT checked. "
+                       f"Run with --update-baseline on this machine to create one.")
+        return 0
+
+    regressions = compare_with_baseline(results, load_results(args.baseline), args.tolerance)
+    for regression in regressions:
+        logger.error(
+            f"REGRESSION {regression.name}: {regression.baseline_ms:.2f} ms -> "
+            f"{regression.current_ms:.2f} ms (x{regression.ratio:.2f})"
+        )
+    if regressions:
+        return 1
+    logger.info(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
@@ -0,0 +1,169 @@
+"""GUI 執行緒卡頓監測模組。
+
+提供 GuiStallWatchdog：背景執行緒定時向 Qt 事件迴圈送出 ping，若 GUI 執行緒
+超過門檻時間 (預設 100 ms) 仍未處理，便以 ``sys._current_frames`` 擷取 GUI 執行緒
+當下的 Python 呼叫堆疊。事件迴圈恢復後，將卡頓時間、堆疊、目前分頁與正在執行的
+ViewModel 操作寫入 log。
+
+環境變數：
+
+* ``SGIPLAN_STALL_MS``：卡頓門檻 (毫秒)，設為 ``0`` 則停用監測。
+* ``SGIPLAN_DEBUG=1``：除錯模式，在狀態列顯示卡頓次數。
+"""
+
+import logging
+import os
+import sys
+import threading
+import traceback
+from time import perf_counter
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+logger = logging.getLogger(__name__)
+
+STALL_THRESHOLD_ENV_VAR = "SGIPLAN_STALL_MS"
+DEBUG_ENV_VAR = "SGIPLAN_DEBUG"
+
+DEFAULT_THRESHOLD_MS = 100
+# 事件迴圈完全沒有回應超過此時間時，不等恢復就先寫入 log，避免當機時毫無紀錄
+FREEZE_REPORT_MS = 5000
+# 只擷取堆疊最內層的幾個 frame，log 才不會過長
+STACK_LIMIT = 25
+
+
+def _find_viewmodel_operation(frame) -> str | None:
+    """從最內層往外找出第一個屬於 viewmodels 套件的 frame，返回 "類別.方法"。"""
+    while frame is not None:
+        module_name = frame.f_globals.get("__name__", "")
+        if module_name.startswith("viewmodels."):
+            code = frame.f_code
+            return getattr(code, "co_qualname", code.co_name)
+        frame = frame.f_back
+    return None
+
+
+class GuiStallWatchdog(QObject):
+    """監測 GUI 執行緒是否被長時間阻塞。
+
+    必須在 GUI 執行緒中建立。監測執行緒只讀寫本物件的純 Python 屬性，
+    不會直接存取任何 Qt widget。
+
+    Attributes:
+        threshold_ms (float): 視為卡頓的門檻 (毫秒)。
+        debug (bool): 是否為除錯模式 (在狀態列顯示卡頓次數)。
+        stall_count (int): 至今偵測到的卡頓次數。
+        active_tab (str | None): 目前的分頁名稱，由主視窗更新。
+    """
+
+    # 卡頓結束時在 GUI 執行緒發出 (卡頓毫秒數, 累計次數)
+    stall_detected = Signal(float, int)
+    # 由監測執行緒發出，經由 queued connection 在 GUI 執行緒處理
+    _ping = Signal()
+
+    def __init__(self, threshold_ms: float = DEFAULT_THRESHOLD_MS, debug: bool = False, parent=None):
+        """初始化卡頓監測器。
+
+        Args:
+            threshold_ms (float): 視為卡頓的門檻 (毫秒)。
+            debug (bool): 是否為除錯模式。
+            parent (QObject | None): 父物件。
+        """
+        super().__init__(parent)
+        self.threshold_ms = threshold_ms
+        self.debug = debug
+        self.stall_count = 0
+        self.active_tab = None
+
+        self._gui_thread_id = threading.get_ident()
+        # 檢查間隔取門檻的一半，卡頓時間的量測誤差最多為此間隔
+        self._interval = max(threshold_ms / 2, 10) / 1000
+        self._lock = threading.Lock()
+        self._ping_sent_at = None
+        self._stall_stack = None
+        self._stall_operation = None
+        self._freeze_reported = False
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._ping.connect(self._on_ping)
+
+    @classmethod
+    def from_environment(cls, parent=None) -> "GuiStallWatchdog | None":
+        """依據環境變數建立監測器；若門檻設為 0 則返回 None。"""
+        try:
+            threshold_ms = float(os.environ.get(STALL_THRESHOLD_ENV_VAR, DEFAULT_THRESHOLD_MS))
+        except ValueError:
+            logger.warning(f"Invalid {STALL_THRESHOLD_ENV_VAR}, using {DEFAULT_THRESHOLD_MS} ms.")
+            threshold_ms = DEFAULT_THRESHOLD_MS
+        if threshold_ms <= 0:
+            return None
+        debug = os.environ.get(DEBUG_ENV_VAR, "").strip() not in ("", "0")
+        return cls(threshold_ms=threshold_ms, debug=debug, parent=parent)
+
+    def start(self):
+        """啟動監測執行緒。"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="GuiStallWatchdog", daemon=True)
+        self._thread.start()
+        logger.debug(f"GUI stall watchdog started (threshold {self.threshold_ms:.0f} ms).")
+
+    def stop(self):
+        """停止監測執行緒並等待其結束。"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            now = perf_counter()
+            with self._lock:
+                if self._ping_sent_at is None:
+                    self._ping_sent_at = now
+                    self._stall_stack = None
+                    self._stall_operation = None
+                    self._freeze_reported = False
+                    send_ping = True
+                else:
+                    send_ping = False
+                    elapsed_ms = (now - self._ping_sent_at) * 1000
+                    if elapsed_ms >= self.threshold_ms and self._stall_stack is None:
+                        self._capture_gui_stack()
+                    if elapsed_ms >= FREEZE_REPORT_MS and not self._freeze_reported:
+                        self._freeze_reported = True
+                        self._log_stall(elapsed_ms, ongoing=True)
+            if send_ping:
+                self._ping.emit()
+
+    def _capture_gui_stack(self):
+        """擷取 GUI 執行緒目前的 Python 堆疊 (在監測執行緒中呼叫)。"""
+        frame = sys._current_frames().get(self._gui_thread_id)
+        if frame is None:
+            self._stall_stack = []
+            return
+        self._stall_stack = traceback.format_stack(frame, limit=STACK_LIMIT)
+        self._stall_operation = _find_viewmodel_operation(frame)
+
+    @Slot()
+    def _on_ping(self):
+        with self._lock:
+            sent_at = self._ping_sent_at
+            self._ping_sent_at = None
+            if sent_at is None or self._stall_stack is None:
+                return
+            elapsed_ms = (perf_counter() - sent_at) * 1000
+            self.stall_count += 1
+            self._log_stall(elapsed_ms, ongoing=False)
+        self.stall_detected.emit(elapsed_ms, self.stall_count)
+
+    def _log_stall(self, elapsed_ms: float, ongoing: bool):
+        state = "still blocked after" if ongoing else "blocked for"
+        stack = "".join(self._stall_stack) if self._stall_stack else "  (stack unavailable)\n"
+        logger.warning(
+            f"GUI thread {state} {elapsed_ms:.0f} ms "
+            f"(tab: {self.active_tab or '-'}, operation: {self._stall_operation or '-'}). "
+            f"Stack at {self.threshold_ms:.0f} ms:\n{stack.rstrip()}"
+        )
@@ -1,61 +1,40 @@
 import sys
 import logging
-from PySide6.QtWidgets import QApplication
 
 import logging_config
-from views.main_window import MainWindow
-from viewmodels.main_viewmodel import MainViewModel
-from models import Base, engine, Session, Member, Department
+from startup_profiler import StartupProfiler
+
+if __name__ == "__main__":
+    # 必須在匯入 PySide6 / SQLAlchemy 之前安裝，才能量測到所有模組的匯入時間
+    profiler = StartupProfiler.from_environment()
+    profiler.install()
 
-if __name__ == "__main__":    
     logging_config.setup_logging()
     logger = logging.getLogger(__name__)
 
+    from PySide6.QtWidgets import QApplication
+    from models import engine, Session
+    from services.database_bootstrap import bootstrap_database
+    profiler.mark("core_imports_done")
+
     # Initialize the database
     logger.info("Application started.")
     logger.debug("Initializing database.")
 
-    # Create all tables in the database
-    logger.info("Creating database tables if they don't exist.")
-    Base.metadata.create_all(bind=engine)
+    # 檢查資料庫版本，只有在需要時才執行遷移或建立初始資料
+    bootstrap_database(engine, Session)
+    profiler.mark("database_ready")
 
     # Create a single session for the application lifetime
     db_session = Session()
 
     try:
-        # Seed departments if they don't exist
-        if db_session.query(Department).count() == 0:
-            logger.info("No departments found, seeding initial data.")
-            departments = [
-                Department(name="壯年部"),
-                Department(name="婦人部"),
-                Department(name="男子部"),
-                Department(name="女子部"),
-            ]
-            db_session.add_all(departments)
-            db_session.flush() # Explicitly flush before commit
-            db_session.commit()
-            logger.info("Departments seeded successfully.")
-        else:
-            logger.info("Departments already exist, skipping seeding.")
-
-        # Add sample data if the database is empty
-        if db_session.query(Member).count() == 0:
-            logger.info("No members found, adding sample data.")
-            sample_members = [
-                Member(name="張三"),
-                Member(name="李四"),
-                Member(name="王五"),
-            ]
-            db_session.add_all(sample_members)
-            db_session.flush() # Explicitly flush before commit
-            db_session.commit()
-            logger.info("Sample members seeded successfully.")
-        else:
-            logger.info("Members already exist, skipping seeding.")
-
         app = QApplication(sys.argv)
 
+        from views.main_window import MainWindow
+        from viewmodels.main_viewmodel import MainViewModel
+        profiler.mark("ui_imports_done")
+
         # Create the ViewModel and pass the shared session
         logger.info("Initializing ViewModel.")
         viewmodel = MainViewModel(db_session)
@@ -63,7 +42,18 @@ if __name__ == "__main__":
         # Create the View and pass the ViewModel to it
         logger.info("Initializing View.")
         view = MainWindow(viewmodel)
+        profiler.watch_first_paint(view)
+        view.initial_tab_loaded.connect(lambda: (profiler.mark("initial_tab_loaded"), profiler.report()))
         view.show()
+        profiler.mark("window_shown")
+
+        # 監測 GUI 執行緒卡頓，記錄阻塞時的呼叫堆疊
+        from gui_watchdog import GuiStallWatchdog
+        watchdog = GuiStallWatchdog.from_environment(parent=app)
+        if watchdog is not None:
+            view.attach_watchdog(watchdog)
+            watchdog.start()
+            app.aboutToQuit.connect(watchdog.stop)
 
         logger.info("Starting application event loop.")
         exit_code = app.exec()
@@ -71,4 +61,4 @@ if __name__ == "__main__":
         sys.exit(exit_code)
     finally:
         # Ensure the session is closed when the application exits
-        db_session.close()
\ No newline at end of file
+        db_session.close()
@@ -5,6 +5,13 @@ from .position_model import Position
 from .region_model import Region
 from .member_position_model import MemberPosition
 from .department_model import Department
+from .member_availability_model import MemberAvailability
+from .member_duty_load_model import MemberDutyLoad
+from .duty_slot_model import DutySlot, DutySlotPosition
+from .duty_assignment_model import DutyAssignment
+from .activity_model import Activity, ActivityParticipant
+from .activity_attendance_model import ActivityAttendance
+from .qualification_model import Qualification
 
 __all__ = [
     'Base',
@@ -16,4 +23,13 @@ __all__ = [
     'Region',
     'MemberPosition',
     'Department',
+    'MemberAvailability',
+    'MemberDutyLoad',
+    'DutySlot',
+    'DutySlotPosition',
+    'DutyAssignment',
+    'Activity',
+    'ActivityParticipant',
+    'ActivityAttendance',
+    'Qualification',
 ]
\ No newline at end of file
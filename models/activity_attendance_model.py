@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, LargeBinary, ForeignKey
+from sqlalchemy.orm import relationship
+from .database import Base
+
+class ActivityAttendance(Base):
+    __tablename__ = 'activity_attendance'
+
+    activity_id = Column(Integer, ForeignKey('activities.id'), primary_key=True)
+    # 舉行日期的日鍵 (自 1970-01-01 起的天數)；重複活動每次舉行各一列
+    day = Column(Integer, primary_key=True, index=True)
+    # 以會員 ID 為位元位置的點陣圖 (numpy.packbits, bitorder='little')：
+    # expected 為應出席者 (記錄當時的參與者加上實際出席者)，attended 為實際出席者
+    expected = Column(LargeBinary, nullable=False)
+    attended = Column(LargeBinary, nullable=False)
+    expected_count = Column(Integer, default=0, nullable=False)
+    attended_count = Column(Integer, default=0, nullable=False)
+
+    activity = relationship("Activity", back_populates="attendance")
+
+    def __repr__(self):
+        return (f"<ActivityAttendance(activity_id={self.activity_id}, day={self.day}, "
+                f"attended={self.attended_count}/{self.expected_count})>")
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from .database import Base
+
+class Activity(Base):
+    __tablename__ = 'activities'
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True, nullable=False)
+    description = Column(String, nullable=True)
+    activity_date = Column(Date, index=True, nullable=False)
+    # 當天開始與結束時間 (自午夜起算的分鐘數)
+    start_minute = Column(Integer, default=0, nullable=False)
+    end_minute = Column(Integer, default=1440, nullable=False)
+    region_id = Column(Integer, ForeignKey('regions.id'), nullable=True)
+    # 重複活動的週期規則 (iCalendar RRULE 子集，見 services/recurrence.py)；None 表示不重複。
+    # 每一次舉行都不會寫成資料列，查詢時才依區間展開
+    recurrence = Column(String, nullable=True)
+    # 重複活動最後可能舉行的日期 (由規則的 UNTIL/COUNT 推得)，供區間查詢預先篩選；None 表示沒有結束
+    recurrence_end = Column(Date, nullable=True)
+
+    region = relationship("Region")
+    participants = relationship("ActivityParticipant", back_populates="activity", cascade="all, delete-orphan")
+    attendance = relationship("ActivityAttendance", back_populates="activity", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<Activity(id={self.id}, name='{self.name}', activity_date={self.activity_date})>"
+
+
+class ActivityParticipant(Base):
+    __tablename__ = 'activity_participants'
+    # 以 (activity_id, member_id) 叢集存放，同一活動的參與者在資料頁中相鄰
+    __table_args__ = (
+        Index('ix_activity_participants_member_activity', 'member_id', 'activity_id'),
+        {'sqlite_with_rowid': False},
+    )
+
+    activity_id = Column(Integer, ForeignKey('activities.id'), primary_key=True)
+    member_id = Column(Integer, ForeignKey('members.id'), primary_key=True)
+
+    activity = relationship("Activity", back_populates="participants")
+    member = relationship("Member", back_populates="activities")
+
+    def __repr__(self):
+        return f"<ActivityParticipant(activity_id={self.activity_id}, member_id={self.member_id})>"
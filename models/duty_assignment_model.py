@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from .database import Base
+
+class DutyAssignment(Base):
+    __tablename__ = 'duty_assignments'
+    # 以 (day, slot_id, member_id) 叢集存放，同一天的排班在資料頁中相鄰；
+    # WITHOUT ROWID 省去額外的 rowid 與主鍵索引，每筆只存一次
+    __table_args__ = (
+        Index('ix_duty_assignments_member_day', 'member_id', 'day'),
+        {'sqlite_with_rowid': False},
+    )
+
+    # 自 1970-01-01 起算的天數 (與 numpy datetime64[D] 相同)
+    day = Column(Integer, primary_key=True)
+    slot_id = Column(Integer, ForeignKey('duty_slots.id'), primary_key=True)
+    member_id = Column(Integer, ForeignKey('members.id'), primary_key=True)
+
+    member = relationship("Member", back_populates="duties")
+
+    def __repr__(self):
+        return f"<DutyAssignment(day={self.day}, slot_id={self.slot_id}, member_id={self.member_id})>"
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.orm import relationship
+from .database import Base
+
+class DutySlot(Base):
+    __tablename__ = 'duty_slots'
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, unique=True, nullable=False)
+    name = Column(String, nullable=False)
+    required = Column(Integer, default=1, nullable=False)
+    region_id = Column(Integer, ForeignKey('regions.id'), nullable=True)
+    # 開設的星期，第 n 個位元代表星期 n (0 = 週一)；127 表示每天
+    weekdays = Column(Integer, default=127, nullable=False)
+    start_minute = Column(Integer, default=0, nullable=False)
+    end_minute = Column(Integer, default=1440, nullable=False)
+
+    region = relationship("Region")
+    positions = relationship("DutySlotPosition", back_populates="slot", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<DutySlot(id={self.id}, key='{self.key}', name='{self.name}')>"
+
+
+class DutySlotPosition(Base):
+    __tablename__ = 'duty_slot_positions'
+
+    slot_id = Column(Integer, ForeignKey('duty_slots.id'), primary_key=True)
+    position_id = Column(Integer, ForeignKey('positions.id'), primary_key=True)
+
+    slot = relationship("DutySlot", back_populates="positions")
+
+    def __repr__(self):
+        return f"<DutySlotPosition(slot_id={self.slot_id}, position_id={self.position_id})>"
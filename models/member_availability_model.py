@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, LargeBinary, ForeignKey
+from sqlalchemy.orm import relationship
+from .database import Base
+
+# 一年最多 366 天，每天一個位元：ceil(366 / 8) = 46 bytes
+AVAILABILITY_BITMAP_BYTES = 46
+
+class MemberAvailability(Base):
+    __tablename__ = 'member_availability'
+
+    member_id = Column(Integer, ForeignKey('members.id'), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    # 第 n 個位元 (little-endian) 代表該年第 n + 1 天，1 = 可排班；沒有資料列的年份視為全年可排班
+    bitmap = Column(LargeBinary(AVAILABILITY_BITMAP_BYTES), nullable=False)
+
+    member = relationship("Member", back_populates="availability")
+
+    def __repr__(self):
+        return f"<MemberAvailability(member_id={self.member_id}, year={self.year})>"
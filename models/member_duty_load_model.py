@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+from sqlalchemy.orm import relationship
+from .database import Base
+
+class MemberDutyLoad(Base):
+    __tablename__ = 'member_duty_loads'
+
+    member_id = Column(Integer, ForeignKey('members.id'), primary_key=True)
+    # 以指數衰減累計的排班負擔，數值對應 as_of 當天
+    load = Column(Float, default=0.0, nullable=False)
+    as_of = Column(Date, nullable=False)
+    last_assigned = Column(Date, nullable=True)
+
+    member = relationship("Member", back_populates="duty_load")
+
+    def __repr__(self):
+        return f"<MemberDutyLoad(member_id={self.member_id}, load={self.load}, as_of={self.as_of})>"
@@ -1,17 +1,25 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 
 class Member(Base):
     __tablename__ = 'members'
+    # 「可排班、位於某些地區、具備某些資格」的篩選只需掃描這個索引
+    __table_args__ = (Index('ix_members_eligibility', 'is_schedulable', 'region_id', 'qualification_mask'),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
     phone_number = Column(String, unique=True, index=True, nullable=True)
     is_schedulable = Column(Integer, default=1, nullable=False)
-    region_id = Column(Integer, ForeignKey('regions.id'))
+    region_id = Column(Integer, ForeignKey('regions.id'), index=True)
     department_id = Column(Integer, ForeignKey('departments.id'), nullable=True)
+    # 具備的資格，每個位元對應一筆 Qualification.bit
+    qualification_mask = Column(Integer, default=0, nullable=False, server_default='0')
 
     region = relationship("Region", back_populates="members")
     positions = relationship("MemberPosition", back_populates="member", cascade="all, delete-orphan")
     department = relationship("Department", back_populates="members")
+    availability = relationship("MemberAvailability", back_populates="member", cascade="all, delete-orphan")
+    duty_load = relationship("MemberDutyLoad", back_populates="member", uselist=False, cascade="all, delete-orphan")
+    duties = relationship("DutyAssignment", back_populates="member", cascade="all, delete-orphan")
+    activities = relationship("ActivityParticipant", back_populates="member", cascade="all, delete-orphan")
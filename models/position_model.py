@@ -13,6 +13,9 @@ class Position(Base):
     rank = Column(Integer, nullable=False, server_default='0')
 
     parent_id = Column(Integer, ForeignKey('positions.id'), nullable=True)
+    # 深度優先排序鍵：由根到自身，每段為補零的 rank 與 ID，例如 "000000.00000001/000002.00000007/"。
+    # ORDER BY sort_key 即為樹狀顯示順序。由 PositionRepository 維護，不應直接修改。
+    sort_key = Column(String, index=True, nullable=True)
 
     parent = relationship("Position", remote_side=[id], back_populates="children", lazy="joined")
     children = relationship("Position", back_populates="parent", cascade="all, delete-orphan")
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String
+from .database import Base
+
+# 會員的資格以 members.qualification_mask 的位元記錄，SQLite 的整數為帶正負號的 64 位元，
+# 保留符號位元，最多 63 種資格
+MAX_QUALIFICATIONS = 63
+
+
+class Qualification(Base):
+    """資格目錄 (例如教學資格)。
+
+    每種資格佔用 members.qualification_mask 的一個位元；bit 由 QualificationRepository 分配，
+    建立後不應修改，否則既有會員的資格會對應到錯誤的項目。
+    """
+    __tablename__ = 'qualifications'
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+    bit = Column(Integer, unique=True, nullable=False)
+    description = Column(String, nullable=True)
+
+    @property
+    def mask(self) -> int:
+        return 1 << self.bit
+
+    def __repr__(self):
+        return f"<Qualification(id={self.id}, name='{self.name}', bit={self.bit})>"
@@ -10,6 +10,10 @@ class Region(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String(50), nullable=False)
     parent_id = Column(Integer, ForeignKey('regions.id'), nullable=True)
+    # 物化路徑：由根到自身的 ID，每段固定寬度補零，例如 "/00000001/00000005/"。
+    # 子樹內所有節點的 path 都以祖先的 path 為前綴，可用單一範圍條件查出整棵子樹。
+    # 由 RegionRepository 維護，不應直接修改。
+    path = Column(String, index=True, nullable=True)
 
     # --- 關係對應 ---
     # 對應到 Member 模型
@@ -20,5 +24,10 @@ class Region(Base):
     parent = relationship("Region", remote_side=[id], back_populates="children", lazy="joined")
     children = relationship("Region", back_populates="parent", cascade="all, delete-orphan")
 
+    @property
+    def depth(self) -> int:
+        """地區在樹中的深度，頂層為 0 (由 path 的段數計算)。"""
+        return self.path.count("/") - 2 if self.path else 0
+
     def __repr__(self):
-        return f"<Region(id={self.id}, name='{self.name}', parent_id={self.parent_id})>"
\ No newline at end of file
+        return f"<Region(id={self.id}, name='{self.name}', parent_id={self.parent_id}, path='{self.path}')>"
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""活動出席紀錄儲存庫模組。
+
+每次舉行的出席者存為一列點陣圖 (見 models/activity_attendance_model.py)，
+一整年的出席紀錄只有「舉行次數」列，不會隨出席人數增加。
+"""
+
+from typing import Iterable, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from models.activity_attendance_model import ActivityAttendance
+from repositories.base_repository import BaseRepository
+
+# (活動 ID, 日鍵, 應出席點陣圖, 出席點陣圖)
+AttendanceRow = Tuple[int, int, bytes, bytes]
+
+class ActivityAttendanceRepository(BaseRepository[ActivityAttendance]):
+    """專門用於處理 ActivityAttendance 模型資料庫操作的儲存庫。"""
+    def __init__(self, session: Session):
+        """初始化活動出席紀錄儲存庫。
+
+        Args:
+            session (Session): SQLAlchemy 的資料庫會話。
+        """
+        super().__init__(session, ActivityAttendance)
+
+    def save(self, activity_id: int, day: int, expected: bytes, attended: bytes,
+             expected_count: int, attended_count: int) -> None:
+        """寫入 (新增或覆寫) 一次舉行的出席紀錄。
+
+        此操作不會提交，需要呼叫 session.commit() 才會寫入資料庫。
+
+        Args:
+            activity_id (int): 活動 ID。
+            day (int): 舉行日期的日鍵。
+            expected (bytes): 應出席者點陣圖。
+            attended (bytes): 出席者點陣圖。
+            expected_count (int): 應出席人數。
+            attended_count (int): 出席人數。
+        """
+        statement = insert(self.model).values(
+            activity_id=activity_id, day=day, expected=expected, attended=attended,
+            expected_count=expected_count, attended_count=attended_count,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.activity_id, self.model.day],
+            set_={
+                "expected": statement.excluded.expected,
+                "attended": statement.excluded.attended,
+                "expected_count": statement.excluded.expected_count,
+                "attended_count": statement.excluded.attended_count,
+            },
+        )
+        self.session.execute(statement)
+
+    def get_row(self, activity_id: int, day: int) -> AttendanceRow | None:
+        """取得一次舉行的出席紀錄；尚未記錄時返回 None。"""
+        row = self.session.execute(
+            select(self.model.activity_id, self.model.day, self.model.expected, self.model.attended)
+            .where(self.model.activity_id == activity_id, self.model.day == day)
+        ).first()
+        return tuple(row) if row else None
+
+    def get_range(self, first_day: int, last_day: int,
+                  activity_ids: Iterable[int] | None = None) -> List[AttendanceRow]:
+        """以 tuple 取得期間內 (含首尾) 的出席紀錄，依日期排序。
+
+        Args:
+            first_day (int): 起始日鍵。
+            last_day (int): 結束日鍵。
+            activity_ids (Iterable[int] | None): 只包含這些活動；None 表示所有活動。
+
+        Returns:
+            List[AttendanceRow]: 出席紀錄。
+        """
+        statement = (
+            select(self.model.activity_id, self.model.day, self.model.expected, self.model.attended)
+            .where(self.model.day >= first_day, self.model.day <= last_day)
+            .order_by(self.model.day, self.model.activity_id)
+        )
+        if activity_ids is not None:
+            statement = statement.where(self.model.activity_id.in_(list(activity_ids)))
+        return [tuple(row) for row in self.session.execute(statement)]
@@ -0,0 +1,134 @@
+"""活動參與者儲存庫模組。
+
+批次指派 (例如「某地區子樹中持有某職務的所有可排班會員」) 以單一
+INSERT OR IGNORE ... SELECT 在資料庫內完成，不需把會員載入 Python 再逐筆新增；
+已經是參與者的會員會被略過。
+"""
+
+from typing import Iterable, List, Tuple
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from models.activity_model import Activity, ActivityParticipant
+from models.member_model import Member
+from models.region_model import Region
+from repositories.base_repository import BaseRepository
+from repositories.member_filter import MemberFilterRepository, member_criteria
+
+# (會員 ID, 姓名, 電話, 地區名稱)
+ParticipantRow = Tuple[int, str, str | None, str | None]
+
+class ActivityParticipantRepository(BaseRepository[ActivityParticipant]):
+    """專門用於處理 ActivityParticipant 模型資料庫操作的儲存庫。"""
+    def __init__(self, session: Session):
+        """初始化活動參與者儲存庫。
+
+        Args:
+            session (Session): SQLAlchemy 的資料庫會話。
+        """
+        super().__init__(session, ActivityParticipant)
+
+    def matching_members_query(self, region_id: int | None = None, position_id: int | None = None,
+                               schedulable_only: bool = True, qualification_mask: int = 0):
+        """返回符合條件之會員 ID 的 SELECT。
+
+        Args:
+            region_id (int | None): 只包含此地區子樹 (含自身) 的會員；None 表示不限地區。
+            position_id (int | None): 只包含持有此職務的會員；None 表示不限職務。
+            schedulable_only (bool): 是否只包含可排班的會員。
+            qualification_mask (int): 只包含具備遮罩中所有資格的會員；0 表示不限資格。
+
+        Returns:
+            Select: 查詢會員 ID 的陳述式。
+        """
+        criteria = member_criteria(region_id, None if position_id is None else [position_id],
+                                   qualification_mask, schedulable_only)
+        return MemberFilterRepository(self.session).select_ids(criteria)
+
+    def assign_matching(self, activity_id: int, region_id: int | None = None, position_id: int | None = None,
+                        schedulable_only: bool = True, qualification_mask: int = 0) -> int:
+        """以單一 INSERT ... SELECT 將符合條件的會員加入活動 (不提交)。
+
+        Args:
+            activity_id (int): 活動 ID。
+            region_id (int | None): 只包含此地區子樹 (含自身) 的會員；None 表示不限地區。
+            position_id (int | None): 只包含持有此職務的會員；None 表示不限職務。
+            schedulable_only (bool): 是否只包含可排班的會員。
+            qualification_mask (int): 只包含具備遮罩中所有資格的會員；0 表示不限資格。
+
+        Returns:
+            int: 新加入的參與者數 (已是參與者的會員不計)。
+        """
+        members = self.matching_members_query(region_id, position_id, schedulable_only, qualification_mask).subquery()
+        statement = insert(self.model).from_select(
+            ["activity_id", "member_id"], select(literal(activity_id), members.c.id)
+        ).prefix_with("OR IGNORE")
+        return self.session.execute(statement).rowcount
+
+    def add_members(self, activity_id: int, member_ids: Iterable[int]) -> int:
+        """以單一 executemany 將指定會員加入活動 (不提交)，已是參與者的會員會被略過。"""
+        parameters = [{"activity_id": activity_id, "member_id": member_id} for member_id in member_ids]
+        if not parameters:
+            return 0
+        return self.session.execute(insert(self.model.__table__).prefix_with("OR IGNORE"), parameters).rowcount
+
+    def remove_members(self, activity_id: int, member_ids: Iterable[int] | None = None) -> int:
+        """移除活動的參與者 (不提交)。
+
+        Args:
+            activity_id (int): 活動 ID。
+            member_ids (Iterable[int] | None): 要移除的會員；None 表示移除全部。
+
+        Returns:
+            int: 移除的參與者數。
+        """
+        statement = delete(self.model).where(self.model.activity_id == activity_id)
+        if member_ids is not None:
+            statement = statement.where(self.model.member_id.in_(list(member_ids)))
+        return self.session.execute(statement).rowcount
+
+    def count(self, activity_id: int) -> int:
+        """返回活動的參與者數。"""
+        return self.session.execute(
+            select(func.count()).select_from(self.model).where(self.model.activity_id == activity_id)
+        ).scalar()
+
+    def get_rows(self, activity_id: int) -> List[ParticipantRow]:
+        """以 tuple 取得活動的所有參與者，依姓名排序，不建立 ORM 物件。"""
+        statement = (
+            select(Member.id, Member.name, Member.phone_number, Region.name)
+            .join(self.model, self.model.member_id == Member.id)
+            .outerjoin(Region, Region.id == Member.region_id)
+            .where(self.model.activity_id == activity_id)
+            .order_by(Member.name, Member.id)
+        )
+        return [tuple(row) for row in self.session.execute(statement)]
+
+    def get_member_ids(self, activity_id: int) -> List[int]:
+        """返回活動所有參與者的會員 ID。"""
+        return list(self.session.execute(
+            select(self.model.member_id).where(self.model.activity_id == activity_id)
+        ).scalars())
+
+    def get_timed(self, activity_ids: Iterable[int],
+                  member_ids: Iterable[int] | None = None) -> List[Tuple[int, int, int, int]]:
+        """取得指定活動的參與者與活動當天的時段。
+
+        Args:
+            activity_ids (Iterable[int]): 活動 ID。
+            member_ids (Iterable[int] | None): 只查詢這些會員；None 表示全部。
+
+        Returns:
+            List[Tuple[int, int, int, int]]: (活動 ID, 會員 ID, 開始分鐘, 結束分鐘)。
+        """
+        activity_ids = list(activity_ids)
+        if not activity_ids:
+            return []
+        statement = (
+            select(self.model.activity_id, self.model.member_id, Activity.start_minute, Activity.end_minute)
+            .join(Activity, Activity.id == self.model.activity_id)
+            .where(self.model.activity_id.in_(activity_ids))
+        )
+        if member_ids is not None:
+            statement = statement.where(self.model.member_id.in_(list(member_ids)))
+        return [tuple(row) for row in self.session.execute(statement)]
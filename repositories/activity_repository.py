@@ -0,0 +1,77 @@
+"""活動儲存庫模組。"""
+
+from datetime import date
+from typing import Dict, List
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.orm import Session
+from models.activity_attendance_model import ActivityAttendance
+from models.activity_model import Activity, ActivityParticipant
+from repositories.base_repository import BaseRepository
+
+class ActivityRepository(BaseRepository[Activity]):
+    """專門用於處理 Activity 模型資料庫操作的儲存庫。"""
+    def __init__(self, session: Session):
+        """初始化活動儲存庫。
+
+        Args:
+            session (Session): SQLAlchemy 的資料庫會話。
+        """
+        super().__init__(session, Activity)
+
+    def search(self, search_term: str | None = None) -> List[Activity]:
+        """依名稱搜尋活動，依日期由新到舊排列。
+
+        Args:
+            search_term (str | None): 名稱搜尋關鍵字。
+
+        Returns:
+            List[Activity]: 符合條件的活動列表。
+        """
+        statement = select(self.model)
+        if search_term:
+            statement = statement.where(self.model.name.ilike(f"%{search_term}%"))
+        statement = statement.order_by(self.model.activity_date.desc(), self.model.start_minute, self.model.id)
+        return list(self.session.execute(statement).scalars().all())
+
+    def get_in_window(self, window_start: date, window_end: date) -> List[Activity]:
+        """取得可能在區間內 (含首尾) 舉行的活動。
+
+        不重複的活動依日期篩選；重複的活動只要在區間結束前開始、且 recurrence_end
+        不早於區間起始日就會返回，實際是否在區間內舉行由呼叫端展開規則判斷。
+
+        Args:
+            window_start (date): 區間起始日。
+            window_end (date): 區間結束日。
+
+        Returns:
+            List[Activity]: 可能在區間內舉行的活動。
+        """
+        statement = select(self.model).where(
+            self.model.activity_date <= window_end,
+            or_(
+                self.model.activity_date >= window_start,
+                and_(self.model.recurrence.is_not(None),
+                     or_(self.model.recurrence_end.is_(None), self.model.recurrence_end >= window_start)),
+            ),
+        )
+        return list(self.session.execute(statement).scalars().all())
+
+    def participant_counts(self) -> Dict[int, int]:
+        """以單一 GROUP BY 返回活動 ID -> 參與者數；沒有參與者的活動不會出現在結果中。"""
+        return dict(self.session.execute(
+            select(ActivityParticipant.activity_id, func.count()).group_by(ActivityParticipant.activity_id)
+        ).all())
+
+    def delete(self, entity: Activity) -> None:
+        """刪除活動與其所有參與者及出席紀錄。
+
+        參與者與出席紀錄各以單一 DELETE 移除，不會逐筆載入 ORM 物件。
+        此操作不會提交，需要呼叫 session.commit() 才會從資料庫移除。
+
+        Args:
+            entity (Activity): 要刪除的活動。
+        """
+        self.session.execute(delete(ActivityParticipant).where(ActivityParticipant.activity_id == entity.id))
+        self.session.execute(delete(ActivityAttendance).where(ActivityAttendance.activity_id == entity.id))
+        self.session.expire(entity, ["participants", "attendance"])
+        self.session.delete(entity)
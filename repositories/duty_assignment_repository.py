@@ -0,0 +1,193 @@
+"""排班紀錄儲存庫模組。
+
+duty_assignments 以 (day, slot_id, member_id) 為主鍵的 WITHOUT ROWID 表格，
+同一天的排班在 B-tree 中相鄰；另有 (member_id, day) 索引供「某位會員接下來的排班」使用。
+day 是自 1970-01-01 起算的天數，比日期字串小且可直接做範圍比較。
+"""
+
+from datetime import date, timedelta
+from itertools import islice
+from typing import Iterable, List, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from models.duty_assignment_model import DutyAssignment
+from models.duty_slot_model import DutySlot
+from models.member_model import Member
+from models.region_model import Region
+from repositories.base_repository import BaseRepository
+from repositories.region_repository import subtree_bounds
+
+EPOCH = date(1970, 1, 1)
+# 每次 executemany 的資料列數
+BATCH_SIZE = 50_000
+
+# (day, slot_id, member_id)
+AssignmentRow = Tuple[int, int, int]
+
+
+def day_key(day: date) -> int:
+    """將日期轉為整數日鍵 (自 1970-01-01 起算的天數)。"""
+    return (day - EPOCH).days
+
+
+def day_from_key(key: int) -> date:
+    """將整數日鍵轉回日期。"""
+    return EPOCH + timedelta(days=key)
+
+
+class DutyAssignmentRepository(BaseRepository[DutyAssignment]):
+    """專門用於處理 DutyAssignment 模型資料庫操作的儲存庫。"""
+    def __init__(self, session: Session):
+        """初始化排班紀錄儲存庫。
+
+        Args:
+            session (Session): SQLAlchemy 的資料庫會話。
+        """
+        super().__init__(session, DutyAssignment)
+
+    def _executemany(self, sql: str, rows: Iterable[AssignmentRow], batch_size: int) -> int:
+        # 直接交給 DB-API 的 executemany，不建立 ORM 物件也不逐筆編譯陳述式
+        connection = self.session.connection()
+        rows = iter(rows)
+        count = 0
+        while batch := list(islice(rows, batch_size)):
+            connection.exec_driver_sql(sql, batch)
+            count += len(batch)
+        return count
+
+    def bulk_insert(self, rows: Iterable[AssignmentRow], batch_size: int = BATCH_SIZE) -> int:
+        """分批寫入排班紀錄；已存在的紀錄會被略過。
+
+        此操作不會提交，需要呼叫 session.commit() 才會寫入資料庫。
+
+        Args:
+            rows (Iterable[AssignmentRow]): (day, slot_id, member_id)。
+            batch_size (int): 每批的資料列數。
+
+        Returns:
+            int: 送出的資料列數。
+        """
+        return self._executemany(
+            "INSERT OR IGNORE INTO duty_assignments (day, slot_id, member_id) VALUES (?, ?, ?)", rows, batch_size
+        )
+
+    def delete_rows(self, rows: Iterable[AssignmentRow], batch_size: int = BATCH_SIZE) -> int:
+        """分批刪除指定的排班紀錄 (不提交)。返回送出的資料列數。"""
+        return self._executemany(
+            "DELETE FROM duty_assignments WHERE day = ? AND slot_id = ? AND member_id = ?", rows, batch_size
+        )
+
+    def delete_range(self, first_day: int, last_day: int, slot_ids: Iterable[int] | None = None) -> int:
+        """刪除日鍵範圍內 (含首尾) 的排班紀錄 (不提交)。
+
+        Args:
+            first_day (int): 起始日鍵。
+            last_day (int): 結束日鍵。
+            slot_ids (Iterable[int] | None): 只刪除這些班別；None 表示全部。
+
+        Returns:
+            int: 刪除的資料列數。
+        """
+        connection = self.session.connection()
+        sql = "DELETE FROM duty_assignments WHERE day BETWEEN ? AND ?"
+        parameters: tuple = (first_day, last_day)
+        if slot_ids is not None:
+            slot_ids = list(slot_ids)
+            if not slot_ids:
+                return 0
+            sql += f" AND slot_id IN ({', '.join('?' * len(slot_ids))})"
+            parameters += tuple(slot_ids)
+        return connection.exec_driver_sql(sql, parameters).rowcount
+
+    def get_range(self, first_day: int, last_day: int, slot_ids: Iterable[int] | None = None) -> List[AssignmentRow]:
+        """依主鍵順序取得日鍵範圍內 (含首尾) 的排班紀錄。"""
+        statement = select(self.model.day, self.model.slot_id, self.model.member_id).where(
+            self.model.day.between(first_day, last_day)
+        )
+        if slot_ids is not None:
+            statement = statement.where(self.model.slot_id.in_(list(slot_ids)))
+        return [tuple(row) for row in self.session.execute(statement)]
+
+    def on_duty(self, day: int, region_path: str | None = None) -> List[Tuple[int, int]]:
+        """查詢某一天的值班會員。
+
+        先以主鍵取出當天的排班，再以會員主鍵與地區 path 範圍篩選，不需掃描其他日期。
+
+        Args:
+            day (int): 日鍵。
+            region_path (str | None): 只列出此地區子樹 (含自身) 的會員；None 表示全部。
+
+        Returns:
+            List[Tuple[int, int]]: (slot_id, member_id)，依班別排序。
+        """
+        statement = select(self.model.slot_id, self.model.member_id).where(self.model.day == day)
+        if region_path is not None:
+            lower, upper = subtree_bounds(region_path)
+            statement = (
+                statement.join(Member, Member.id == self.model.member_id)
+                .join(Region, Region.id == Member.region_id)
+                .where(Region.path >= lower, Region.path < upper)
+            )
+        return [tuple(row) for row in self.session.execute(statement.order_by(self.model.slot_id))]
+
+    def next_duties(self, member_id: int, from_day: int, limit: int = 10) -> List[Tuple[int, int]]:
+        """查詢會員自 from_day (含) 起的下幾次排班，只走 (member_id, day) 索引。
+
+        Returns:
+            List[Tuple[int, int]]: (day, slot_id)，依日期排序。
+        """
+        statement = (
+            select(self.model.day, self.model.slot_id)
+            .where(self.model.member_id == member_id, self.model.day >= from_day)
+            .order_by(self.model.day, self.model.slot_id)
+            .limit(limit)
+        )
+        return [tuple(row) for row in self.session.execute(statement)]
+
+    def member_ids_on(self, day: int) -> List[int]:
+        """返回當天有排班的會員 ID (同一位會員有多個班別時會重複)，只讀取主鍵範圍。"""
+        # 以 group_concat 在資料庫內串成一個字串，比逐列取回數千個單欄結果快數倍
+        joined = self.session.execute(
+            select(func.group_concat(self.model.member_id)).where(self.model.day == day)
+        ).scalar()
+        return list(map(int, joined.split(","))) if joined else []
+
+    def members_with_duties(self, member_ids: Iterable[int], from_day: int) -> List[int]:
+        """返回 member_ids 中自 from_day (含) 起仍有排班的會員。"""
+        member_ids = list(member_ids)
+        if not member_ids:
+            return []
+        statement = (
+            select(self.model.member_id)
+            .where(self.model.member_id.in_(member_ids), self.model.day >= from_day)
+            .distinct()
+        )
+        return list(self.session.execute(statement).scalars())
+
+    def last_day(self, member_ids: Iterable[int], from_day: int) -> int | None:
+        """返回這些會員自 from_day 起最後一次排班的日鍵；沒有排班時返回 None。"""
+        return self.session.execute(
+            select(func.max(self.model.day))
+            .where(self.model.member_id.in_(list(member_ids)), self.model.day >= from_day)
+        ).scalar()
+
+    def get_timed_range(self, first_day: int, last_day: int,
+                        member_ids: Iterable[int] | None = None) -> List[Tuple[int, int, int, int, int]]:
+        """取得日鍵範圍內 (含首尾) 的排班紀錄與班別時段。
+
+        Args:
+            first_day (int): 起始日鍵。
+            last_day (int): 結束日鍵。
+            member_ids (Iterable[int] | None): 只查詢這些會員；None 表示全部。
+
+        Returns:
+            List[Tuple[int, int, int, int, int]]: (day, slot_id, member_id, start_minute, end_minute)。
+        """
+        statement = (
+            select(self.model.day, self.model.slot_id, self.model.member_id, DutySlot.start_minute, DutySlot.end_minute)
+            .join(DutySlot, DutySlot.id == self.model.slot_id)
+            .where(self.model.day.between(first_day, last_day))
+        )
+        if member_ids is not None:
+            statement = statement.where(self.model.member_id.in_(list(member_ids)))
+        return [tuple(row) for row in self.session.execute(statement)]
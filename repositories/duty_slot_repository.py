@@ -0,0 +1,74 @@
+"""班別儲存庫模組。"""
+
+from typing import Dict, Iterable, List
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from models.duty_slot_model import DutySlot, DutySlotPosition
+from repositories.base_repository import BaseRepository
+
+class DutySlotRepository(BaseRepository[DutySlot]):
+    """專門用於處理 DutySlot 模型資料庫操作的儲存庫。"""
+    def __init__(self, session: Session):
+        """初始化班別儲存庫。
+
+        Args:
+            session (Session): SQLAlchemy 的資料庫會話。
+        """
+        super().__init__(session, DutySlot)
+
+    def get_ids(self, keys: Iterable[str] | None = None) -> Dict[str, int]:
+        """返回班別代碼 -> 班別 ID。
+
+        Args:
+            keys (Iterable[str] | None): 只查詢這些代碼；None 表示全部。
+        """
+        statement = select(self.model.key, self.model.id)
+        if keys is not None:
+            statement = statement.where(self.model.key.in_(list(keys)))
+        return dict(self.session.execute(statement).all())
+
+    def get_position_ids(self, slot_ids: Iterable[int]) -> Dict[int, List[int]]:
+        """返回班別 ID -> 合格職務 ID。沒有職務限制的班別不會出現在結果中。"""
+        result: Dict[int, List[int]] = {}
+        rows = self.session.execute(
+            select(DutySlotPosition.slot_id, DutySlotPosition.position_id)
+            .where(DutySlotPosition.slot_id.in_(list(slot_ids)))
+        ).all()
+        for slot_id, position_id in rows:
+            result.setdefault(slot_id, []).append(position_id)
+        return result
+
+    def save_slots(self, rows: List[dict], positions: Dict[str, Iterable[int]]) -> Dict[str, int]:
+        """以代碼為鍵寫入 (新增或覆寫) 多個班別與其合格職務。
+
+        此操作不會提交，需要呼叫 session.commit() 才會寫入資料庫。
+
+        Args:
+            rows (List[dict]): 班別欄位 (key, name, required, region_id, weekdays, start_minute, end_minute)。
+            positions (Dict[str, Iterable[int]]): 班別代碼 -> 合格職務 ID。
+
+        Returns:
+            Dict[str, int]: 班別代碼 -> 班別 ID。
+        """
+        if not rows:
+            return {}
+        statement = insert(self.model)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.key],
+            set_={
+                column: statement.excluded[column]
+                for column in ("name", "required", "region_id", "weekdays", "start_minute", "end_minute")
+            },
+        )
+        self.session.execute(statement, rows)
+        ids = self.get_ids(row["key"] for row in rows)
+
+        self.session.execute(delete(DutySlotPosition).where(DutySlotPosition.slot_id.in_(list(ids.values()))))
+        position_rows = [
+            {"slot_id": ids[key], "position_id": position_id}
+            for key, position_ids in positions.items() for position_id in position_ids
+        ]
+        if position_rows:
+            self.session.execute(insert(DutySlotPosition), position_rows)
+        return ids
@@ -0,0 +1,63 @@
+"""會員可排班日儲存庫模組。"""
+
+from typing import Dict, Mapping
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from models.member_availability_model import MemberAvailability
+from repositories.base_repository import BaseRepository
+
+class MemberAvailabilityRepository(BaseRepository[MemberAvailability]):
+    """專門用於處理 MemberAvailability 模型資料庫操作的儲存庫。
+
+    每位會員每年只有一筆 46 bytes 的位元圖，因此一次讀取整年的所有資料列，
+    再由呼叫端以 NumPy 篩選需要的會員。
+    """
+    def __init__(self, session: Session):
+        """初始化會員可排班日儲存庫。
+
+        Args:
+            session (Session): SQLAlchemy 的資料庫會話。
+        """
+        super().__init__(session, MemberAvailability)
+
+    def get_bitmaps(self, year: int) -> Dict[int, bytes]:
+        """取得某一年所有設定過可排班日的會員位元圖。
+
+        Args:
+            year (int): 西元年。
+
+        Returns:
+            Dict[int, bytes]: 會員 ID -> 位元圖；沒有資料列的會員視為全年可排班。
+        """
+        rows = self.session.execute(
+            select(self.model.member_id, self.model.bitmap).where(self.model.year == year)
+        ).all()
+        return dict(rows)
+
+    def years_with_data(self, first_year: int, last_year: int) -> set[int]:
+        """返回範圍內 (含首尾) 有任何位元圖的年份。"""
+        rows = self.session.execute(
+            select(self.model.year).where(self.model.year.between(first_year, last_year)).distinct()
+        ).all()
+        return {year for (year,) in rows}
+
+    def save_bitmaps(self, year: int, bitmaps: Mapping[int, bytes]) -> None:
+        """以單一 executemany 寫入 (新增或覆寫) 多位會員的位元圖。
+
+        此操作不會提交，需要呼叫 session.commit() 才會寫入資料庫。
+
+        Args:
+            year (int): 西元年。
+            bitmaps (Mapping[int, bytes]): 會員 ID -> 位元圖。
+        """
+        if not bitmaps:
+            return
+        statement = insert(self.model)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.member_id, self.model.year],
+            set_={"bitmap": statement.excluded.bitmap},
+        )
+        self.session.execute(statement, [
+            {"member_id": member_id, "year": year, "bitmap": bitmap} for member_id, bitmap in bitmaps.items()
+        ])
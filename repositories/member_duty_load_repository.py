@@ -0,0 +1,54 @@
+"""會員排班負擔儲存庫模組。"""
+
+from datetime import date
+from typing import Iterable, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from models.member_duty_load_model import MemberDutyLoad
+from repositories.base_repository import BaseRepository
+
+# (會員 ID, 負擔, 負擔對應的日期, 上次排班日)
+DutyLoadRow = Tuple[int, float, date, date | None]
+
+class MemberDutyLoadRepository(BaseRepository[MemberDutyLoad]):
+    """專門用於處理 MemberDutyLoad 模型資料庫操作的儲存庫。"""
+    def __init__(self, session: Session):
+        """初始化會員排班負擔儲存庫。
+
+        Args:
+            session (Session): SQLAlchemy 的資料庫會話。
+        """
+        super().__init__(session, MemberDutyLoad)
+
+    def get_rows(self) -> List[DutyLoadRow]:
+        """以 tuple 取得所有會員的排班負擔，不建立 ORM 物件。"""
+        rows = self.session.execute(
+            select(self.model.member_id, self.model.load, self.model.as_of, self.model.last_assigned)
+        ).all()
+        return [tuple(row) for row in rows]
+
+    def save_rows(self, rows: Iterable[DutyLoadRow]) -> None:
+        """以單一 executemany 寫入 (新增或覆寫) 多位會員的排班負擔。
+
+        此操作不會提交，需要呼叫 session.commit() 才會寫入資料庫。
+
+        Args:
+            rows (Iterable[DutyLoadRow]): 要寫入的資料列。
+        """
+        parameters = [
+            {"member_id": member_id, "load": load, "as_of": as_of, "last_assigned": last_assigned}
+            for member_id, load, as_of, last_assigned in rows
+        ]
+        if not parameters:
+            return
+        statement = insert(self.model)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.member_id],
+            set_={
+                "load": statement.excluded.load,
+                "as_of": statement.excluded.as_of,
+                "last_assigned": statement.excluded.last_assigned,
+            },
+        )
+        self.session.execute(statement, parameters)
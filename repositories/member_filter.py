@@ -0,0 +1,364 @@
+"""會員篩選條件的組合與編譯。
+
+規劃時常見的複合條件 (持有某些職務之一、位於某地區子樹、屬於某些部門、可排班、
+具備某些資格、當天尚未排班) 以小型的述詞 (predicate) 表示，可用 &、|、~ 組合::
+
+    criteria = (Schedulable() & InRegionSubtree(region_id) & HoldsPositions([1, 2])
+                & HasQualifications(mask) & ~AssignedOn(day_key(day)))
+    member_ids = MemberFilterRepository(session).get_ids(criteria)
+
+同一個述詞有兩種求值方式：
+
+* SQL：編譯為單一 SELECT。職務與排班以 EXISTS 半連接 (semi-join) 表示，不會產生重複的會員列；
+  地區子樹以 path 範圍子查詢表示，可使用 ix_regions_path 索引。條件中的值一律是綁定參數，
+  集合使用 expanding 參數，因此「形狀」相同 (同樣的述詞種類與組合方式) 的條件共用同一個
+  快取的陳述式，只有參數值不同。
+  葉節點的條件一律為 true/false (未指定的地區或部門視為不符合)，不會因 SQL 的三值邏輯得到 NULL，
+  因此 ~ 的結果與記憶體求值相同。
+* 記憶體：mask(context) 在會員欄位陣列上以 NumPy 求值，context 由
+  services.eligibility.EligibilityService 提供，適合畫面上反覆變更條件的互動查詢。
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import reduce
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+from sqlalchemy import Select, and_, bindparam, exists, false, func, not_, or_, select, true
+from sqlalchemy.orm import Session, aliased
+from models.duty_assignment_model import DutyAssignment
+from models.member_model import Member
+from models.member_position_model import MemberPosition
+from models.region_model import Region
+from repositories.region_repository import PATH_SEPARATOR
+
+# 快取的陳述式數量 (依形狀與選取欄位區分)
+STATEMENT_CACHE_SIZE = 256
+
+# (形狀, 選取欄位) -> 含綁定參數的 Select
+_statements: OrderedDict = OrderedDict()
+_statements_lock = threading.Lock()
+
+
+class _Binder:
+    """編譯時依走訪順序產生綁定參數 p0, p1, ...；求值時以同樣順序取出參數值。"""
+
+    def __init__(self):
+        self.count = 0
+
+    def next(self, expanding: bool = False):
+        name = f"p{self.count}"
+        self.count += 1
+        return bindparam(name, expanding=expanding)
+
+
+class MemberPredicate:
+    """會員篩選條件的基底類別。
+
+    子類別須實作：
+
+    * shape：不含參數值的結構，作為陳述式快取的鍵。
+    * values()：依走訪順序產生參數值。
+    * clause(binder)：以相同順序取用綁定參數，返回 SQL 條件。
+    * mask(context)：在欄位陣列上求值，返回與 context.columns.ids 等長的布林陣列。
+    """
+
+    @property
+    def shape(self) -> tuple:
+        return (type(self).__name__,)
+
+    def values(self) -> Iterator:
+        return iter(())
+
+    def clause(self, binder: _Binder):
+        raise NotImplementedError
+
+    def mask(self, context) -> np.ndarray:
+        raise NotImplementedError
+
+    def parameters(self) -> Dict[str, object]:
+        """返回綁定參數名稱 -> 值。"""
+        return {f"p{i}": value for i, value in enumerate(self.values())}
+
+    def __and__(self, other: "MemberPredicate") -> "MemberPredicate":
+        return AllOf((*_parts(self, AllOf), *_parts(other, AllOf)))
+
+    def __or__(self, other: "MemberPredicate") -> "MemberPredicate":
+        return AnyOf((*_parts(self, AnyOf), *_parts(other, AnyOf)))
+
+    def __invert__(self) -> "MemberPredicate":
+        return self.part if isinstance(self, Not) else Not(self)
+
+
+def _parts(predicate: MemberPredicate, kind: type) -> tuple:
+    # 攤平同種類的巢狀組合，(a & b) & c 與 a & (b & c) 的形狀相同
+    return predicate.parts if isinstance(predicate, kind) else (predicate,)
+
+
+def _id_tuple(ids: Iterable[int]) -> Tuple[int, ...]:
+    return tuple(sorted({int(i) for i in ids}))
+
+
+@dataclass(frozen=True)
+class Schedulable(MemberPredicate):
+    """可排班的會員。"""
+
+    def clause(self, binder):
+        return Member.is_schedulable == 1
+
+    def mask(self, context):
+        return context.columns.schedulable.copy()
+
+
+@dataclass(frozen=True)
+class InRegionSubtree(MemberPredicate):
+    """所屬地區位於 region_id 的子樹 (含自身)；地區不存在時沒有會員符合。"""
+    region_id: int
+
+    def values(self):
+        yield self.region_id
+
+    def clause(self, binder):
+        # 子樹根節點的 path 以純量子查詢取得，SQLite 只計算一次，再以 path 範圍掃描索引
+        root = aliased(Region)
+        lower = select(root.path).where(root.id == binder.next()).scalar_subquery()
+        upper = func.substr(lower, 1, func.length(lower) - 1).concat(chr(ord(PATH_SEPARATOR) + 1))
+        # 未指定地區的會員明確排除，否則 NULL 經 NOT 後仍是 NULL，與記憶體求值不一致
+        return and_(Member.region_id.is_not(None),
+                    Member.region_id.in_(select(Region.id).where(Region.path >= lower, Region.path < upper)))
+
+    def mask(self, context):
+        return context.subtree_mask(self.region_id)
+
+
+@dataclass(frozen=True)
+class InDepartments(MemberPredicate):
+    """屬於任一指定部門的會員。"""
+    department_ids: Tuple[int, ...]
+
+    def __init__(self, department_ids: Iterable[int]):
+        object.__setattr__(self, "department_ids", _id_tuple(department_ids))
+
+    def values(self):
+        yield list(self.department_ids)
+
+    def clause(self, binder):
+        # 同 InRegionSubtree：未指定部門時為 false 而非 NULL
+        return and_(Member.department_id.is_not(None), Member.department_id.in_(binder.next(expanding=True)))
+
+    def mask(self, context):
+        return np.isin(context.columns.department_ids, self.department_ids)
+
+
+@dataclass(frozen=True)
+class HoldsPositions(MemberPredicate):
+    """持有任一指定職務的會員。"""
+    position_ids: Tuple[int, ...]
+
+    def __init__(self, position_ids: Iterable[int]):
+        object.__setattr__(self, "position_ids", _id_tuple(position_ids))
+
+    def values(self):
+        yield list(self.position_ids)
+
+    def clause(self, binder):
+        return exists().where(MemberPosition.member_id == Member.id,
+                              MemberPosition.position_id.in_(binder.next(expanding=True)))
+
+    def mask(self, context):
+        return context.holding_positions(self.position_ids)
+
+
+@dataclass(frozen=True)
+class HasQualifications(MemberPredicate):
+    """具備 required_mask 中所有資格的會員。"""
+    required_mask: int
+
+    def values(self):
+        yield self.required_mask
+
+    def clause(self, binder):
+        mask = binder.next()
+        return Member.qualification_mask.op('&')(mask) == mask
+
+    def mask(self, context):
+        return (context.columns.qualification_masks & self.required_mask) == self.required_mask
+
+
+@dataclass(frozen=True)
+class AssignedOn(MemberPredicate):
+    """當天 (日鍵，見 day_key) 已有排班的會員；「尚未排班」請用 ~AssignedOn(day)。"""
+    day: int
+
+    def values(self):
+        yield self.day
+
+    def clause(self, binder):
+        return exists().where(DutyAssignment.member_id == Member.id, DutyAssignment.day == binder.next())
+
+    def mask(self, context):
+        return context.assigned_on(self.day)
+
+
+@dataclass(frozen=True)
+class AllOf(MemberPredicate):
+    """所有條件都成立；沒有條件時所有會員都符合。"""
+    parts: Tuple[MemberPredicate, ...]
+
+    @property
+    def shape(self):
+        return ("AllOf", tuple(part.shape for part in self.parts))
+
+    def values(self):
+        for part in self.parts:
+            yield from part.values()
+
+    def clause(self, binder):
+        return and_(true(), *[part.clause(binder) for part in self.parts])
+
+    def mask(self, context):
+        return reduce(np.logical_and, (part.mask(context) for part in self.parts),
+                      np.ones(len(context.columns), dtype=bool))
+
+
+@dataclass(frozen=True)
+class AnyOf(MemberPredicate):
+    """任一條件成立；沒有條件時沒有會員符合。"""
+    parts: Tuple[MemberPredicate, ...]
+
+    @property
+    def shape(self):
+        return ("AnyOf", tuple(part.shape for part in self.parts))
+
+    def values(self):
+        for part in self.parts:
+            yield from part.values()
+
+    def clause(self, binder):
+        return or_(false(), *[part.clause(binder) for part in self.parts])
+
+    def mask(self, context):
+        return reduce(np.logical_or, (part.mask(context) for part in self.parts),
+                      np.zeros(len(context.columns), dtype=bool))
+
+
+@dataclass(frozen=True)
+class Not(MemberPredicate):
+    """條件不成立。"""
+    part: MemberPredicate
+
+    @property
+    def shape(self):
+        return ("Not", self.part.shape)
+
+    def values(self):
+        return self.part.values()
+
+    def clause(self, binder):
+        return not_(self.part.clause(binder))
+
+    def mask(self, context):
+        return ~self.part.mask(context)
+
+
+def member_criteria(region_id: int | None = None, position_ids: Iterable[int] | None = None,
+                    qualification_mask: int = 0, schedulable_only: bool = True,
+                    department_ids: Iterable[int] | None = None, free_on: int | None = None) -> MemberPredicate:
+    """組出常用的條件組合，None (或 0) 的條件不加入。
+
+    Args:
+        region_id (int | None): 只包含此地區子樹 (含自身) 的會員。
+        position_ids (Iterable[int] | None): 只包含持有其中任一職務的會員。
+        qualification_mask (int): 只包含具備遮罩中所有資格的會員。
+        schedulable_only (bool): 是否只包含可排班的會員。
+        department_ids (Iterable[int] | None): 只包含屬於其中任一部門的會員。
+        free_on (int | None): 只包含這一天 (日鍵) 尚未排班的會員。
+
+    Returns:
+        MemberPredicate: 所有條件的 AND。
+    """
+    parts = []
+    if schedulable_only:
+        parts.append(Schedulable())
+    if region_id is not None:
+        parts.append(InRegionSubtree(region_id))
+    if department_ids is not None:
+        parts.append(InDepartments(department_ids))
+    if position_ids is not None:
+        parts.append(HoldsPositions(position_ids))
+    if qualification_mask:
+        parts.append(HasQualifications(qualification_mask))
+    if free_on is not None:
+        parts.append(~AssignedOn(free_on))
+    return AllOf(tuple(parts))
+
+
+def _cached_statement(key: tuple, build: Callable[[], Select]) -> Select:
+    with _statements_lock:
+        statement = _statements.get(key)
+        if statement is not None:
+            _statements.move_to_end(key)
+            return statement
+    statement = build()
+    with _statements_lock:
+        _statements[key] = statement
+        if len(_statements) > STATEMENT_CACHE_SIZE:
+            _statements.popitem(last=False)
+    return statement
+
+
+def clear_statement_cache():
+    """清除已編譯的陳述式 (主要供測試與基準量測使用)。"""
+    with _statements_lock:
+        _statements.clear()
+
+
+class MemberFilterRepository:
+    """以 MemberPredicate 查詢會員。"""
+
+    def __init__(self, session: Session):
+        """初始化會員篩選儲存庫。
+
+        Args:
+            session (Session): SQLAlchemy 的資料庫會話。
+        """
+        self.session = session
+
+    @staticmethod
+    def statement(predicate: MemberPredicate, *columns) -> Select:
+        """返回形狀相同的條件共用的 SELECT (參數尚未綁定，參數值見 predicate.parameters())。
+
+        Args:
+            predicate (MemberPredicate): 篩選條件。
+            *columns: 要選取的 Member 欄位，預設只選取 Member.id。
+
+        Returns:
+            Select: 含綁定參數 p0, p1, ... 的陳述式。
+        """
+        columns = columns or (Member.id,)
+        key = (predicate.shape, tuple(column.key for column in columns))
+        return _cached_statement(key, lambda: select(*columns).where(predicate.clause(_Binder())))
+
+    def select_ids(self, predicate: MemberPredicate, *columns) -> Select:
+        """返回已綁定參數值的 SELECT，可作為子查詢 (例如 INSERT ... SELECT) 使用。"""
+        return self.statement(predicate, *columns).params(predicate.parameters())
+
+    def get_ids(self, predicate: MemberPredicate) -> List[int]:
+        """返回符合條件的會員 ID。"""
+        return list(self.session.execute(self.statement(predicate), predicate.parameters()).scalars())
+
+    def get_rows(self, predicate: MemberPredicate, *columns) -> List[tuple]:
+        """返回符合條件之會員的指定欄位，依會員 ID 排序。"""
+        statement = self.statement(predicate, *columns)
+        key = ("ordered", predicate.shape, tuple(column.key for column in statement.selected_columns))
+        ordered = _cached_statement(key, lambda: statement.order_by(Member.id))
+        return [tuple(row) for row in self.session.execute(ordered, predicate.parameters())]
+
+    def count(self, predicate: MemberPredicate) -> int:
+        """返回符合條件的會員數。"""
+        key = ("count", predicate.shape)
+        statement = _cached_statement(key, lambda: select(func.count()).select_from(
+            self.statement(predicate).subquery()))
+        return self.session.execute(statement, predicate.parameters()).scalar_one()
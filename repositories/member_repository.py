@@ -1,11 +1,15 @@
 """會員儲存庫模組。"""
 
-from typing import List
+from typing import Iterable, List
 from PySide6.QtCore import Qt
+from sqlalchemy import update
 from sqlalchemy.orm import Session, joinedload
 from models.member_model import Member
 from models.region_model import Region
 from repositories.base_repository import BaseRepository
+from repositories.member_filter import MemberFilterRepository, member_criteria
+from repositories.region_repository import RegionRepository
+
 
 class MemberRepository(BaseRepository[Member]):
     """專門用於處理 Member 模型資料庫操作的儲存庫。"""
@@ -22,7 +26,7 @@ class MemberRepository(BaseRepository[Member]):
 
         Args:
             search_term (str | None): 姓名搜尋關鍵字。
-            region_id (int | None): 地區 ID 篩選。
+            region_id (int | None): 地區 ID 篩選，包含該地區及其所有子地區的會員。
             sort_column (int | None): 排序欄位索引。
             sort_order (Qt.SortOrder): 排序順序。
 
@@ -35,7 +39,8 @@ class MemberRepository(BaseRepository[Member]):
             query = query.filter(self.model.name.ilike(f"%{search_term}%"))
 
         if region_id and region_id != -1:
-            query = query.filter(self.model.region_id == region_id)
+            subtree_ids = RegionRepository(self.session).subtree_ids_query(region_id)
+            query = query.filter(self.model.region_id.in_(subtree_ids))
 
         if sort_column is not None:
             sort_field = None
@@ -56,3 +61,46 @@ class MemberRepository(BaseRepository[Member]):
                     query = query.order_by(sort_field.desc())
 
         return query.all()
+
+    def eligible_ids_query(self, required_mask: int = 0, region_id: int | None = None, schedulable_only: bool = True):
+        """返回符合資格條件之會員 ID 的 SELECT (參數已綁定)。
+
+        條件依序對應索引 ix_members_eligibility (is_schedulable, region_id, qualification_mask)，
+        地區子樹以 path 範圍子查詢取得地區 ID，整個查詢只掃描該索引。
+
+        Args:
+            required_mask (int): 必須具備的資格遮罩，0 表示不限資格。
+            region_id (int | None): 只包含此地區子樹 (含自身) 的會員；None 表示不限地區。
+            schedulable_only (bool): 是否只包含可排班的會員。
+
+        Returns:
+            Select: 查詢會員 ID 的陳述式。
+        """
+        criteria = member_criteria(region_id, qualification_mask=required_mask, schedulable_only=schedulable_only)
+        return MemberFilterRepository(self.session).select_ids(criteria)
+
+    def get_eligible_ids(self, required_mask: int = 0, region_id: int | None = None,
+                         schedulable_only: bool = True) -> List[int]:
+        """返回符合資格條件的會員 ID，參數同 eligible_ids_query()。"""
+        criteria = member_criteria(region_id, qualification_mask=required_mask, schedulable_only=schedulable_only)
+        return MemberFilterRepository(self.session).get_ids(criteria)
+
+    def grant_qualifications(self, member_ids: Iterable[int], mask: int) -> int:
+        """以單一 UPDATE 為多位會員加上資格 (不提交)，返回更新的會員數。"""
+        ids = list(member_ids)
+        if not ids or not mask:
+            return 0
+        return self.session.execute(
+            update(self.model).where(self.model.id.in_(ids))
+            .values(qualification_mask=self.model.qualification_mask.op('|')(mask))
+        ).rowcount
+
+    def revoke_qualifications(self, member_ids: Iterable[int], mask: int) -> int:
+        """以單一 UPDATE 移除多位會員的資格 (不提交)，返回更新的會員數。"""
+        ids = list(member_ids)
+        if not ids or not mask:
+            return 0
+        return self.session.execute(
+            update(self.model).where(self.model.id.in_(ids))
+            .values(qualification_mask=self.model.qualification_mask.op('&')(~mask))
+        ).rowcount
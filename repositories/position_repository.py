@@ -1,10 +1,41 @@
 """職務儲存庫模組。"""
 
 from typing import List, Set
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session, joinedload
 from models.position_model import Position
 from repositories.base_repository import BaseRepository
 
+# 排序鍵每段中 rank 與 ID 的寬度；rank 應為非負整數
+SORT_KEY_RANK_WIDTH = 6
+SORT_KEY_ID_WIDTH = 8
+
+# 以遞迴 CTE 由根節點重新計算所有職務的排序鍵
+_REBUILD_SORT_KEYS_SQL = text(f"""
+    WITH RECURSIVE tree(id, sort_key) AS (
+        SELECT id, printf('%0{SORT_KEY_RANK_WIDTH}d.%0{SORT_KEY_ID_WIDTH}d/', rank, id)
+        FROM positions WHERE parent_id IS NULL
+        UNION ALL
+        SELECT p.id, tree.sort_key || printf('%0{SORT_KEY_RANK_WIDTH}d.%0{SORT_KEY_ID_WIDTH}d/', p.rank, p.id)
+        FROM positions AS p JOIN tree ON p.parent_id = tree.id
+    )
+    UPDATE positions SET sort_key = (SELECT tree.sort_key FROM tree WHERE tree.id = positions.id)
+""")
+
+
+def make_sort_key(parent_sort_key: str | None, rank: int, position_id: int) -> str:
+    """組出職務的深度優先排序鍵。
+
+    Args:
+        parent_sort_key (str | None): 父職務的排序鍵，頂層職務為 None。
+        rank (int): 職務在同層中的順序。
+        position_id (int): 職務 ID，rank 相同時用來決定順序。
+
+    Returns:
+        str: 例如 "000000.00000001/000002.00000007/"。
+    """
+    return f"{parent_sort_key or ''}{rank:0{SORT_KEY_RANK_WIDTH}d}.{position_id:0{SORT_KEY_ID_WIDTH}d}/"
+
 class PositionRepository(BaseRepository[Position]):
     """專門用於處理 Position 模型資料庫操作的儲存庫。"""
     def __init__(self, session: Session):
@@ -16,24 +47,52 @@ class PositionRepository(BaseRepository[Position]):
         super().__init__(session, Position)
 
     def get_all_sorted(self, search_term: str | None = None) -> List[Position]:
-        """獲取所有職務，並根據層級和排序值進行排序。
+        """獲取所有職務，依樹狀顯示順序 (深度優先、同層依 rank) 排序。
 
         Args:
             search_term (str | None, optional): 用於篩選職務名稱的搜尋字詞。 Defaults to None.
 
         Returns:
-            List[Position]: 已排序的職務列表。
+            List[Position]: 已排序的職務列表，父職務一定排在子職務之前。
         """
         query = self.session.query(self.model)
 
         if search_term:
             query = query.filter(self.model.name.ilike(f"%{search_term}%"))
 
-        # Always order by parent_id and rank for correct tree structure
-        query = query.order_by(self.model.parent_id.asc(), self.model.rank.asc())
+        # sort_key 是預先計算的深度優先排序鍵，一個有索引的 ORDER BY 即可得到樹狀順序
+        query = query.order_by(self.model.sort_key.asc())
 
         return query.all()
 
+    def add(self, entity: Position) -> None:
+        """新增職務並設定其排序鍵。
+
+        需要先 flush 取得 ID 才能組出排序鍵，因此名稱重複等完整性錯誤會在此時拋出。
+
+        Args:
+            entity (Position): 要新增的職務。
+        """
+        self.session.add(entity)
+        self.session.flush()
+        parent_sort_key = None
+        if entity.parent_id is not None:
+            parent_sort_key = self.session.execute(
+                select(self.model.sort_key).where(self.model.id == entity.parent_id)
+            ).scalar()
+        entity.sort_key = make_sort_key(parent_sort_key, entity.rank or 0, entity.id)
+
+    def rebuild_sort_keys(self) -> None:
+        """由 parent_id 與 rank 重新計算所有職務的排序鍵。
+
+        職務樹的規模很小，移動或調整順序後直接以單一 UPDATE 整批重算。
+        """
+        self.session.flush()
+        self.session.execute(_REBUILD_SORT_KEYS_SQL)
+        for position in self.session.identity_map.values():
+            if isinstance(position, self.model):
+                self.session.expire(position, ["sort_key"])
+
     def get_all_sorted_by_rank(self) -> List[Position]:
         """獲取所有職務，並根據 rank 欄位降序排序。"""
         return self.session.query(self.model).order_by(self.model.rank.desc()).all()
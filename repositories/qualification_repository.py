@@ -0,0 +1,79 @@
+"""資格儲存庫模組。
+
+資格目錄的每一筆佔用 members.qualification_mask 的一個位元。新增資格時分配最小的空位元；
+刪除資格時先以單一 UPDATE 清除所有會員的該位元，之後同一個位元可以再分配給新的資格。
+"""
+
+from typing import Iterable, List
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from models.member_model import Member
+from models.qualification_model import MAX_QUALIFICATIONS, Qualification
+from repositories.base_repository import BaseRepository
+
+
+def mask_of_bits(bits: Iterable[int]) -> int:
+    """將位元位置轉為遮罩，例如 [0, 2] -> 0b101。"""
+    mask = 0
+    for bit in bits:
+        mask |= 1 << bit
+    return mask
+
+
+class QualificationRepository(BaseRepository[Qualification]):
+    """專門用於處理 Qualification 模型資料庫操作的儲存庫。"""
+    def __init__(self, session: Session):
+        """初始化資格儲存庫。
+
+        Args:
+            session (Session): SQLAlchemy 的資料庫會話。
+        """
+        super().__init__(session, Qualification)
+
+    def get_all_sorted(self) -> List[Qualification]:
+        """依位元順序 (即建立順序) 返回所有資格。"""
+        return list(self.session.execute(select(self.model).order_by(self.model.bit)).scalars().all())
+
+    def get_by_name(self, name: str) -> Qualification | None:
+        return self.session.execute(select(self.model).where(self.model.name == name)).scalar_one_or_none()
+
+    def create(self, name: str, description: str | None = None) -> Qualification:
+        """新增資格並分配最小的空位元 (不提交)。
+
+        Args:
+            name (str): 資格名稱。
+            description (str | None): 說明。
+
+        Returns:
+            Qualification: 新增的資格。
+
+        Raises:
+            ValueError: 資格數量已達 MAX_QUALIFICATIONS。
+        """
+        used = set(self.session.execute(select(self.model.bit)).scalars())
+        bit = next((bit for bit in range(MAX_QUALIFICATIONS) if bit not in used), None)
+        if bit is None:
+            raise ValueError(f"資格數量已達上限 ({MAX_QUALIFICATIONS} 種)。")
+        qualification = Qualification(name=name, bit=bit, description=description)
+        self.add(qualification)
+        return qualification
+
+    def delete(self, entity: Qualification) -> None:
+        """刪除資格，並清除所有會員的對應位元 (不提交)。"""
+        self.session.execute(
+            update(Member)
+            .where(Member.qualification_mask.op('&')(entity.mask) != 0)
+            .values(qualification_mask=Member.qualification_mask.op('&')(~entity.mask))
+        )
+        super().delete(entity)
+
+    def mask_for(self, qualification_ids: Iterable[int]) -> int:
+        """將資格 ID 轉為遮罩；不存在的 ID 會被忽略。"""
+        ids = list(qualification_ids)
+        if not ids:
+            return 0
+        return mask_of_bits(self.session.execute(select(self.model.bit).where(self.model.id.in_(ids))).scalars())
+
+    def names_for(self, mask: int) -> List[str]:
+        """返回遮罩中各位元對應的資格名稱 (依位元順序)。"""
+        return [q.name for q in self.get_all_sorted() if mask & q.mask]
@@ -1,8 +1,54 @@
-from typing import List, Set
+from typing import List, Tuple
 from PySide6.QtCore import Qt
+from sqlalchemy import Select, func, or_, select, text, update
 from sqlalchemy.orm import Session, joinedload
 from models.region_model import Region
 from repositories.base_repository import BaseRepository
+from services.hierarchy_guard import HierarchyCycleError
+
+# 物化路徑中每段 ID 的寬度，固定寬度讓字串排序與數值排序一致
+PATH_SEGMENT_WIDTH = 8
+PATH_SEPARATOR = "/"
+
+# 以遞迴 CTE 由根節點重新計算所有地區的 path
+_REBUILD_PATHS_SQL = text(f"""
+    WITH RECURSIVE tree(id, path) AS (
+        SELECT id, '/' || printf('%0{PATH_SEGMENT_WIDTH}d', id) || '/'
+        FROM regions WHERE parent_id IS NULL
+        UNION ALL
+        SELECT r.id, tree.path || printf('%0{PATH_SEGMENT_WIDTH}d', r.id) || '/'
+        FROM regions AS r JOIN tree ON r.parent_id = tree.id
+    )
+    UPDATE regions SET path = (SELECT tree.path FROM tree WHERE tree.id = regions.id)
+""")
+
+
+def make_path(parent_path: str | None, region_id: int) -> str:
+    """組出地區的物化路徑。
+
+    Args:
+        parent_path (str | None): 父地區的 path，頂層地區為 None。
+        region_id (int): 地區 ID。
+
+    Returns:
+        str: 例如 "/00000001/00000005/"。
+    """
+    return f"{parent_path or PATH_SEPARATOR}{region_id:0{PATH_SEGMENT_WIDTH}d}{PATH_SEPARATOR}"
+
+
+def subtree_bounds(path: str) -> Tuple[str, str]:
+    """返回子樹 path 的範圍 [lower, upper)。
+
+    子樹內的 path 都以 path 為前綴；將結尾的 "/" 換成下一個字元 "0"
+    即得到比所有前綴相同字串都大的上界，可直接使用 path 索引做範圍掃描。
+
+    Args:
+        path (str): 子樹根節點的 path。
+
+    Returns:
+        Tuple[str, str]: (下界, 上界)。
+    """
+    return path, path[:-1] + chr(ord(PATH_SEPARATOR) + 1)
 
 class RegionRepository(BaseRepository[Region]):
     """專門用於處理 Region 模型資料庫操作的儲存庫。"""
@@ -42,9 +88,22 @@ class RegionRepository(BaseRepository[Region]):
                     query = query.order_by(sort_field.asc())
                 else:
                     query = query.order_by(sort_field.desc())
+        else:
+            # 未指定排序時依樹狀順序 (path 即為深度優先的排序鍵)
+            query = query.order_by(self.model.path.asc())
         
         return query.all()
 
+    def get_all_in_tree_order(self) -> List[Region]:
+        """依樹狀顯示順序 (深度優先) 獲取所有地區。
+
+        path 由補零的 ID 組成，本身就是深度優先的排序鍵，同層地區依 ID 排列。
+
+        Returns:
+            List[Region]: 父地區一定排在子地區之前的地區列表。
+        """
+        return list(self.session.execute(select(self.model).order_by(self.model.path.asc())).scalars().all())
+
     def get_by_id_with_children(self, region_id: int) -> Region | None:
         """依據 ID 獲取地區，並預先載入其子地區。
 
@@ -56,18 +115,78 @@ class RegionRepository(BaseRepository[Region]):
         """
         return self.session.query(self.model).options(joinedload(self.model.children)).filter_by(id=region_id).first()
 
-    def _get_all_descendant_ids(self, region_id: int) -> Set[int]:
-        """遞迴獲取一個地區的所有後代ID。"""
-        descendant_ids = set()
-        children = (
-            self.session.query(self.model.id).filter(self.model.parent_id == region_id).all()
+    def add(self, entity: Region) -> None:
+        """新增地區並設定其物化路徑。
+
+        需要先 flush 取得 ID 才能組出 path，因此名稱重複等完整性錯誤會在此時拋出。
+
+        Args:
+            entity (Region): 要新增的地區。
+        """
+        self.session.add(entity)
+        self.session.flush()
+        entity.path = make_path(self._get_path(entity.parent_id), entity.id)
+
+    def move_subtree(self, region: Region, new_parent_id: int | None) -> None:
+        """將地區 (連同整棵子樹) 移到新的父地區下，並以單一 UPDATE 改寫子樹的 path。
+
+        Args:
+            region (Region): 要移動的地區。
+            new_parent_id (int | None): 新的父地區 ID，None 表示移到頂層。
+
+        Raises:
+            HierarchyCycleError: 新的父地區是自身或自身的後代。
+        """
+        old_path = region.path
+        new_path = make_path(self._get_path(new_parent_id), region.id)
+        if old_path is not None and new_path != old_path and new_path.startswith(old_path):
+            raise HierarchyCycleError("無法將地區移到自己或自己的子地區之下。")
+
+        region.parent_id = new_parent_id
+        self.session.flush()
+        if old_path is None:
+            # 尚未有 path 的舊資料：只能整批重建
+            self.rebuild_paths()
+            return
+        if new_path == old_path:
+            return
+
+        lower, upper = subtree_bounds(old_path)
+        self.session.execute(
+            update(self.model)
+            .where(self.model.path >= lower, self.model.path < upper)
+            .values(path=new_path + func.substr(self.model.path, len(old_path) + 1))
+            .execution_options(synchronize_session="fetch")
         )
 
-        for (child_id,) in children:
-            if child_id not in descendant_ids:
-                descendant_ids.add(child_id)
-                descendant_ids.update(self._get_all_descendant_ids(child_id))
-        return descendant_ids
+    def rebuild_paths(self) -> None:
+        """由 parent_id 重新計算所有地區的 path。用於修復或遷移舊資料。"""
+        self.session.flush()
+        self.session.execute(_REBUILD_PATHS_SQL)
+        # 已載入的地區物件需重新讀取 path
+        for region in self.session.identity_map.values():
+            if isinstance(region, self.model):
+                self.session.expire(region, ["path"])
+
+    def _get_path(self, region_id: int | None) -> str | None:
+        if region_id is None:
+            return None
+        return self.session.execute(select(self.model.path).where(self.model.id == region_id)).scalar()
+
+    def subtree_ids_query(self, region_id: int) -> Select:
+        """返回查詢「指定地區及其所有後代 ID」的 SELECT，可作為 IN 子查詢使用。
+
+        Args:
+            region_id (int): 子樹根節點的地區 ID。
+
+        Returns:
+            Select: 以 path 範圍條件篩選的查詢；找不到地區時只比對該 ID 本身。
+        """
+        path = self._get_path(region_id)
+        if path is None:
+            return select(self.model.id).where(self.model.id == region_id)
+        lower, upper = subtree_bounds(path)
+        return select(self.model.id).where(self.model.path >= lower, self.model.path < upper)
 
     def get_possible_parents(self, region_id: int | None) -> List[Region]:
         """載入所有可作為父級的地區列表。
@@ -82,9 +201,11 @@ class RegionRepository(BaseRepository[Region]):
         """
         query = self.session.query(self.model)
         if region_id is not None:
-            excluded_ids = {region_id}
-            descendant_ids = self._get_all_descendant_ids(region_id)
-            excluded_ids.update(descendant_ids)
-            query = query.filter(self.model.id.notin_(excluded_ids))
+            path = self._get_path(region_id)
+            if path is None:
+                query = query.filter(self.model.id != region_id)
+            else:
+                lower, upper = subtree_bounds(path)
+                query = query.filter(or_(self.model.path.is_(None), self.model.path < lower, self.model.path >= upper))
 
         return query.order_by(self.model.name).all()
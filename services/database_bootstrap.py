@@ -0,0 +1,236 @@
+"""資料庫啟動檢查模組。
+
+應用程式每次啟動時呼叫 bootstrap_database()。正常情況下 (資料庫已是最新版本且
+已建立初始資料) 只會執行一個輕量查詢：同時讀出 alembic_version 中記錄的版本，
+以及存放在 SQLite ``PRAGMA user_version`` 中的「已建立初始資料」旗標。
+只有在版本不符或尚未建立初始資料時，才會載入 Alembic 執行遷移或進行資料初始化。
+"""
+
+import logging
+import os
+import re
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from models import Base, Department, Member, Qualification
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_DIR = os.path.join(PROJECT_ROOT, "alembic")
+VERSIONS_DIR = os.path.join(ALEMBIC_DIR, "versions")
+
+# PRAGMA user_version 中代表「初始資料已建立」的位元
+SEEDED_FLAG = 0x1
+
+# 純量子查詢：alembic_version 是空的資料表時仍會返回一列，user_version 不會因此遺失
+_SCHEMA_STATE_QUERY = text(
+    "SELECT (SELECT version_num FROM alembic_version), (SELECT user_version FROM pragma_user_version)"
+)
+_REVISION_RE = re.compile(r"^revision(?:\s*:\s*str)?\s*=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION_RE = re.compile(r"^down_revision\b[^=]*=(.*)$", re.MULTILINE)
+_QUOTED_ID_RE = re.compile(r"['\"](\w+)['\"]")
+
+
+def get_code_head_revision(versions_dir: str = VERSIONS_DIR) -> str | None:
+    """從遷移腳本中找出程式碼的 head 版本，不需要載入 Alembic。
+
+    Args:
+        versions_dir (str): Alembic 遷移腳本所在目錄。
+
+    Returns:
+        str | None: 唯一的 head 版本；若沒有或有多個 head 則返回 None。
+    """
+    revisions = set()
+    parents = set()
+    for file_name in os.listdir(versions_dir):
+        if not file_name.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, file_name), encoding="utf-8") as f:
+            source = f.read()
+        revision = _REVISION_RE.search(source)
+        if not revision:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION_RE.search(source)
+        if down_revision:
+            parents.update(_QUOTED_ID_RE.findall(down_revision.group(1)))
+
+    heads = revisions - parents
+    return heads.pop() if len(heads) == 1 else None
+
+
+def read_schema_state(engine: Engine) -> tuple[str | None, int]:
+    """以單一查詢讀取資料庫目前的遷移版本與 user_version 旗標。
+
+    Args:
+        engine (Engine): 資料庫引擎。
+
+    Returns:
+        tuple[str | None, int]: (版本號, user_version)。
+            若資料庫尚未由 Alembic 管理 (沒有 alembic_version 或其中沒有版本)，版本號為 None。
+    """
+    with engine.connect() as connection:
+        try:
+            row = connection.execute(_SCHEMA_STATE_QUERY).one()
+        except OperationalError:
+            # alembic_version 資料表不存在
+            return None, connection.execute(text("PRAGMA user_version")).scalar() or 0
+    return row[0], row[1] or 0
+
+
+def _alembic_config(engine: Engine):
+    # 不傳入 alembic.ini 路徑，避免 env.py 呼叫 fileConfig() 覆寫應用程式的 logging 設定
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_DIR)
+    config.set_main_option("sqlalchemy.url", engine.url.render_as_string(hide_password=False))
+    return config
+
+
+def create_schema(engine: Engine):
+    """在空白資料庫中建立所有資料表，並標記為最新的遷移版本。
+
+    Args:
+        engine (Engine): 指向空白資料庫的引擎。
+    """
+    from alembic import command
+
+    Base.metadata.create_all(bind=engine)
+    command.stamp(_alembic_config(engine), "head")
+
+
+def _migrate(engine: Engine, current_revision: str | None):
+    """建立或升級資料庫結構至最新版本。"""
+    from alembic import command
+
+    config = _alembic_config(engine)
+    if current_revision is None:
+        if inspect(engine).get_table_names():
+            _adopt_unstamped(engine, config)
+            return
+        logger.info("Empty database, creating all tables and stamping head revision.")
+        create_schema(engine)
+    else:
+        logger.info(f"Upgrading database schema from revision {current_revision}.")
+        command.upgrade(config, "head")
+        Base.metadata.create_all(bind=engine)
+
+
+def missing_columns(engine: Engine) -> list[str]:
+    """返回模型中有、資料庫中卻沒有的欄位 ("資料表.欄位")；缺少整個資料表時不列出。"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(f"{table.name}.{column.name}" for column in table.columns if column.name not in existing)
+    return missing
+
+
+def _adopt_unstamped(engine: Engine, config):
+    """處理尚未由 Alembic 標記版本的舊資料庫 (沒有 alembic_version 或其中沒有版本)。
+
+    先補上缺少的資料表；若既有資料表已含模型的所有欄位，結構即與 head 相同，標記為 head，
+    之後啟動就能走快速路徑。
+
+    Raises:
+        RuntimeError: 既有資料表缺少欄位。此時無法判斷應從哪一版開始遷移，
+            需要先以 ``alembic stamp <版本>`` 標記實際的版本，下次啟動才會升級。
+    """
+    from alembic import command
+
+    Base.metadata.create_all(bind=engine)
+    missing = missing_columns(engine)
+    if missing:
+        message = (f"Database has no Alembic revision and is missing columns {', '.join(missing)}; "
+                   "stamp its actual revision with 'alembic stamp <revision>' so it can be upgraded.")
+        logger.error(message)
+        raise RuntimeError(message)
+    logger.warning("Database had no Alembic revision but matches the models; stamping head revision.")
+    command.stamp(config, "head")
+
+
+def _seed_initial_data(session: Session):
+    """若資料庫為空，建立預設部門、資格與範例會員。"""
+    # Seed departments if they don't exist
+    if session.query(Department).count() == 0:
+        logger.info("No departments found, seeding initial data.")
+        session.add_all([
+            Department(name="壯年部"),
+            Department(name="婦人部"),
+            Department(name="男子部"),
+            Department(name="女子部"),
+        ])
+        session.flush() # Explicitly flush before commit
+        session.commit()
+        logger.info("Departments seeded successfully.")
+    else:
+        logger.info("Departments already exist, skipping seeding.")
+
+    # 新資料庫由 create_all 建立，不會執行遷移中的預設資格
+    if session.query(Qualification).count() == 0:
+        logger.info("No qualifications found, seeding default qualifications.")
+        session.add(Qualification(name="教學資格", bit=0, description="可擔任研討會講師"))
+        session.commit()
+
+    # Add sample data if the database is empty
+    if session.query(Member).count() == 0:
+        logger.info("No members found, adding sample data.")
+        session.add_all([
+            Member(name="張三"),
+            Member(name="李四"),
+            Member(name="王五"),
+        ])
+        session.flush() # Explicitly flush before commit
+        session.commit()
+        logger.info("Sample members seeded successfully.")
+    else:
+        logger.info("Members already exist, skipping seeding.")
+
+
+def mark_seeded(engine: Engine):
+    """在 PRAGMA user_version 設定「初始資料已建立」旗標，之後啟動不再檢查。
+
+    Args:
+        engine (Engine): 資料庫引擎。
+    """
+    with engine.begin() as connection:
+        user_version = connection.execute(text("PRAGMA user_version")).scalar() or 0
+        # PRAGMA 不支援參數綁定，這裡的值一定是整數
+        connection.execute(text(f"PRAGMA user_version = {int(user_version) | SEEDED_FLAG}"))
+
+
+def bootstrap_database(engine: Engine, session_factory: sessionmaker) -> bool:
+    """確保資料庫結構為最新版本且已建立初始資料。
+
+    Args:
+        engine (Engine): 資料庫引擎。
+        session_factory (sessionmaker): 用於初始化資料的 Session 工廠。
+
+    Returns:
+        bool: 若走快速路徑 (無需遷移也無需初始化) 則返回 True。
+    """
+    code_head = get_code_head_revision()
+    revision, user_version = read_schema_state(engine)
+
+    up_to_date = code_head is not None and revision == code_head
+    seeded = bool(user_version & SEEDED_FLAG)
+    if up_to_date and seeded:
+        logger.info(f"Database schema is at head revision {revision}.")
+        return True
+
+    if not up_to_date:
+        _migrate(engine, revision)
+
+    if not seeded:
+        with session_factory() as session:
+            _seed_initial_data(session)
+        mark_seeded(engine)
+    return False
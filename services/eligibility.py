@@ -0,0 +1,204 @@
+"""會員資格篩選。
+
+「具備資格 A 與 B、位於地區子樹 X、可排班的會員」這類條件以 repositories.member_filter 的
+述詞表示，有兩種算法：
+
+* 資料庫：MemberFilterRepository 編譯為單一查詢；資格、地區與可排班的組合只掃描
+  ix_members_eligibility (is_schedulable, region_id, qualification_mask) 索引。
+* 記憶體：EligibilityService 把所有會員的 (ID, 地區, 部門, 可排班, 資格遮罩) 與
+  (會員, 職務) 快取為 NumPy 欄位陣列，篩選只是幾個向量化的布林運算；地區子樹以
+  RegionLcaIndex 的進出時間判斷。適合畫面上反覆變更條件的互動查詢。
+
+快取依資料庫引擎共用，會員新增、修改、刪除，或職務、資格變動並提交後呼叫 members_changed()。
+出席率彙總的分組結果也依會員所屬群組計算，同一處請一併呼叫 AttendanceStats.members_changed()。
+"""
+
+import logging
+import threading
+import weakref
+from typing import Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models.member_model import Member
+from models.member_position_model import MemberPosition
+from repositories.duty_assignment_repository import DutyAssignmentRepository
+from repositories.member_filter import MemberPredicate, member_criteria
+from services.region_lca_index import RegionProximityService
+
+logger = logging.getLogger(__name__)
+
+# 地區或部門未指定時在欄位陣列中的值
+MISSING_ID = -1
+
+# 資料庫引擎 -> EligibilityService
+_services = weakref.WeakKeyDictionary()
+_services_lock = threading.Lock()
+
+
+class MemberColumns:
+    """所有會員的欄位陣列，依會員 ID 遞增排列。
+
+    Attributes:
+        ids (np.ndarray): 會員 ID。
+        region_ids (np.ndarray): 所屬地區 ID，未指定為 MISSING_ID。
+        department_ids (np.ndarray): 所屬部門 ID，未指定為 MISSING_ID。
+        schedulable (np.ndarray): 是否可排班 (布林)。
+        qualification_masks (np.ndarray): 資格遮罩 (int64)。
+    """
+
+    def __init__(self, rows):
+        """由 (ID, 地區 ID, 部門 ID, 可排班, 資格遮罩) 的 tuple 序列建立，未指定的 ID 須為 MISSING_ID。"""
+        data = np.array(rows, dtype=np.int64).reshape(-1, 5)
+        data = data[np.argsort(data[:, 0], kind="stable")]
+        self.ids = data[:, 0].copy()
+        self.region_ids = data[:, 1].copy()
+        self.department_ids = data[:, 2].copy()
+        self.schedulable = data[:, 3] != 0
+        self.qualification_masks = data[:, 4].copy()
+        # 相異的地區 ID 與每位會員對應的索引：distinct_regions[region_codes] == region_ids
+        self.distinct_regions, self.region_codes = np.unique(self.region_ids, return_inverse=True)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def index_of(self, member_ids) -> np.ndarray:
+        """返回會員 ID 在欄位陣列中的位置；不存在的會員為 -1。"""
+        member_ids = np.asarray(member_ids, dtype=np.int64)
+        if len(self.ids) == 0:
+            return np.full(len(member_ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.ids, member_ids), len(self.ids) - 1)
+        return np.where(self.ids[pos] == member_ids, pos, -1)
+
+
+class _Evaluation:
+    """MemberPredicate.mask() 使用的求值環境；同一次求值使用同一份欄位陣列與地區索引。"""
+
+    def __init__(self, service: "EligibilityService"):
+        self.service = service
+        self.columns = service.columns
+        self._index = None
+
+    def subtree_mask(self, region_id: int) -> np.ndarray:
+        if self._index is None:
+            with Session(bind=self.service.bind) as session:
+                self._index = RegionProximityService.for_session(session).index
+        if region_id not in self._index:
+            return np.zeros(len(self.columns), dtype=bool)
+        # 地區只有數百個：先判斷每個地區，再展開到會員
+        return self._index.subtree_mask(region_id, self.columns.distinct_regions)[self.columns.region_codes]
+
+    def holding_positions(self, position_ids) -> np.ndarray:
+        rows, pair_position_ids = self.service.position_pairs(self.columns)
+        mask = np.zeros(len(self.columns), dtype=bool)
+        mask[rows[np.isin(pair_position_ids, position_ids)]] = True
+        return mask
+
+    def assigned_on(self, day: int) -> np.ndarray:
+        # 排班經常變動，不快取；當天的排班以主鍵範圍讀取
+        with Session(bind=self.service.bind) as session:
+            member_ids = DutyAssignmentRepository(session).member_ids_on(day)
+        rows = self.columns.index_of(member_ids)
+        mask = np.zeros(len(self.columns), dtype=bool)
+        mask[rows[rows >= 0]] = True
+        return mask
+
+
+class EligibilityService:
+    """以快取的會員欄位陣列做向量化的資格篩選。
+
+    請使用 for_session() 取得與資料庫引擎共用的實例，而非直接建立。
+    """
+
+    def __init__(self, bind: Engine):
+        """初始化服務。
+
+        Args:
+            bind (Engine): 資料庫引擎。讀取時使用獨立的 Session，只會讀到已提交的資料。
+        """
+        self.bind = bind
+        self._lock = threading.Lock()
+        self._columns: MemberColumns | None = None
+        # (建立時的 columns, 會員位置, 職務 ID)
+        self._position_pairs: tuple | None = None
+
+    @classmethod
+    def for_session(cls, session: Session) -> "EligibilityService":
+        """取得 session 所連接資料庫共用的服務。"""
+        bind = session.get_bind()
+        with _services_lock:
+            service = _services.get(bind)
+            if service is None:
+                service = cls(bind)
+                _services[bind] = service
+            return service
+
+    @property
+    def columns(self) -> MemberColumns:
+        """目前的會員欄位陣列，必要時重新載入。"""
+        with self._lock:
+            if self._columns is None:
+                statement = select(Member.id, func.coalesce(Member.region_id, MISSING_ID),
+                                   func.coalesce(Member.department_id, MISSING_ID),
+                                   Member.is_schedulable, Member.qualification_mask)
+                # 只讀純量欄位，直接使用 Core 連線，省去 ORM 的結果處理
+                with self.bind.connect() as connection:
+                    # 先轉為 tuple：直接以 Row 建立陣列會逐欄位探測，慢上十倍以上
+                    self._columns = MemberColumns([tuple(row) for row in connection.execute(statement)])
+                logger.debug(f"Loaded eligibility columns for {len(self._columns)} members.")
+            return self._columns
+
+    def position_pairs(self, columns: MemberColumns) -> Tuple[np.ndarray, np.ndarray]:
+        """所有 (會員在 columns 中的位置, 職務 ID)，與 columns 一起快取。"""
+        with self._lock:
+            # 記錄建立時的 columns，避免與重新載入後的欄位陣列錯位
+            if self._position_pairs is None or self._position_pairs[0] is not columns:
+                with self.bind.connect() as connection:
+                    pairs = np.array([tuple(row) for row in connection.execute(
+                        select(MemberPosition.member_id, MemberPosition.position_id))], dtype=np.int64).reshape(-1, 2)
+                rows = columns.index_of(pairs[:, 0])
+                known = rows >= 0
+                self._position_pairs = (columns, rows[known], pairs[known, 1])
+            return self._position_pairs[1:]
+
+    def members_changed(self):
+        """會員資料、職務或資格變動並提交後呼叫，下次篩選時重新載入。"""
+        with self._lock:
+            self._columns = None
+            self._position_pairs = None
+
+    def evaluate_mask(self, predicate: MemberPredicate) -> np.ndarray:
+        """在欄位陣列上求值，返回與 columns.ids 等長的布林陣列。
+
+        與 MemberFilterRepository 以 SQL 查詢的結果相同，但只讀取快取，
+        除了 AssignedOn 需要讀取當天的排班之外不會查詢資料庫。
+        """
+        return predicate.mask(_Evaluation(self))
+
+    def evaluate(self, predicate: MemberPredicate) -> np.ndarray:
+        """返回符合條件的會員 ID (遞增)。"""
+        evaluation = _Evaluation(self)
+        return evaluation.columns.ids[predicate.mask(evaluation)]
+
+    def eligible_mask(self, required_mask: int = 0, region_id: int | None = None,
+                      schedulable_only: bool = True) -> np.ndarray:
+        """返回與 columns.ids 等長的布林陣列，標示符合條件的會員。
+
+        Args:
+            required_mask (int): 必須具備的資格遮罩，0 表示不限資格。
+            region_id (int | None): 只包含此地區子樹 (含自身) 的會員；None 表示不限地區。
+                地區不存在時沒有會員符合。
+            schedulable_only (bool): 是否只包含可排班的會員。
+
+        Returns:
+            np.ndarray: 布林陣列。
+        """
+        return self.evaluate_mask(member_criteria(region_id, None, required_mask, schedulable_only))
+
+    def eligible_ids(self, required_mask: int = 0, region_id: int | None = None,
+                     schedulable_only: bool = True) -> np.ndarray:
+        """返回符合條件的會員 ID (遞增)，參數同 eligible_mask()。"""
+        return self.evaluate(member_criteria(region_id, None, required_mask, schedulable_only))
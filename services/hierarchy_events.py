@@ -0,0 +1,28 @@
+"""地區階層變動通知。
+
+地區新增、移動或刪除並提交後呼叫 notify_region_hierarchy_changed()，
+讓所有依地區樹建立快取的服務 (會員數彙總、出席率彙總、資格篩選、LCA 索引、循環檢查) 一併失效。
+"""
+
+from sqlalchemy.orm import Session
+
+from models.region_model import Region
+from services.attendance import AttendanceStats
+from services.eligibility import EligibilityService
+from services.hierarchy_guard import HierarchyGuard
+from services.region_lca_index import RegionProximityService
+from services.region_rollup_service import RegionRollupService
+
+
+def notify_region_hierarchy_changed(session: Session):
+    """清除所有依賴地區階層的快取。
+
+    Args:
+        session (Session): 執行變更的資料庫會話。
+    """
+    HierarchyGuard.for_session(session, Region).invalidate()
+    RegionProximityService.for_session(session).invalidate()
+    RegionRollupService.for_session(session).hierarchy_changed()
+    AttendanceStats.for_session(session).invalidate()
+    # 刪除地區時其會員的所屬地區會一併變動
+    EligibilityService.for_session(session).members_changed()
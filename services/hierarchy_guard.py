@@ -0,0 +1,140 @@
+"""階層寫入檢查模組。
+
+地區與職務都是以 parent_id 自我參照的樹。寫入新的 parent_id 之前，
+HierarchyGuard 會以快取的「節點 -> 父節點」對應表沿祖先鏈往上走 (O(depth))，
+確認新的父節點不是自身或自身的後代，避免形成循環。
+
+對應表在第一次檢查時以一個查詢載入，之後由寫入端在提交後呼叫
+parent_changed() / invalidate() 維持同步；同一個資料庫引擎與模型共用一份快取。
+"""
+
+import logging
+import threading
+import weakref
+from typing import Dict, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# 資料庫引擎 -> {資料表名稱: HierarchyGuard}
+_guards = weakref.WeakKeyDictionary()
+_guards_lock = threading.Lock()
+
+
+class HierarchyError(ValueError):
+    """階層資料不合法，例如父節點不存在。"""
+
+
+class HierarchyCycleError(HierarchyError):
+    """新的父節點是自身或自身的後代，寫入後會形成循環。"""
+
+
+class HierarchyGuard:
+    """以快取的祖先對應表檢查 parent_id 寫入是否會形成循環。
+
+    請使用 for_session() 取得共用的實例，而非直接建立。
+    """
+
+    def __init__(self, session: Session, model):
+        """初始化階層檢查器。
+
+        Args:
+            session (Session): 用於載入對應表的資料庫會話。
+            model: 具有 id 與 parent_id 欄位的 SQLAlchemy 模型，例如 Region。
+        """
+        self.session = session
+        self.model = model
+        self._lock = threading.RLock()
+        self._parents: Dict[int, int | None] | None = None
+
+    @classmethod
+    def for_session(cls, session: Session, model) -> "HierarchyGuard":
+        """取得 session 所連接資料庫中，指定模型共用的檢查器。
+
+        Args:
+            session (Session): 資料庫會話。
+            model: 具有 id 與 parent_id 欄位的 SQLAlchemy 模型。
+
+        Returns:
+            HierarchyGuard: 共用的檢查器。
+        """
+        bind = session.get_bind()
+        with _guards_lock:
+            guards = _guards.setdefault(bind, {})
+            guard = guards.get(model.__tablename__)
+            if guard is None:
+                guard = cls(session, model)
+                guards[model.__tablename__] = guard
+            else:
+                # 以最近使用的 session 重新載入，避免使用已關閉的 session
+                guard.session = session
+            return guard
+
+    def _load(self):
+        rows = self.session.execute(select(self.model.id, self.model.parent_id)).all()
+        self._parents = dict(rows)
+
+    def _parent_map(self) -> Dict[int, int | None]:
+        if self._parents is None:
+            self._load()
+        return self._parents
+
+    def check_parent(self, node_id: int | None, new_parent_id: int | None):
+        """檢查將 node_id 的父節點設為 new_parent_id 是否合法。
+
+        Args:
+            node_id (int | None): 要修改的節點 ID；新增中的節點為 None。
+            new_parent_id (int | None): 新的父節點 ID，None 表示頂層。
+
+        Raises:
+            HierarchyCycleError: 新的父節點是自身或自身的後代。
+            HierarchyError: 新的父節點不存在。
+        """
+        self.check_parents({node_id: new_parent_id} if node_id is not None else {}, extra_parent_ids=[new_parent_id])
+
+    def check_parents(self, changes: Mapping[int, int | None], extra_parent_ids=()):
+        """一次檢查多個節點的新父節點 (例如拖放後整棵樹的層級)。
+
+        以「變更後」的對應表檢查每個被修改的節點，因此同一批內互相依賴的變更也能正確判斷。
+
+        Args:
+            changes (Mapping[int, int | None]): 節點 ID -> 新的父節點 ID。
+            extra_parent_ids (Iterable[int | None]): 另外需要確認存在的父節點 ID。
+
+        Raises:
+            HierarchyCycleError: 任一節點會位於循環中。
+            HierarchyError: 任一父節點不存在。
+        """
+        with self._lock:
+            parents = self._parent_map()
+            wanted = [p for p in list(changes.values()) + list(extra_parent_ids) if p is not None]
+            if any(p not in parents for p in wanted):
+                # 可能是其他地方新增的節點，重新載入一次再判斷
+                self._load()
+                parents = self._parents
+                missing = [p for p in wanted if p not in parents]
+                if missing:
+                    raise HierarchyError(f"父節點不存在 (ID: {missing[0]})。")
+
+            for node_id in changes:
+                # 沿變更後的祖先鏈往上走，回到自己即為循環；步數上限防止既有的循環造成無窮迴圈
+                current = changes[node_id]
+                for _ in range(len(parents) + 1):
+                    if current is None:
+                        break
+                    if current == node_id:
+                        raise HierarchyCycleError("不能將節點移到自己或自己的子節點之下。")
+                    current = changes[current] if current in changes else parents.get(current)
+
+    def parent_changed(self, node_id: int, parent_id: int | None):
+        """提交成功後呼叫，更新快取中的父節點 (新增節點也適用)。"""
+        with self._lock:
+            if self._parents is not None:
+                self._parents[node_id] = parent_id
+
+    def invalidate(self):
+        """清除快取，下次檢查時重新載入。刪除節點或大量變更後呼叫。"""
+        with self._lock:
+            self._parents = None
@@ -0,0 +1,111 @@
+"""資料完整性掃描模組。
+
+以單一 SQL 查詢 (各項檢查以 UNION ALL 串接) 一次掃描整個資料庫，找出：
+
+* cycle：地區/職務的 parent_id 形成循環 (包含循環底下的節點)。
+* orphan：parent_id 指向不存在的地區/職務。
+* duplicate_sibling：同一個父節點底下有同名的地區/職務。
+* multiple_primary：會員有一個以上的主要職務。
+
+所有檢查都是集合運算 (遞迴 CTE、GROUP BY)，不會逐筆載入 ORM 物件。
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+HIERARCHY_TABLES = ("regions", "positions")
+
+
+def _hierarchy_checks(table: str) -> str:
+    # 以「無父節點或父節點不存在」的節點為起點，走不到的節點必定位於循環中或循環底下
+    return f"""
+        SELECT 'cycle', '{table}', id, name FROM {table}
+        WHERE id NOT IN (
+            WITH RECURSIVE reachable(id) AS (
+                SELECT id FROM {table}
+                WHERE parent_id IS NULL OR parent_id NOT IN (SELECT id FROM {table})
+                UNION
+                SELECT child.id FROM {table} AS child JOIN reachable ON child.parent_id = reachable.id
+            )
+            SELECT id FROM reachable
+        )
+        UNION ALL
+        SELECT 'orphan', '{table}', id, name || ' (parent_id=' || parent_id || ')' FROM {table}
+        WHERE parent_id IS NOT NULL AND parent_id NOT IN (SELECT id FROM {table})
+        UNION ALL
+        SELECT 'duplicate_sibling', '{table}', MIN(id), name || ' x' || COUNT(*) FROM {table}
+        GROUP BY parent_id, name HAVING COUNT(*) > 1
+    """
+
+
+_SCAN_SQL = text(
+    "\nUNION ALL\n".join(_hierarchy_checks(table) for table in HIERARCHY_TABLES)
+    + """
+    UNION ALL
+    SELECT 'multiple_primary', 'member_positions', member_id, COUNT(*) || ' primary positions'
+    FROM member_positions WHERE is_primary
+    GROUP BY member_id HAVING COUNT(*) > 1
+    """
+)
+
+
+@dataclass
+class IntegrityIssue:
+    """一筆完整性問題。
+
+    Attributes:
+        kind (str): 問題種類，例如 "cycle"、"orphan"。
+        table (str): 發生問題的資料表。
+        entity_id (int): 相關的資料列 ID (multiple_primary 時為會員 ID)。
+        detail (str): 補充說明，例如名稱或數量。
+    """
+    kind: str
+    table: str
+    entity_id: int
+    detail: str
+
+
+@dataclass
+class IntegrityReport:
+    """完整性掃描結果。
+
+    Attributes:
+        issues (List[IntegrityIssue]): 找到的所有問題。
+    """
+    issues: List[IntegrityIssue] = field(default_factory=list)
+
+    @property
+    def is_clean(self) -> bool:
+        return not self.issues
+
+    def summary(self) -> str:
+        """以「資料表.種類: 數量」格式摘要問題。"""
+        if self.is_clean:
+            return "no integrity issues"
+        counts = Counter(f"{issue.table}.{issue.kind}" for issue in self.issues)
+        return ", ".join(f"{key}: {count}" for key, count in sorted(counts.items()))
+
+
+def scan_integrity(session: Session) -> IntegrityReport:
+    """掃描整個資料庫的階層與主要職務完整性。
+
+    Args:
+        session (Session): 資料庫會話。
+
+    Returns:
+        IntegrityReport: 掃描結果。
+    """
+    rows = session.execute(_SCAN_SQL).all()
+    report = IntegrityReport([IntegrityIssue(kind, table, entity_id, detail) for kind, table, entity_id, detail in rows])
+    if report.is_clean:
+        logger.info("Integrity scan found no issues.")
+    else:
+        logger.warning(f"Integrity scan found {len(report.issues)} issues ({report.summary()}).")
+    return report
@@ -1,3 +1,4 @@
+import re
 import pandas as pd
 from sqlalchemy.orm import sessionmaker
 from models.member_model import Member
@@ -8,15 +9,25 @@ from repositories.region_repository import RegionRepository
 from repositories.position_repository import PositionRepository
 from repositories.member_repository import MemberRepository
 from repositories.member_position_repository import MemberPositionRepository
+from repositories.qualification_repository import QualificationRepository
+from services.attendance import AttendanceStats
+from services.eligibility import EligibilityService
+from services.integrity_scanner import scan_integrity
+from services.region_rollup_service import RegionRollupService
 
 RowResult = namedtuple('RowResult', ['row_index', 'status', 'message'])
 
+# 選填的「資格」欄位可列出多個資格名稱
+QUALIFICATION_SEPARATORS = re.compile(r"[,，、;；\s]+")
+
 class MemberImporter:
     """
     負責從 Excel 檔案匯入會員資料到資料庫的核心服務。
     """
     def __init__(self, session_factory: sessionmaker):
         self.Session = session_factory
+        # 最近一次匯入完成後的完整性掃描結果
+        self.last_integrity_report = None
 
     def preview_excel(self, file_path: str) -> pd.DataFrame:
         """僅讀取 Excel 檔案並返回 DataFrame 以供預覽。"""
@@ -31,6 +42,7 @@ class MemberImporter:
         """
         執行匯入程序，這是一個 generator，會逐筆回報進度。
         """
+        self.last_integrity_report = None
         with self.Session() as session:
             # Repositories
             region_repo = RegionRepository(session)
@@ -42,6 +54,8 @@ class MemberImporter:
             existing_regions = {r.name: r.id for r in region_repo.get_all()}
             existing_positions = {p.name: p.id for p in position_repo.get_all()}
             existing_members = {m.name: m for m in member_repo.get_all()}
+            existing_qualifications = {q.name: q.mask for q in QualificationRepository(session).get_all()}
+            rollup_service = RegionRollupService.for_session(session)
 
             for index, row in dataframe.iterrows():
                 try:
@@ -61,12 +75,26 @@ class MemberImporter:
                         raise ValueError(f"職務 '{position_name}' 不存在。")
                     position_id = existing_positions[position_name]
 
+                    qualification_mask = 0
+                    for qualification_name in QUALIFICATION_SEPARATORS.split(str(row.get('資格', '')).strip()):
+                        # preview_excel 轉為字串時，空白儲存格會變成 'nan'
+                        if not qualification_name or qualification_name == 'nan':
+                            continue
+                        if qualification_name not in existing_qualifications:
+                            raise ValueError(f"資格 '{qualification_name}' 不存在。")
+                        qualification_mask |= existing_qualifications[qualification_name]
+
                     member = existing_members.get(name)
+                    is_new_member = member is None
+                    old_region_id = None if is_new_member else member.region_id
                     if member:
                         member.phone_number = phone if phone else member.phone_number
                         member.region_id = region_id
+                        # 只加上列出的資格，不移除會員原有的資格
+                        member.qualification_mask = (member.qualification_mask or 0) | qualification_mask
                     else:
-                        member = Member(name=name, phone_number=phone, region_id=region_id)
+                        member = Member(name=name, phone_number=phone, region_id=region_id,
+                                        qualification_mask=qualification_mask)
                         member_repo.add(member)
                         session.flush() # Flush to get ID for new member
                         existing_members[name] = member
@@ -83,11 +111,23 @@ class MemberImporter:
                         )
                         member_position_repo.add(new_assignment)
                     
+                    # commit 後屬性會過期，先取出以免每筆多一次查詢
+                    is_schedulable = member.is_schedulable
                     session.commit()
+                    if is_new_member:
+                        rollup_service.member_added(region_id, is_schedulable)
+                    else:
+                        rollup_service.member_changed(old_region_id, is_schedulable, region_id, is_schedulable)
                     yield RowResult(index, "success", "匯入成功")
 
                 except Exception as e:
                     session.rollback()
                     yield RowResult(index, "failure", str(e))
 
+            EligibilityService.for_session(session).members_changed()
+            AttendanceStats.for_session(session).members_changed()
+
+            # 匯入完成後檢查整個資料庫的參照關係 (例如一位會員有多個主要職務)
+            self.last_integrity_report = scan_integrity(session)
+
 
@@ -0,0 +1,349 @@
+"""重複活動的週期規則與延遲展開。
+
+重複的活動 (每週座談會、每月研討會) 只儲存一筆 Activity 與一條週期規則，
+不會把每次舉行的日期寫成資料列。規則採用 iCalendar RRULE 的子集，例如::
+
+    FREQ=WEEKLY;INTERVAL=2;BYDAY=SA          每兩週的週六
+    FREQ=MONTHLY;BYDAY=2SU;UNTIL=20271231    每月第二個週日，至 2027 年底
+    FREQ=MONTHLY;BYMONTHDAY=15;COUNT=12      每月 15 日，共 12 次
+
+展開以產生器逐一產生日期，並直接從查詢區間所在的週期開始 (每日/每週規則以算術跳過
+之前的週期)，超過區間結尾就停止，因此查詢一天只會產生那一天附近的日期。
+展開結果以 (規則, 起始日, 區間) 為鍵存放在有上限的 LRU 快取中，行事曆重繪或重複的
+衝突檢查不必重新展開。
+"""
+
+import calendar
+import logging
+from dataclasses import dataclass
+from datetime import MAXYEAR, date, timedelta
+from functools import lru_cache
+from itertools import count as count_from
+from typing import Iterator, List, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.activity_model import Activity
+from repositories.activity_repository import ActivityRepository
+
+logger = logging.getLogger(__name__)
+
+# LRU 快取保留的 (規則, 起始日, 區間) 展開結果數
+EXPANSION_CACHE_SIZE = 1024
+
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+WEEKDAY_NAMES = ("一", "二", "三", "四", "五", "六", "日")
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+# 公曆每 400 年 (4800 個月) 完全重複；每月規則連續這麼多個月都沒有日期，之後也不會有
+CALENDAR_CYCLE_MONTHS = 400 * 12
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    """解析後的週期規則。
+
+    Attributes:
+        freq (str): "DAILY"、"WEEKLY" 或 "MONTHLY"。
+        interval (int): 每幾個週期舉行一次。
+        weekdays (Tuple[Tuple[int | None, int], ...]): BYDAY：(第幾個, 星期)；
+            每週規則的「第幾個」為 None，每月規則可為 1..5 或 -1 (最後一個)。
+        month_days (Tuple[int, ...]): BYMONTHDAY：每月的第幾天。
+        until (date | None): 最後可能舉行的日期 (含)。
+        count (int | None): 總共舉行的次數。
+    """
+    freq: str
+    interval: int = 1
+    weekdays: Tuple[Tuple[int | None, int], ...] = ()
+    month_days: Tuple[int, ...] = ()
+    until: date | None = None
+    count: int | None = None
+
+    @classmethod
+    def parse(cls, text: str) -> "RecurrenceRule":
+        """解析 RRULE 文字。
+
+        Raises:
+            ValueError: 規則格式錯誤或使用了不支援的屬性。
+        """
+        parts = {}
+        for part in text.strip().upper().split(";"):
+            if not part:
+                continue
+            key, sep, value = part.partition("=")
+            if not sep or not value:
+                raise ValueError(f"週期規則格式錯誤：{part}")
+            parts[key] = value
+
+        freq = parts.pop("FREQ", None)
+        if freq not in FREQUENCIES:
+            raise ValueError(f"不支援的週期：{freq}")
+        interval = int(parts.pop("INTERVAL", "1"))
+        if interval < 1:
+            raise ValueError("INTERVAL 必須大於 0。")
+
+        weekdays = []
+        for code in filter(None, parts.pop("BYDAY", "").split(",")):
+            ordinal, weekday = code[:-2], code[-2:]
+            if weekday not in WEEKDAY_CODES:
+                raise ValueError(f"無效的星期：{code}")
+            if ordinal and (freq != "MONTHLY" or int(ordinal) not in (1, 2, 3, 4, 5, -1)):
+                raise ValueError(f"無效的週次：{code}")
+            weekdays.append((int(ordinal) if ordinal else None, WEEKDAY_CODES.index(weekday)))
+
+        month_days = tuple(int(day) for day in filter(None, parts.pop("BYMONTHDAY", "").split(",")))
+        if month_days and (freq != "MONTHLY" or not all(1 <= day <= 31 for day in month_days)):
+            raise ValueError("BYMONTHDAY 只能用於每月規則，且須介於 1 到 31。")
+
+        until = parts.pop("UNTIL", None)
+        count = parts.pop("COUNT", None)
+        if until and count:
+            raise ValueError("UNTIL 與 COUNT 不可同時使用。")
+        if parts:
+            raise ValueError(f"不支援的規則屬性：{', '.join(parts)}")
+        return cls(
+            freq=freq,
+            interval=interval,
+            weekdays=tuple(sorted(set(weekdays), key=lambda item: (item[0] or 0, item[1]))),
+            month_days=tuple(sorted(set(month_days))),
+            until=date(int(until[:4]), int(until[4:6]), int(until[6:8])) if until else None,
+            count=int(count) if count else None,
+        )
+
+    def to_text(self) -> str:
+        """轉回標準化的 RRULE 文字。"""
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.weekdays:
+            parts.append("BYDAY=" + ",".join(f"{ordinal or ''}{WEEKDAY_CODES[weekday]}"
+                                             for ordinal, weekday in self.weekdays))
+        if self.month_days:
+            parts.append("BYMONTHDAY=" + ",".join(map(str, self.month_days)))
+        if self.until:
+            parts.append(f"UNTIL={self.until:%Y%m%d}")
+        if self.count:
+            parts.append(f"COUNT={self.count}")
+        return ";".join(parts)
+
+
+def _daily(rule: RecurrenceRule, start: date, first_period: int) -> Iterator[Tuple[int, date]]:
+    for period in count_from(first_period):
+        yield period, start + timedelta(days=period * rule.interval)
+
+
+def _weekly(rule: RecurrenceRule, start: date, first_period: int) -> Iterator[Tuple[int, date]]:
+    week0 = start - timedelta(days=start.weekday())
+    weekdays = sorted({weekday for _, weekday in rule.weekdays} or {start.weekday()})
+    # 第一週中早於起始日的星期不算
+    skipped = sum(1 for weekday in weekdays if weekday < start.weekday())
+    index = max(first_period * len(weekdays) - skipped, 0)
+    for period in count_from(first_period):
+        week = week0 + timedelta(weeks=period * rule.interval)
+        for weekday in weekdays:
+            day = week + timedelta(days=weekday)
+            if day >= start:
+                yield index, day
+                index += 1
+
+
+def _month_dates(rule: RecurrenceRule, year: int, month: int, start: date) -> List[date]:
+    last_day = calendar.monthrange(year, month)[1]
+    if rule.weekdays:
+        days = set()
+        for ordinal, weekday in rule.weekdays:
+            first = (weekday - date(year, month, 1).weekday()) % 7 + 1
+            candidates = list(range(first, last_day + 1, 7))
+            if ordinal is None:
+                days.update(candidates)
+            elif ordinal == -1 or ordinal <= len(candidates):
+                days.add(candidates[-1] if ordinal == -1 else candidates[ordinal - 1])
+    else:
+        # 沒有該日的月份 (例如 2 月 30 日) 會被略過
+        days = {day for day in (rule.month_days or (start.day,)) if day <= last_day}
+    return [date(year, month, day) for day in sorted(days)]
+
+
+def _monthly(rule: RecurrenceRule, start: date, first_period: int) -> Iterator[Tuple[int, date]]:
+    # 每月的次數不固定，有 COUNT 時必須從第一個月開始數
+    first_period = 0 if rule.count else first_period
+    index = 0
+    # 例如 INTERVAL=12;BYMONTHDAY=31 從 2 月開始永遠不會舉行，不加上限會無窮迴圈。
+    # 第一個月中早於起始日的日期不算，所以多容許一個月
+    max_empty_periods = -(-CALENDAR_CYCLE_MONTHS // rule.interval) + 1
+    empty_periods = 0
+    for period in count_from(first_period):
+        months = start.month - 1 + period * rule.interval
+        year = start.year + months // 12
+        if year > MAXYEAR:
+            return
+        found = False
+        for day in _month_dates(rule, year, months % 12 + 1, start):
+            if day >= start:
+                found = True
+                yield index, day
+                index += 1
+        empty_periods = 0 if found else empty_periods + 1
+        if empty_periods >= max_empty_periods:
+            return
+
+
+def _first_period(rule: RecurrenceRule, start: date, window_start: date) -> int:
+    """區間開始時所在的週期 (不會早於第 0 個週期)。"""
+    if window_start <= start:
+        return 0
+    if rule.freq == "DAILY":
+        return (window_start - start).days // rule.interval
+    if rule.freq == "WEEKLY":
+        weeks = ((window_start - timedelta(days=window_start.weekday()))
+                 - (start - timedelta(days=start.weekday()))).days // 7
+        return weeks // rule.interval
+    months = (window_start.year - start.year) * 12 + window_start.month - start.month
+    return months // rule.interval
+
+
+def iter_occurrences(rule: RecurrenceRule, start: date, window_start: date | None = None) -> Iterator[date]:
+    """依序產生規則的舉行日期，從 window_start 所在的週期開始；受 UNTIL 與 COUNT 限制。
+
+    Args:
+        rule (RecurrenceRule): 週期規則。
+        start (date): 第一次舉行的日期 (DTSTART)。
+        window_start (date | None): 只需要這一天 (含) 之後的日期；None 表示從頭開始。
+
+    Yields:
+        date: 舉行日期 (遞增)。
+    """
+    window_start = window_start or start
+    generator = {"DAILY": _daily, "WEEKLY": _weekly, "MONTHLY": _monthly}[rule.freq]
+    for index, day in generator(rule, start, _first_period(rule, start, window_start)):
+        if (rule.count is not None and index >= rule.count) or (rule.until is not None and day > rule.until):
+            return
+        if day >= window_start:
+            yield day
+
+
+@lru_cache(maxsize=EXPANSION_CACHE_SIZE)
+def _parse_cached(text: str) -> RecurrenceRule:
+    return RecurrenceRule.parse(text)
+
+
+@lru_cache(maxsize=EXPANSION_CACHE_SIZE)
+def expand(rule_text: str, start: date, window_start: date, window_end: date) -> Tuple[date, ...]:
+    """返回區間內 (含首尾) 的舉行日期。結果以 (規則, 起始日, 區間) 快取。
+
+    Args:
+        rule_text (str): RRULE 文字。
+        start (date): 第一次舉行的日期。
+        window_start (date): 區間起始日。
+        window_end (date): 區間結束日。
+
+    Returns:
+        Tuple[date, ...]: 舉行日期 (遞增)。
+    """
+    result = []
+    for day in iter_occurrences(_parse_cached(rule_text), start, window_start):
+        if day > window_end:
+            break
+        result.append(day)
+    return tuple(result)
+
+
+def clear_cache():
+    """清除展開結果快取。"""
+    expand.cache_clear()
+    _parse_cached.cache_clear()
+
+
+def normalize(rule_text: str | None, start: date | None = None) -> str | None:
+    """驗證並標準化規則文字，讓相同規則在快取中共用同一個鍵。空字串視為不重複。
+
+    Args:
+        rule_text (str | None): RRULE 文字。
+        start (date | None): 第一次舉行的日期；給定時一併檢查規則至少會舉行一次。
+
+    Raises:
+        ValueError: 規則格式錯誤，或從 start 開始永遠不會舉行 (例如 2 月開始的 INTERVAL=12;BYMONTHDAY=31)。
+    """
+    if not rule_text or not rule_text.strip():
+        return None
+    rule = _parse_cached(rule_text)
+    if start is not None and next(iter_occurrences(rule, start), None) is None:
+        raise ValueError("此規則從活動日期開始不會產生任何舉行日期。")
+    return rule.to_text()
+
+
+def recurrence_end(rule_text: str | None, start: date) -> date | None:
+    """返回重複活動最後一次舉行的日期，存入 Activity.recurrence_end 供區間查詢預先篩選。
+
+    不重複的活動與沒有結束的規則都返回 None。
+    """
+    if not rule_text:
+        return None
+    rule = _parse_cached(rule_text)
+    if rule.until is not None:
+        return rule.until
+    if rule.count is not None:
+        last = start
+        for last in iter_occurrences(rule, start):
+            pass
+        return last
+    return None
+
+
+def describe(rule_text: str | None) -> str:
+    """以中文描述規則，例如「每 2 週 (週六)」。"""
+    if not rule_text:
+        return "不重複"
+    rule = _parse_cached(rule_text)
+    unit = {"DAILY": "天", "WEEKLY": "週", "MONTHLY": "個月"}[rule.freq]
+    text = f"每{unit}" if rule.interval == 1 else f"每 {rule.interval} {unit}"
+    details = []
+    for ordinal, weekday in rule.weekdays:
+        prefix = "" if ordinal is None else ("最後一個" if ordinal == -1 else f"第 {ordinal} 個")
+        details.append(f"{prefix}週{WEEKDAY_NAMES[weekday]}")
+    details += [f"{day} 日" for day in rule.month_days]
+    if details:
+        text += f" ({'、'.join(details)})"
+    if rule.until:
+        text += f"，至 {rule.until.isoformat()}"
+    if rule.count:
+        text += f"，共 {rule.count} 次"
+    return text
+
+
+def activity_occurrences(activity: Activity, window_start: date, window_end: date) -> Tuple[date, ...]:
+    """返回活動在區間內 (含首尾) 的舉行日期。"""
+    if not activity.recurrence:
+        return (activity.activity_date,) if window_start <= activity.activity_date <= window_end else ()
+    return expand(activity.recurrence, activity.activity_date, window_start, window_end)
+
+
+def window_occurrences(activities: Sequence[Activity], window_start: date,
+                       window_end: date) -> List[Tuple[date, Activity]]:
+    """列出已載入的活動在區間內 (含首尾) 的每一次舉行，依日期與開始時間排序。"""
+    return sorted(
+        ((day, activity) for activity in activities for day in activity_occurrences(activity, window_start, window_end)),
+        key=lambda item: (item[0], item[1].start_minute, item[1].id),
+    )
+
+
+def occurrences_between(session: Session, window_start: date, window_end: date) -> List[Tuple[date, Activity]]:
+    """列出區間內 (含首尾) 所有活動的每一次舉行，依日期與開始時間排序。
+
+    資料庫只取出可能在區間內舉行的活動 (見 ActivityRepository.get_in_window)，
+    重複的活動才在記憶體中展開，且只展開這個區間。
+
+    Args:
+        session (Session): 資料庫會話。
+        window_start (date): 區間起始日。
+        window_end (date): 區間結束日。
+
+    Returns:
+        List[Tuple[date, Activity]]: (舉行日期, 活動)。
+    """
+    activities = ActivityRepository(session).get_in_window(window_start, window_end)
+    return window_occurrences(activities, window_start, window_end)
+
+
+def activities_on(session: Session, day: date) -> List[Activity]:
+    """返回在某一天舉行的所有活動 (含重複活動當天的那一次)。"""
+    return [activity for _, activity in occurrences_between(session, day, day)]
@@ -0,0 +1,267 @@
+"""地區最低共同祖先 (LCA) 索引模組。
+
+排班與講師指派需要知道「兩個地區在組織樹上有多近」。RegionLcaIndex 對地區樹做一次
+Euler tour，並在走訪序列的深度上建立 sparse table (O(n log n))，之後：
+
+* lca(a, b)：兩地區的最低共同祖先，O(1)。
+* distance(a, b)：兩地區在樹上相隔的邊數，O(1)。
+* is_ancestor(a, b)：a 是否為 b 的祖先 (含自身)，O(1)，以進出時間判斷。
+
+各方法另有以 NumPy 陣列一次查詢多組的版本。多棵頂層地區樹之間以一個虛擬的
+組織根節點相連：不同樹的地區沒有共同祖先 (lca 為 None)，距離則經過該虛擬根節點計算。
+
+RegionProximityService 依資料庫引擎快取索引，只有在地區階層變動 (invalidate()) 後
+才會重建。
+"""
+
+import logging
+import threading
+import weakref
+from typing import Dict, Iterable
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.region_model import Region
+
+logger = logging.getLogger(__name__)
+
+# 資料庫引擎 -> RegionProximityService
+_services = weakref.WeakKeyDictionary()
+_services_lock = threading.Lock()
+
+
+class RegionLcaIndex:
+    """以 Euler tour + sparse table 實作的地區樹 LCA 索引。
+
+    內部以連續的節點編號 (0 為虛擬根節點) 儲存；對外一律使用地區 ID。
+    """
+
+    def __init__(self, parents: Dict[int, int | None]):
+        """由「地區 ID -> 父地區 ID」對應表建立索引。
+
+        父地區不存在的地區視為頂層地區；位於循環中的地區無法從根節點走到，不會被加入索引。
+
+        Args:
+            parents (Dict[int, int | None]): 地區 ID -> 父地區 ID。
+        """
+        ids = sorted(parents)
+        index_of = {region_id: i + 1 for i, region_id in enumerate(ids)}
+        children = [[] for _ in range(len(ids) + 1)]
+        for region_id in ids:
+            parent_index = index_of.get(parents[region_id], 0)
+            children[parent_index].append(index_of[region_id])
+
+        node_count = len(ids) + 1
+        depth = np.full(node_count, -1, dtype=np.int32)
+        first = np.full(node_count, -1, dtype=np.int64)
+        last = np.full(node_count, -1, dtype=np.int64)
+        euler = []
+
+        # 以顯式堆疊做深度優先走訪，避免深樹造成遞迴過深
+        depth[0] = 0
+        stack = [(0, 0)]
+        while stack:
+            node, child_pos = stack.pop()
+            if child_pos == 0:
+                first[node] = len(euler)
+            euler.append(node)
+            if child_pos < len(children[node]):
+                stack.append((node, child_pos + 1))
+                child = children[node][child_pos]
+                depth[child] = depth[node] + 1
+                stack.append((child, 0))
+            last[node] = len(euler) - 1
+
+        unreachable = int(np.count_nonzero(first < 0))
+        if unreachable:
+            logger.warning(f"{unreachable} regions are part of a parent cycle and are excluded from the LCA index.")
+
+        self._ids = np.array([0] + ids, dtype=np.int64)
+        self._sorted_ids = np.array(ids, dtype=np.int64)
+        self._depth = depth
+        self._first = first
+        self._last = last
+        self._euler = np.array(euler, dtype=np.int64)
+        self._build_sparse_table()
+
+    def _build_sparse_table(self):
+        # table[k][i] 為 euler[i : i + 2^k] 中深度最小的節點
+        levels = [self._euler]
+        span = 1
+        while span * 2 <= len(self._euler):
+            previous = levels[-1]
+            left, right = previous[:-span], previous[span:]
+            levels.append(np.where(self._depth[left] <= self._depth[right], left, right))
+            span *= 2
+        self._table = levels
+
+    def __len__(self) -> int:
+        return len(self._sorted_ids)
+
+    def __contains__(self, region_id: int) -> bool:
+        return self._lookup_one(region_id, raise_missing=False) is not None
+
+    def _lookup_one(self, region_id: int, raise_missing: bool = True) -> int | None:
+        pos = int(np.searchsorted(self._sorted_ids, region_id))
+        if pos < len(self._sorted_ids) and self._sorted_ids[pos] == region_id and self._first[pos + 1] >= 0:
+            return pos + 1
+        if raise_missing:
+            raise KeyError(f"Region {region_id} is not in the LCA index.")
+        return None
+
+    def _lookup(self, region_ids) -> np.ndarray:
+        region_ids = np.asarray(region_ids, dtype=np.int64)
+        pos = np.searchsorted(self._sorted_ids, region_ids)
+        pos = np.minimum(pos, max(len(self._sorted_ids) - 1, 0))
+        if len(self._sorted_ids) == 0 or not np.all(self._sorted_ids[pos] == region_ids):
+            raise KeyError("Some regions are not in the LCA index.")
+        nodes = pos + 1
+        if np.any(self._first[nodes] < 0):
+            raise KeyError("Some regions are not in the LCA index.")
+        return nodes
+
+    def _lca_nodes(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        left = np.minimum(self._first[a], self._first[b])
+        right = np.maximum(self._first[a], self._first[b])
+        # 區間長度的 log2 (向下取整)
+        k = np.floor(np.log2(right - left + 1)).astype(np.int64)
+        result = np.empty(len(a), dtype=np.int64)
+        for level in np.unique(k):
+            mask = k == level
+            table = self._table[level]
+            x = table[left[mask]]
+            y = table[right[mask] - (1 << int(level)) + 1]
+            result[mask] = np.where(self._depth[x] <= self._depth[y], x, y)
+        return result
+
+    def lca(self, a: int, b: int) -> int | None:
+        """返回兩個地區的最低共同祖先 ID；若分屬不同的頂層地區樹則為 None。"""
+        node = int(self._lca_nodes(np.array([self._lookup_one(a)]), np.array([self._lookup_one(b)]))[0])
+        return int(self._ids[node]) if node else None
+
+    def distance(self, a: int, b: int) -> int:
+        """返回兩個地區在樹上相隔的邊數 (不同頂層樹之間經由虛擬根節點)。"""
+        x, y = self._lookup_one(a), self._lookup_one(b)
+        node = self._lca_nodes(np.array([x]), np.array([y]))[0]
+        return int(self._depth[x] + self._depth[y] - 2 * self._depth[node])
+
+    def is_ancestor(self, ancestor: int, descendant: int) -> bool:
+        """ancestor 是否為 descendant 的祖先 (同一個地區也視為成立)。"""
+        a, d = self._lookup_one(ancestor), self._lookup_one(descendant)
+        return bool(self._first[a] <= self._first[d] and self._last[d] <= self._last[a])
+
+    def depth(self, region_id: int) -> int:
+        """返回地區的深度，頂層地區為 0。"""
+        return int(self._depth[self._lookup_one(region_id)]) - 1
+
+    def lca_many(self, a_ids: Iterable[int], b_ids: Iterable[int]) -> np.ndarray:
+        """逐對查詢最低共同祖先。不同頂層樹的組合以 0 表示。
+
+        Args:
+            a_ids (Iterable[int]): 地區 ID 陣列。
+            b_ids (Iterable[int]): 與 a_ids 等長的地區 ID 陣列。
+
+        Returns:
+            np.ndarray: 每一對的最低共同祖先 ID。
+        """
+        nodes = self._lca_nodes(self._lookup(a_ids), self._lookup(b_ids))
+        return self._ids[nodes]
+
+    def distance_many(self, a_ids: Iterable[int], b_ids: Iterable[int]) -> np.ndarray:
+        """逐對查詢樹上距離。
+
+        Args:
+            a_ids (Iterable[int]): 地區 ID 陣列。
+            b_ids (Iterable[int]): 與 a_ids 等長的地區 ID 陣列。
+
+        Returns:
+            np.ndarray: 每一對相隔的邊數。
+        """
+        a, b = self._lookup(a_ids), self._lookup(b_ids)
+        nodes = self._lca_nodes(a, b)
+        return self._depth[a] + self._depth[b] - 2 * self._depth[nodes]
+
+    def distance_matrix(self, a_ids: Iterable[int], b_ids: Iterable[int]) -> np.ndarray:
+        """返回 len(a_ids) x len(b_ids) 的距離矩陣，例如會員地區對排班地區。"""
+        a, b = self._lookup(a_ids), self._lookup(b_ids)
+        aa, bb = np.meshgrid(a, b, indexing="ij")
+        nodes = self._lca_nodes(aa.ravel(), bb.ravel()).reshape(aa.shape)
+        return self._depth[aa] + self._depth[bb] - 2 * self._depth[nodes]
+
+    def is_ancestor_many(self, ancestor_ids: Iterable[int], descendant_ids: Iterable[int]) -> np.ndarray:
+        """逐對判斷祖先關係，返回布林陣列。"""
+        a, d = self._lookup(ancestor_ids), self._lookup(descendant_ids)
+        return (self._first[a] <= self._first[d]) & (self._last[d] <= self._last[a])
+
+    def subtree_mask(self, ancestor: int, region_ids: Iterable[int]) -> np.ndarray:
+        """判斷每個地區是否位於 ancestor 的子樹 (含自身)，例如會員的所屬地區。
+
+        與 is_ancestor_many 不同，不在索引中的地區 (例如以 -1 表示的「未指定」) 直接視為 False。
+
+        Args:
+            ancestor (int): 子樹根節點的地區 ID，必須在索引中。
+            region_ids (Iterable[int]): 地區 ID 陣列。
+
+        Returns:
+            np.ndarray: 與 region_ids 等長的布林陣列。
+        """
+        a = self._lookup_one(ancestor)
+        region_ids = np.asarray(region_ids, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._sorted_ids, region_ids), len(self._sorted_ids) - 1)
+        first, last = self._first[pos + 1], self._last[pos + 1]
+        return (self._sorted_ids[pos] == region_ids) & (first >= self._first[a]) & (last <= self._last[a])
+
+
+class RegionProximityService:
+    """依資料庫引擎快取的 RegionLcaIndex。
+
+    請使用 for_session() 取得共用的實例；地區階層變動後呼叫 invalidate()。
+    """
+
+    def __init__(self, bind):
+        """初始化服務。
+
+        Args:
+            bind (Engine): 資料庫引擎。
+        """
+        self.bind = bind
+        self._lock = threading.Lock()
+        self._index: RegionLcaIndex | None = None
+
+    @classmethod
+    def for_session(cls, session: Session) -> "RegionProximityService":
+        """取得 session 所連接資料庫共用的服務。"""
+        bind = session.get_bind()
+        with _services_lock:
+            service = _services.get(bind)
+            if service is None:
+                service = cls(bind)
+                _services[bind] = service
+            return service
+
+    @property
+    def index(self) -> RegionLcaIndex:
+        """目前的 LCA 索引，必要時重新建立。"""
+        with self._lock:
+            if self._index is None:
+                with Session(bind=self.bind) as session:
+                    parents = dict(session.execute(select(Region.id, Region.parent_id)).all())
+                self._index = RegionLcaIndex(parents)
+                logger.debug(f"Built region LCA index for {len(parents)} regions.")
+            return self._index
+
+    def invalidate(self):
+        """地區新增、移動或刪除後呼叫，下次查詢時重建索引。"""
+        with self._lock:
+            self._index = None
+
+    def lca(self, a: int, b: int) -> int | None:
+        return self.index.lca(a, b)
+
+    def distance(self, a: int, b: int) -> int:
+        return self.index.distance(a, b)
+
+    def is_ancestor(self, ancestor: int, descendant: int) -> bool:
+        return self.index.is_ancestor(ancestor, descendant)
@@ -0,0 +1,197 @@
+"""地區會員數彙總服務。
+
+以一個 ``GROUP BY region_id`` 查詢取得每個地區直屬的會員數與可排班會員數，
+再沿著父地區對應表由下往上累加 (O(n))，得到每個地區整棵子樹的人數。
+
+結果會被快取，並在會員新增、移動、刪除時沿祖先鏈 (O(depth)) 增量更新；
+地區階層本身變動時則清除快取，下次讀取時重新計算。同一個資料庫引擎共用一份快取，
+因此匯入服務 (使用自己的 Session) 與各分頁看到的數字一致。
+"""
+
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models.member_model import Member
+from models.region_model import Region
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RegionRollup:
+    """單一地區子樹 (含自身) 的會員人數。
+
+    Attributes:
+        members (int): 會員數。
+        schedulable (int): 可排班的會員數。
+    """
+    members: int = 0
+    schedulable: int = 0
+
+
+EMPTY_ROLLUP = RegionRollup()
+
+# 資料庫引擎 -> 彙總服務
+_services = weakref.WeakKeyDictionary()
+_services_lock = threading.Lock()
+
+
+class RegionRollupService:
+    """計算並快取各地區子樹的會員人數。
+
+    請使用 for_session() 取得與資料庫引擎共用的實例，而非直接建立。
+    """
+
+    def __init__(self, bind: Engine):
+        """初始化彙總服務。
+
+        Args:
+            bind (Engine): 資料庫引擎。重新計算時使用獨立的 Session，只會讀到已提交的資料。
+        """
+        self.bind = bind
+        self._lock = threading.RLock()
+        self._parents: Dict[int, int | None] | None = None
+        # region_id -> [會員數, 可排班數]，包含整棵子樹
+        self._totals: Dict[int, list[int]] | None = None
+        self._listeners: list[weakref.WeakMethod] = []
+
+    @classmethod
+    def for_session(cls, session: Session) -> "RegionRollupService":
+        """取得 session 所連接資料庫共用的彙總服務。
+
+        Args:
+            session (Session): 資料庫會話。
+
+        Returns:
+            RegionRollupService: 共用的服務實例。
+        """
+        bind = session.get_bind()
+        with _services_lock:
+            service = _services.get(bind)
+            if service is None:
+                service = cls(bind)
+                _services[bind] = service
+            return service
+
+    def add_listener(self, callback: Callable[[], None]):
+        """註冊人數變動時要呼叫的方法。只保留弱參照，物件被回收後自動移除。
+
+        Args:
+            callback (Callable[[], None]): 綁定方法 (bound method)。
+        """
+        with self._lock:
+            self._listeners.append(weakref.WeakMethod(callback))
+
+    def get_rollups(self) -> Dict[int, RegionRollup]:
+        """返回所有地區子樹的會員人數，必要時重新計算。
+
+        Returns:
+            Dict[int, RegionRollup]: 地區 ID -> 人數。
+        """
+        with self._lock:
+            if self._totals is None:
+                self._recompute()
+            return {region_id: RegionRollup(*counts) for region_id, counts in self._totals.items()}
+
+    def get_rollup(self, region_id: int) -> RegionRollup:
+        """返回單一地區子樹的會員人數。"""
+        with self._lock:
+            if self._totals is None:
+                self._recompute()
+            counts = self._totals.get(region_id)
+            return RegionRollup(*counts) if counts else EMPTY_ROLLUP
+
+    def _recompute(self):
+        with Session(bind=self.bind) as session:
+            parents = dict(session.execute(select(Region.id, Region.parent_id)).all())
+            direct_counts = session.execute(
+                select(Member.region_id, func.count(), func.coalesce(func.sum(Member.is_schedulable), 0))
+                .where(Member.region_id.isnot(None))
+                .group_by(Member.region_id)
+            ).all()
+
+        totals = {region_id: [0, 0] for region_id in parents}
+        for region_id, members, schedulable in direct_counts:
+            if region_id in totals:
+                totals[region_id][0] += members
+                totals[region_id][1] += schedulable
+
+        # 以廣度優先順序排列後反向處理，子節點一定先於父節點被累加
+        children: Dict[int | None, list[int]] = {}
+        for region_id, parent_id in parents.items():
+            children.setdefault(parent_id if parent_id in parents else None, []).append(region_id)
+        order = list(children.get(None, []))
+        for region_id in order:
+            order.extend(children.get(region_id, ()))
+        for region_id in reversed(order):
+            parent_id = parents[region_id]
+            if parent_id in totals:
+                totals[parent_id][0] += totals[region_id][0]
+                totals[parent_id][1] += totals[region_id][1]
+
+        if len(order) != len(parents):
+            logger.warning(f"{len(parents) - len(order)} regions are part of a parent cycle; their counts are not rolled up.")
+        self._parents = parents
+        self._totals = totals
+        logger.debug(f"Recomputed member rollups for {len(parents)} regions.")
+
+    def _apply(self, region_id: int | None, members: int, schedulable: int):
+        """將人數變化沿祖先鏈往上累加。"""
+        visited = set()
+        while region_id is not None and region_id not in visited:
+            counts = self._totals.get(region_id)
+            if counts is None:
+                break
+            counts[0] += members
+            counts[1] += schedulable
+            visited.add(region_id)
+            region_id = self._parents.get(region_id)
+
+    def _update(self, changes):
+        with self._lock:
+            if self._totals is None:
+                # 尚未計算過，下次讀取時自然會是最新的
+                return
+            for region_id, members, schedulable in changes:
+                self._apply(region_id, members, schedulable)
+        self._notify()
+
+    def member_added(self, region_id: int | None, is_schedulable: bool):
+        """會員新增後呼叫。"""
+        self._update([(region_id, 1, int(bool(is_schedulable)))])
+
+    def member_removed(self, region_id: int | None, is_schedulable: bool):
+        """會員刪除後呼叫。"""
+        self._update([(region_id, -1, -int(bool(is_schedulable)))])
+
+    def member_changed(self, old_region_id: int | None, old_schedulable: bool,
+                       new_region_id: int | None, new_schedulable: bool):
+        """會員的地區或可排班狀態變更後呼叫。"""
+        if old_region_id == new_region_id and bool(old_schedulable) == bool(new_schedulable):
+            return
+        self._update([
+            (old_region_id, -1, -int(bool(old_schedulable))),
+            (new_region_id, 1, int(bool(new_schedulable))),
+        ])
+
+    def hierarchy_changed(self):
+        """地區新增、移動或刪除後呼叫，清除快取。"""
+        with self._lock:
+            self._parents = None
+            self._totals = None
+        self._notify()
+
+    def _notify(self):
+        with self._lock:
+            self._listeners = [ref for ref in self._listeners if ref() is not None]
+            callbacks = [ref() for ref in self._listeners]
+        for callback in callbacks:
+            if callback is not None:
+                callback()
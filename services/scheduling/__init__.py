@@ -0,0 +1,60 @@
+from .assignment import AssignmentSolver, min_cost_assignment
+from .availability import AvailabilityStore, date_range_days, month_days, weekday_days
+from .conflicts import (Booking, Conflict, ConflictIndex, check_added, conflict_pairs, find_conflicts, find_duty_conflicts,
+                        load_activity_bookings, load_duty_bookings)
+from .fairness import DutyLoadCounters
+from .lecturers import LectureSession, LecturerAssignment, LecturerPlan, lecture_sessions, plan_lecturers, solve_lecturer_assignment
+from .parallel import partition_problem, solve_parallel
+from .problem import MemberSnapshot, ScheduleProblem, SlotDefinition, build_problem, load_snapshot, refresh_members
+from .repair import repair_schedule
+from .simulation import Scenario, ScenarioResult, format_comparison, run_simulations
+from .storage import load_definitions, load_schedule, repair_stored_duties, save_definitions, save_schedule
+from .solver import Schedule, ScheduleMetrics, ScheduleRepair, ScheduleSolver, solve
+
+__all__ = [
+    'AssignmentSolver',
+    'min_cost_assignment',
+    'AvailabilityStore',
+    'date_range_days',
+    'month_days',
+    'weekday_days',
+    'Booking',
+    'Conflict',
+    'ConflictIndex',
+    'check_added',
+    'conflict_pairs',
+    'find_conflicts',
+    'find_duty_conflicts',
+    'load_activity_bookings',
+    'load_duty_bookings',
+    'DutyLoadCounters',
+    'LectureSession',
+    'LecturerAssignment',
+    'LecturerPlan',
+    'lecture_sessions',
+    'plan_lecturers',
+    'solve_lecturer_assignment',
+    'partition_problem',
+    'solve_parallel',
+    'MemberSnapshot',
+    'ScheduleProblem',
+    'SlotDefinition',
+    'build_problem',
+    'load_snapshot',
+    'refresh_members',
+    'repair_schedule',
+    'Scenario',
+    'ScenarioResult',
+    'format_comparison',
+    'run_simulations',
+    'load_definitions',
+    'load_schedule',
+    'repair_stored_duties',
+    'save_definitions',
+    'save_schedule',
+    'Schedule',
+    'ScheduleMetrics',
+    'ScheduleRepair',
+    'ScheduleSolver',
+    'solve',
+]
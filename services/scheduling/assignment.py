@@ -0,0 +1,216 @@
+"""最小成本指派 (匈牙利演算法)。
+
+以 Jonker-Volgenant 形式的最短增廣路徑實作：逐列加入，每次以帶勢能 (potential) 的
+Dijkstra 找出到任一空欄的最短增廣路徑，再沿路徑翻轉指派。每一步對所有欄位的
+鬆弛與取最小值都是 NumPy 向量運算，n 列 m 欄最壞 O(n² m)。
+
+可以給定「留空」成本：每一列都可以不指派，成本為 unassigned_cost。這相當於為每一列
+加上一個只屬於自己的虛擬欄位，但不必真的把 n 個欄位加進矩陣，Dijkstra 只多比較一個純量。
+
+AssignmentSolver 可在求解後提高部分配對的成本並從上一次的解與勢能繼續求解，
+只有受影響的列需要重新找增廣路徑 (例如講師指派中修正時間重疊的場次)。
+
+參考量測 (benchmarks.bench_scheduling --scale 10k，講師每人最多兩場)：以前一年的排班為負擔歷史，
+400 場 × 254 位講師的 plan_400_sessions (含載入資料) 約 0.1–0.16 秒；隨機小數負擔、
+400 場 × 204 位講師的 solve_400_sessions_fractional_loads (含一次修正重疊的增量求解) 約 0.35–0.47 秒。
+"""
+
+from typing import Iterable, Tuple
+
+import numpy as np
+
+# col_of / row_of 中表示沒有指派
+UNASSIGNED = -1
+
+
+class AssignmentSolver:
+    """可增量重新求解的最小成本指派。
+
+    Attributes:
+        cost (np.ndarray): 成本矩陣 (n, m)；raise_costs() 會就地修改。
+        unassigned_cost (float | None): 列留空的成本；None 表示每一列都必須指派 (需 n <= m)。
+        col_of (np.ndarray): 每一列指派到的欄，UNASSIGNED 表示留空。
+    """
+
+    def __init__(self, cost: np.ndarray, unassigned_cost: float | None = None):
+        """初始化求解器。
+
+        Args:
+            cost (np.ndarray): 形狀為 (n, m) 的成本矩陣，必須是有限值。
+            unassigned_cost (float | None): 列留空的成本。
+
+        Raises:
+            ValueError: 成本矩陣不是二維、含有 inf 或 NaN，或不允許留空而列數多於欄數。
+        """
+        self.cost = np.array(cost, dtype=np.float64)
+        if self.cost.ndim != 2:
+            raise ValueError("成本矩陣必須是二維陣列。")
+        if not np.all(np.isfinite(self.cost)):
+            raise ValueError("成本矩陣不能包含 inf 或 NaN。")
+        n, m = self.cost.shape
+        if unassigned_cost is None and n > m:
+            raise ValueError("不允許留空時，列數不能多於欄數。")
+        self.unassigned_cost = None if unassigned_cost is None else float(unassigned_cost)
+        self.u = np.zeros(n)
+        self.v = np.zeros(m)
+        self.col_of = np.full(n, UNASSIGNED, dtype=np.int64)
+        self.row_of = np.full(m, UNASSIGNED, dtype=np.int64)
+        self._pending = self._initialize()
+
+    def _initialize(self) -> list:
+        # 初始解：u 取每列最小值 (所有縮減成本 >= 0)，最小值所在欄仍空著的列直接指派。
+        # 這些指派的縮減成本為 0，對偶可行性不變；只有搶同一欄的列才需要找增廣路徑
+        n, m = self.cost.shape
+        if m == 0:
+            self.u[:] = self.unassigned_cost if n else 0.0
+            return []
+        best = np.argmin(self.cost, axis=1)
+        minimum = self.cost[np.arange(n), best]
+        pending = []
+        for i, (j, value) in enumerate(zip(best.tolist(), minimum.tolist())):
+            if self.unassigned_cost is not None and value >= self.unassigned_cost:
+                # 留空的縮減成本為 0，直接留空
+                self.u[i] = self.unassigned_cost
+            elif self.row_of[j] == UNASSIGNED:
+                self.u[i] = value
+                self.row_of[j] = i
+                self.col_of[i] = j
+            else:
+                self.u[i] = value
+                pending.append(i)
+        return pending
+
+    def solve(self) -> Tuple[np.ndarray, np.ndarray]:
+        """為尚未處理的列找增廣路徑，返回 (列索引, 欄索引)，依列索引排序，只含有指派的列。"""
+        for start in self._pending:
+            self._augment(start)
+        self._pending = []
+        rows = np.flatnonzero(self.col_of != UNASSIGNED)
+        return rows, self.col_of[rows]
+
+    def raise_costs(self, rows: Iterable[int], cols: Iterable[int], value: float):
+        """把 (rows[k], cols[k]) 的成本提高到至少 value，之後呼叫 solve() 從目前的解繼續求解。
+
+        提高成本不會破壞勢能的可行性；只有用到這些配對的列，以及釋出的欄位恢復勢能後
+        縮減成本變為負值的列需要重新指派。
+
+        Args:
+            rows (Iterable[int]): 列索引。
+            cols (Iterable[int]): 欄索引，與 rows 一一對應。
+            value (float): 新的成本；原本已高於 value 的配對不變。
+        """
+        freed = []
+        pending = set(self._pending)
+        for i, j in zip(rows, cols):
+            if self.cost[i, j] >= value:
+                continue
+            self.cost[i, j] = value
+            if self.col_of[i] == j:
+                self._release(i, freed, pending)
+        # 空欄的勢能必須為 0 (互補鬆弛)；恢復為 0 後縮減成本為負的列也要釋出，可能連鎖釋出其他欄
+        while freed:
+            j = freed.pop()
+            if self.v[j] >= 0:
+                continue
+            self.v[j] = 0.0
+            for i in np.flatnonzero(self.cost[:, j] < self.u).tolist():
+                if i not in pending:
+                    self._release(i, freed, pending)
+        for i in pending:
+            # 待處理的列重設為可行的勢能
+            floor = float(np.min(self.cost[i] - self.v)) if len(self.v) else np.inf
+            self.u[i] = floor if self.unassigned_cost is None else min(floor, self.unassigned_cost)
+        self._pending = sorted(pending)
+
+    def _release(self, i: int, freed: list, pending: set):
+        j = self.col_of[i]
+        if j != UNASSIGNED:
+            self.row_of[j] = UNASSIGNED
+            self.col_of[i] = UNASSIGNED
+            freed.append(j)
+        pending.add(i)
+
+    def _augment(self, start: int):
+        cost, u, v, row_of, col_of = self.cost, self.u, self.v, self.row_of, self.col_of
+        m = len(v)
+        # frontier：尚未走過的欄位目前的最短距離；走過的欄位在 blocked_v 中設為 -inf，不會再被鬆弛
+        frontier = np.full(m, np.inf)
+        blocked_v = v.copy()
+        way = np.zeros(m, dtype=np.int64)
+        free_columns = np.flatnonzero(row_of == UNASSIGNED)
+        scanned_rows, row_distances = [], []
+        scanned_cols, col_distances = [], []
+        row, distance = start, 0.0
+        # 留空視為每列專屬的虛擬欄位：只有走到該列時才能選到，距離只需記錄最小的一個
+        park_distance, park_row = np.inf, UNASSIGNED
+        sink = UNASSIGNED
+        while True:
+            scanned_rows.append(row)
+            row_distances.append(distance)
+            reduced = cost[row] - blocked_v
+            reduced += distance - u[row]
+            improved = reduced < frontier
+            np.minimum(frontier, reduced, out=frontier)
+            way[improved] = row
+            if self.unassigned_cost is not None and distance + self.unassigned_cost - u[row] < park_distance:
+                park_distance, park_row = distance + self.unassigned_cost - u[row], row
+            column = int(frontier.argmin()) if m else UNASSIGNED
+            distance = frontier[column] if m else np.inf
+            if park_distance <= distance:
+                distance = park_distance
+                break
+            if row_of[column] != UNASSIGNED and len(free_columns):
+                # 成本相同時優先走到空欄：成本多為整數時同值很多，可大幅縮短增廣路徑
+                free_frontier = frontier[free_columns]
+                k = int(free_frontier.argmin())
+                if free_frontier[k] == distance:
+                    column = int(free_columns[k])
+            frontier[column] = np.inf
+            blocked_v[column] = -np.inf
+            scanned_cols.append(column)
+            col_distances.append(distance)
+            if row_of[column] == UNASSIGNED:
+                sink = column
+                break
+            row = row_of[column]
+
+        # 走過的列與欄調整勢能，讓路徑上的縮減成本為 0
+        u[scanned_rows] += distance - np.array(row_distances)
+        v[scanned_cols] -= distance - np.array(col_distances)
+
+        # 沿增廣路徑翻轉指派；結束於留空時，該列原本的欄由路徑上的前一列接手
+        if sink == UNASSIGNED:
+            column = col_of[park_row] if park_row != start else UNASSIGNED
+            col_of[park_row] = UNASSIGNED
+        else:
+            column = sink
+        while column != UNASSIGNED:
+            row = way[column]
+            row_of[column] = row
+            col_of[row], column = column, col_of[row]
+            if row == start:
+                break
+
+
+def min_cost_assignment(cost: np.ndarray, unassigned_cost: float | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """求使總成本最小的一對一指派。
+
+    不允許留空且列數多於欄數時改解轉置，結果仍以原本的列與欄表示；每一列 (或每一欄，取較少者)
+    都會被指派。成本必須是有限值，不允許的配對請以遠大於其他成本的值表示。
+
+    Args:
+        cost (np.ndarray): 形狀為 (n, m) 的成本矩陣。
+        unassigned_cost (float | None): 列留空的成本；None 表示每一列都必須指派。
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (列索引, 欄索引)，依列索引排序，只含有指派的列；
+            與 scipy.optimize.linear_sum_assignment 的格式相同。
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 2:
+        raise ValueError("成本矩陣必須是二維陣列。")
+    if unassigned_cost is None and cost.shape[0] > cost.shape[1]:
+        cols, rows = min_cost_assignment(cost.T)
+        order = np.argsort(rows)
+        return rows[order], cols[order]
+    return AssignmentSolver(cost, unassigned_cost).solve()
@@ -0,0 +1,197 @@
+"""會員可排班日 (排班的條件)。
+
+每位會員每年的可排班日存成一個 46 bytes 的位元圖 (見 MemberAvailability)，
+而非每人每天一筆資料列：一萬名會員一整年只需約 460 KB。沒有資料列的年份視為全年可排班。
+
+AvailabilityStore 一次讀出整年的位元圖成為 (會員數, 46) 的 uint8 陣列，
+之後的交集、計數與樣式設定都是 NumPy 的向量化位元運算。日期樣式 (每週幾、某幾個月、
+日期區間) 以長度為當年天數的布林陣列表示，可自由以 & | ~ 組合。
+"""
+
+import calendar
+import logging
+from datetime import date
+from typing import Iterable, List, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models.member_availability_model import AVAILABILITY_BITMAP_BYTES
+from repositories.member_availability_repository import MemberAvailabilityRepository
+
+logger = logging.getLogger(__name__)
+
+BITS_PER_BITMAP = AVAILABILITY_BITMAP_BYTES * 8
+
+
+def days_in_year(year: int) -> int:
+    return 366 if calendar.isleap(year) else 365
+
+
+def day_of_year(day: date) -> int:
+    """返回日期在當年的索引 (1 月 1 日為 0)。"""
+    return day.timetuple().tm_yday - 1
+
+
+def _year_dates(year: int) -> np.ndarray:
+    return np.arange(np.datetime64(f"{year}-01-01"), np.datetime64(f"{year + 1}-01-01"), dtype="datetime64[D]")
+
+
+def weekday_days(year: int, weekdays: Iterable[int]) -> np.ndarray:
+    """當年中屬於指定星期 (0 = 週一 ... 6 = 週日) 的日子。"""
+    # 1970-01-01 為週四 (weekday 3)
+    weekday = (_year_dates(year).astype(np.int64) + 3) % 7
+    return np.isin(weekday, list(weekdays))
+
+
+def month_days(year: int, months: Iterable[int]) -> np.ndarray:
+    """當年中屬於指定月份 (1-12) 的日子。"""
+    month = _year_dates(year).astype("datetime64[M]").astype(np.int64) % 12 + 1
+    return np.isin(month, list(months))
+
+
+def date_range_days(year: int, start: date, end: date) -> np.ndarray:
+    """當年中介於 start 與 end (含) 之間的日子。"""
+    dates = _year_dates(year)
+    return (dates >= np.datetime64(start)) & (dates <= np.datetime64(end))
+
+
+def pack_days(days: np.ndarray) -> bytes:
+    """將長度為當年天數的布林陣列壓縮成位元圖。"""
+    padded = np.zeros(BITS_PER_BITMAP, dtype=bool)
+    padded[:len(days)] = days
+    return np.packbits(padded, bitorder="little").tobytes()
+
+
+def unpack_days(bitmap: bytes, year: int) -> np.ndarray:
+    """將位元圖展開成長度為當年天數的布林陣列。"""
+    bits = np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8), bitorder="little")
+    return bits[:days_in_year(year)].astype(bool)
+
+
+class AvailabilityStore:
+    """讀寫會員可排班日，並提供跨會員的向量化運算。
+
+    寫入方法不會提交，需要呼叫 session.commit() 才會寫入資料庫。
+    """
+
+    def __init__(self, session: Session):
+        """初始化可排班日存取。
+
+        Args:
+            session (Session): 資料庫會話。
+        """
+        self.session = session
+        self.repository = MemberAvailabilityRepository(session)
+
+    def packed(self, year: int, member_ids: Sequence[int]) -> np.ndarray:
+        """返回 (會員數, 46) 的 uint8 位元圖陣列，順序與 member_ids 相同。
+
+        Args:
+            year (int): 西元年。
+            member_ids (Sequence[int]): 會員 ID。
+
+        Returns:
+            np.ndarray: 位元圖陣列；沒有資料列的會員為全 1 (全年可排班)。
+        """
+        member_ids = np.asarray(member_ids, dtype=np.int64)
+        packed = np.full((len(member_ids), AVAILABILITY_BITMAP_BYTES), 0xFF, dtype=np.uint8)
+        bitmaps = self.repository.get_bitmaps(year)
+        if not bitmaps or len(member_ids) == 0:
+            return packed
+
+        stored_ids = np.fromiter(bitmaps.keys(), dtype=np.int64, count=len(bitmaps))
+        stored = np.frombuffer(b"".join(bitmaps.values()), dtype=np.uint8).reshape(-1, AVAILABILITY_BITMAP_BYTES)
+        order = np.argsort(stored_ids)
+        pos = np.searchsorted(stored_ids, member_ids, sorter=order)
+        pos = np.minimum(pos, len(stored_ids) - 1)
+        found = stored_ids[order[pos]] == member_ids
+        packed[found] = stored[order[pos[found]]]
+        return packed
+
+    def matrix(self, year: int, member_ids: Sequence[int]) -> np.ndarray:
+        """返回 (會員數, 當年天數) 的布林矩陣，True 表示可排班。"""
+        bits = np.unpackbits(self.packed(year, member_ids), axis=1, bitorder="little")
+        return bits[:, :days_in_year(year)].astype(bool)
+
+    # ---- 寫入 ----
+
+    def _write(self, year: int, member_ids: Sequence[int], packed: np.ndarray):
+        self.repository.save_bitmaps(year, {int(member_id): row.tobytes() for member_id, row in zip(member_ids, packed)})
+        logger.debug(f"Updated availability of {len(member_ids)} members for {year}.")
+
+    def set_available(self, member_ids: Sequence[int], year: int, days: np.ndarray, available: bool = True):
+        """將多位會員在指定日子設為可排班或不可排班，其他日子不變。
+
+        例如「八月不能排班」：set_available(ids, 2026, month_days(2026, [8]), False)。
+
+        Args:
+            member_ids (Sequence[int]): 會員 ID。
+            year (int): 西元年。
+            days (np.ndarray): 長度為當年天數的布林陣列。
+            available (bool): True 設為可排班，False 設為不可排班。
+        """
+        packed = self.packed(year, member_ids)
+        mask = np.frombuffer(pack_days(days), dtype=np.uint8)
+        if available:
+            packed |= mask
+        else:
+            packed &= ~mask
+        self._write(year, member_ids, packed)
+
+    def restrict_to(self, member_ids: Sequence[int], year: int, days: np.ndarray):
+        """多位會員只在指定日子可排班 (與原本的可排班日取交集)。
+
+        例如「只有週日可以」：restrict_to(ids, 2026, weekday_days(2026, [6]))。
+        """
+        packed = self.packed(year, member_ids)
+        packed &= np.frombuffer(pack_days(days), dtype=np.uint8)
+        self._write(year, member_ids, packed)
+
+    def replace(self, member_ids: Sequence[int], year: int, days: np.ndarray):
+        """將多位會員當年的可排班日整個換成 days。"""
+        packed = np.tile(np.frombuffer(pack_days(days), dtype=np.uint8), (len(member_ids), 1))
+        self._write(year, member_ids, packed)
+
+    # ---- 查詢 ----
+
+    def common_days(self, year: int, member_ids: Sequence[int]) -> np.ndarray:
+        """所有指定會員都可排班的日子 (對位元圖做 AND 歸約)。"""
+        packed = self.packed(year, member_ids)
+        if len(packed) == 0:
+            return np.ones(days_in_year(year), dtype=bool)
+        combined = np.bitwise_and.reduce(packed, axis=0)
+        return unpack_days(combined.tobytes(), year)
+
+    def available_counts(self, year: int, member_ids: Sequence[int]) -> np.ndarray:
+        """每天可排班的會員人數。"""
+        return self.matrix(year, member_ids).sum(axis=0)
+
+    def available_on(self, day: date, member_ids: Sequence[int]) -> np.ndarray:
+        """某一天各會員是否可排班的布林陣列，順序與 member_ids 相同。"""
+        index = day_of_year(day)
+        column = self.packed(day.year, member_ids)[:, index // 8]
+        return ((column >> (index % 8)) & 1).astype(bool)
+
+    def day_bitsets(self, member_ids: Sequence[int], start: date, end: date) -> List[int] | None:
+        """返回 start 到 end 每天可排班會員的位元集合 (第 i 個位元對應 member_ids[i])。
+
+        用於 ScheduleProblem.availability；範圍內完全沒有設定時返回 None (全部可排班)。
+        """
+        years = self.repository.years_with_data(start.year, end.year)
+        if not years:
+            return None
+
+        all_members = (1 << len(member_ids)) - 1
+        result = []
+        for year in range(start.year, end.year + 1):
+            first = day_of_year(start) if year == start.year else 0
+            last = day_of_year(end) if year == end.year else days_in_year(year) - 1
+            if year not in years:
+                result.extend([all_members] * (last - first + 1))
+                continue
+            # 轉置後沿會員方向壓縮：每一列即為一天的位元集合
+            columns = self.matrix(year, member_ids)[:, first:last + 1].T
+            packed = np.packbits(columns, axis=1, bitorder="little")
+            result.extend(int.from_bytes(row.tobytes(), "little") for row in packed)
+        return result
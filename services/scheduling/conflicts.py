@@ -0,0 +1,298 @@
+"""重複排班 (同一位會員時段重疊) 的偵測。
+
+所有時段都換算為「自 1970-01-01 起的分鐘數」的半開區間 [start, end)，以 Booking 表示，
+來源可以是排班紀錄或其他會佔用會員時間的紀錄。長度為 0 (start >= end) 的時段不佔用時間，
+不與任何時段重疊；find_conflicts、ConflictIndex 與 Booking.overlaps() 都依此判斷。
+
+整份行事曆一次檢查 (find_conflicts)：依 (會員, 開始時間) 排序後做掃描線。
+把每位會員的時間加上「會員序號 × 足夠大的位移」，不同會員的區間就不會交錯，
+可以用一次 np.maximum.accumulate 算出「之前所有區間的最晚結束時間」；開始時間早於
+這個值的區間才可能重疊，只對這些少數區間往回找出衝突的對象。整體為 O(n log n + k)。
+
+逐筆新增時 (ConflictIndex) 每位會員維護依開始時間排序的清單，以二分搜尋找出可能重疊的區間，
+新增一筆只需 O(log n) 加上附近幾筆的比較。ConflictIndex.from_calendar() 以期間內的排班紀錄與
+活動參與 (重複活動只展開這段期間) 建立索引；修補排班與加入活動參與者時，只以新增的時段查詢索引，
+不必重新掃描整份行事曆。
+"""
+
+import logging
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from repositories.activity_participant_repository import ActivityParticipantRepository
+from repositories.duty_assignment_repository import DutyAssignmentRepository, day_key
+from services.recurrence import occurrences_between
+from services.scheduling.problem import MINUTES_PER_DAY
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DUTY = "duty"
+SOURCE_ACTIVITY = "activity"
+# 只查詢部分會員時，會員數超過此值就改為載入期間內的全部時段 (避免 IN 清單超過 SQLite 的參數上限)
+MEMBER_FILTER_LIMIT = 1000
+
+
+@dataclass(frozen=True, order=True)
+class Booking:
+    """會員的一段被佔用的時間。
+
+    Attributes:
+        start (int): 開始時間 (自 1970-01-01 起的分鐘數，含)。
+        end (int): 結束時間 (不含)。
+        member_id (int): 會員 ID。
+        source (str): 來源，例如 "duty"。
+        ref (tuple): 來源紀錄的鍵，例如排班紀錄的 (day, slot_id)。
+    """
+    start: int
+    end: int
+    member_id: int
+    source: str = SOURCE_DUTY
+    ref: tuple = ()
+
+    def overlaps(self, other: "Booking") -> bool:
+        return (self.start < self.end and other.start < other.end
+                and self.start < other.end and other.start < self.end)
+
+
+@dataclass(frozen=True)
+class Conflict:
+    """同一位會員的兩段重疊時間，first 的開始時間不晚於 second。"""
+    first: Booking
+    second: Booking
+
+    @property
+    def member_id(self) -> int:
+        return self.first.member_id
+
+
+def minute_key(day: int, minute: int) -> int:
+    """將日鍵與當天的分鐘數換算為自 1970-01-01 起的分鐘數。"""
+    return day * MINUTES_PER_DAY + minute
+
+
+def conflict_pairs(members: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """以掃描線找出重疊的區間對 (欄位式輸入)。
+
+    Args:
+        members (np.ndarray): 每個區間的會員 ID。
+        starts (np.ndarray): 開始時間 (含)。
+        ends (np.ndarray): 結束時間 (不含)。
+
+    Returns:
+        np.ndarray: 形狀為 (k, 2) 的輸入索引，每列為 (較早開始的區間, 較晚開始的區間)，依會員與開始時間排序。
+            長度為 0 的區間不會出現。
+    """
+    if len(members) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    members, starts, ends = (np.asarray(values, dtype=np.int64) for values in (members, starts, ends))
+    nonempty = np.flatnonzero(starts < ends)
+    if len(nonempty) < len(members):
+        # 長度為 0 的區間不佔用時間，先移除再掃描，結果換回原本的索引
+        return nonempty[conflict_pairs(members[nonempty], starts[nonempty], ends[nonempty])]
+    order = np.lexsort((starts, members))
+    members, starts, ends = members[order], starts[order], ends[order]
+
+    # 每位會員的時間平移到互不重疊的範圍，讓累積最大值不會跨會員
+    origin = starts.min()
+    span = int(max(ends.max(), starts.max()) - origin) + 1
+    rank = np.concatenate(([0], np.cumsum(members[1:] != members[:-1])))
+    shifted_starts = starts - origin + rank * span
+    shifted_ends = ends - origin + rank * span
+    latest_end = np.maximum.accumulate(shifted_ends)
+    flagged = np.flatnonzero(shifted_starts[1:] < latest_end[:-1]) + 1
+
+    pairs = []
+    for i in flagged.tolist():
+        start = shifted_starts[i]
+        j = i - 1
+        partners = []
+        # latest_end 往前只會遞減；一旦不晚於 start，更早的區間都不可能重疊
+        while j >= 0 and latest_end[j] > start:
+            if shifted_ends[j] > start:
+                partners.append(j)
+            j -= 1
+        pairs.extend((j, i) for j in reversed(partners))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return order[np.asarray(pairs, dtype=np.int64)]
+
+
+def find_conflicts(bookings: Sequence[Booking]) -> List[Conflict]:
+    """一次找出所有會員的所有重疊時段。
+
+    Args:
+        bookings (Sequence[Booking]): 整份行事曆的時段。
+
+    Returns:
+        List[Conflict]: 重疊的時段對，依會員與開始時間排序。
+    """
+    count = len(bookings)
+    pairs = conflict_pairs(
+        np.fromiter((booking.member_id for booking in bookings), dtype=np.int64, count=count),
+        np.fromiter((booking.start for booking in bookings), dtype=np.int64, count=count),
+        np.fromiter((booking.end for booking in bookings), dtype=np.int64, count=count),
+    )
+    return [Conflict(bookings[i], bookings[j]) for i, j in pairs.tolist()]
+
+
+class ConflictIndex:
+    """可逐筆新增並即時檢查重疊的會員時段索引。"""
+
+    def __init__(self, bookings: Iterable[Booking] = ()):
+        """建立索引。
+
+        Args:
+            bookings (Iterable[Booking]): 既有的時段 (不檢查彼此之間的重疊)。
+        """
+        self._by_member: Dict[int, List[Booking]] = {}
+        # 目前最長區間的長度；往回搜尋時開始時間早於 start - _max_length 的區間不可能重疊
+        self._max_length = 0
+        for booking in bookings:
+            self._insert(booking)
+        for intervals in self._by_member.values():
+            intervals.sort()
+
+    @classmethod
+    def from_duties(cls, session: Session, start: date, end: date) -> "ConflictIndex":
+        """以期間內 (含首尾) 已儲存的排班紀錄建立索引。"""
+        return cls(load_duty_bookings(session, start, end))
+
+    @classmethod
+    def from_calendar(cls, session: Session, start: date, end: date, member_ids: Iterable[int] | None = None,
+                      exclude_activity_ids: Iterable[int] = ()) -> "ConflictIndex":
+        """以期間內 (含首尾) 的排班紀錄與活動參與建立索引。
+
+        Args:
+            session (Session): 資料庫會話。
+            start (date): 起始日 (含)。
+            end (date): 結束日 (含)。
+            member_ids (Iterable[int] | None): 只需要檢查這些會員；None 表示全部。
+            exclude_activity_ids (Iterable[int]): 不載入這些活動的參與 (例如正在加入參與者的活動本身)。
+        """
+        if member_ids is not None:
+            member_ids = list(member_ids)
+            if len(member_ids) > MEMBER_FILTER_LIMIT:
+                member_ids = None
+        return cls(load_duty_bookings(session, start, end, member_ids)
+                   + load_activity_bookings(session, start, end, member_ids, exclude_activity_ids))
+
+    def __len__(self) -> int:
+        return sum(len(intervals) for intervals in self._by_member.values())
+
+    def _insert(self, booking: Booking):
+        self._by_member.setdefault(booking.member_id, []).append(booking)
+        self._max_length = max(self._max_length, booking.end - booking.start)
+
+    def conflicts_with(self, booking: Booking) -> List[Booking]:
+        """返回索引中與 booking 重疊的時段 (不新增)；判斷方式與 Booking.overlaps() 相同。"""
+        intervals = self._by_member.get(booking.member_id)
+        if not intervals or booking.start >= booking.end:
+            return []
+        # 開始時間早於 booking.end 的區間才可能重疊
+        i = bisect_left(intervals, booking.end, key=lambda interval: interval.start)
+        earliest = booking.start - self._max_length
+        result = []
+        while i > 0 and intervals[i - 1].start >= earliest:
+            i -= 1
+            if intervals[i].end > max(booking.start, intervals[i].start) and intervals[i] != booking:
+                result.append(intervals[i])
+        result.reverse()
+        return result
+
+    def add(self, booking: Booking) -> List[Booking]:
+        """新增一個時段並返回與它重疊的既有時段；即使重疊也會加入索引。"""
+        conflicts = self.conflicts_with(booking)
+        if conflicts:
+            logger.debug(f"Member {booking.member_id} is double-booked: {booking} overlaps {len(conflicts)} bookings.")
+        self._max_length = max(self._max_length, booking.end - booking.start)
+        insort(self._by_member.setdefault(booking.member_id, []), booking)
+        return conflicts
+
+    def remove(self, booking: Booking) -> bool:
+        """移除一個時段；不存在時返回 False。"""
+        intervals = self._by_member.get(booking.member_id)
+        if not intervals:
+            return False
+        i = bisect_left(intervals, booking)
+        if i < len(intervals) and intervals[i] == booking:
+            del intervals[i]
+            return True
+        return False
+
+
+def _duty_booking(row) -> Booking:
+    day, slot_id, member_id, start_minute, end_minute = row
+    return Booking(minute_key(day, start_minute), minute_key(day, end_minute), member_id, SOURCE_DUTY, (day, slot_id))
+
+
+def load_duty_bookings(session: Session, start: date, end: date,
+                       member_ids: Iterable[int] | None = None) -> List[Booking]:
+    """將期間內 (含首尾) 已儲存的排班紀錄轉為時段。"""
+    rows = DutyAssignmentRepository(session).get_timed_range(day_key(start), day_key(end), member_ids)
+    return [_duty_booking(row) for row in rows]
+
+
+def activity_booking(activity_id: int, day: int, start_minute: int, end_minute: int, member_id: int) -> Booking:
+    """會員參與活動在某一天 (日鍵) 舉行時佔用的時段。"""
+    return Booking(minute_key(day, start_minute), minute_key(day, end_minute), member_id,
+                   SOURCE_ACTIVITY, (activity_id, day))
+
+
+def load_activity_bookings(session: Session, start: date, end: date, member_ids: Iterable[int] | None = None,
+                           exclude_activity_ids: Iterable[int] = ()) -> List[Booking]:
+    """將期間內 (含首尾) 各次舉行的活動參與轉為時段；重複活動只展開這段期間。"""
+    excluded = set(exclude_activity_ids)
+    days_of: Dict[int, List[int]] = {}
+    for day, activity in occurrences_between(session, start, end):
+        if activity.id not in excluded:
+            days_of.setdefault(activity.id, []).append(day_key(day))
+    return [
+        activity_booking(activity_id, day, start_minute, end_minute, member_id)
+        for activity_id, member_id, start_minute, end_minute
+        in ActivityParticipantRepository(session).get_timed(days_of, member_ids)
+        for day in days_of[activity_id]
+    ]
+
+
+def check_added(index: ConflictIndex, bookings: Iterable[Booking]) -> List[Conflict]:
+    """將新增的時段逐筆加入索引，返回它們與索引中既有 (或先前新增) 時段的重疊。"""
+    conflicts = []
+    for booking in bookings:
+        for other in index.add(booking):
+            conflicts.append(Conflict(other, booking) if other.start <= booking.start else Conflict(booking, other))
+    return conflicts
+
+
+def find_duty_conflicts(session: Session, start: date, end: date,
+                        extra: Sequence[Booking] = ()) -> List[Conflict]:
+    """檢查期間內已儲存的排班紀錄 (加上 extra 中的其他時段) 是否有重複排班。
+
+    排班紀錄直接轉為 NumPy 欄位，只為有衝突的紀錄建立 Booking。
+
+    Args:
+        session (Session): 資料庫會話。
+        start (date): 起始日 (含)。
+        end (date): 結束日 (含)。
+        extra (Sequence[Booking]): 其他要一併檢查的時段。
+
+    Returns:
+        List[Conflict]: 重疊的時段對。
+    """
+    rows = DutyAssignmentRepository(session).get_timed_range(day_key(start), day_key(end))
+    table = np.array(rows, dtype=np.int64).reshape(-1, 5)
+    days = table[:, 0] * MINUTES_PER_DAY
+    members = np.concatenate((table[:, 2], [booking.member_id for booking in extra])).astype(np.int64)
+    starts = np.concatenate((days + table[:, 3], [booking.start for booking in extra])).astype(np.int64)
+    ends = np.concatenate((days + table[:, 4], [booking.end for booking in extra])).astype(np.int64)
+
+    def booking(i: int) -> Booking:
+        return _duty_booking(rows[i]) if i < len(rows) else extra[i - len(rows)]
+
+    conflicts = [Conflict(booking(i), booking(j)) for i, j in conflict_pairs(members, starts, ends).tolist()]
+    logger.info(f"Checked {len(members)} bookings from {start} to {end}: {len(conflicts)} conflicts.")
+    return conflicts
@@ -0,0 +1,137 @@
+"""公平輪值：以增量維護的滾動負擔計數器。
+
+每位會員的排班負擔是過去每次排班以指數衰減後的總和 (半衰期預設 90 天)：
+昨天的一次排班算 1，三個月前的算 0.5。這個值可以增量更新——新增一次排班時，
+把舊值衰減到當天再加 1，O(1) 完成——不必每次都從完整歷史重新計算。
+
+排班前以 apply_to() 把計數器換算到排班起始日，放進 ScheduleProblem.base_loads 與
+last_assigned；求解器的 heap 以 (歷史負擔 + 本次次數, 上次排班日) 排序，
+最近排得少、最久沒排的會員優先。求解期間不做衰減，只會遞增，因此 lazy heap 仍然正確。
+排班確定後以 record_schedule() 累加、save() 寫回資料庫，下一次排班即可接續。
+"""
+
+import logging
+from datetime import date
+from typing import Dict, Iterable, List
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from repositories.member_duty_load_repository import MemberDutyLoadRepository
+from services.scheduling.problem import ScheduleProblem
+from services.scheduling.solver import NEVER_ASSIGNED, Schedule
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HALF_LIFE_DAYS = 90
+
+
+class DutyLoadCounters:
+    """每位會員的滾動排班負擔。"""
+
+    def __init__(self, half_life_days: float = DEFAULT_HALF_LIFE_DAYS):
+        """初始化空的計數器。
+
+        Args:
+            half_life_days (float): 負擔衰減一半所需的天數。
+        """
+        self.half_life_days = half_life_days
+        # 會員 ID -> [負擔, 負擔對應的日期 (ordinal), 上次排班日 (ordinal) 或 None]
+        self._counters: Dict[int, list] = {}
+        self._dirty: set[int] = set()
+
+    @classmethod
+    def load(cls, session: Session, half_life_days: float = DEFAULT_HALF_LIFE_DAYS) -> "DutyLoadCounters":
+        """從資料庫載入上次儲存的計數器。"""
+        counters = cls(half_life_days)
+        for member_id, load, as_of, last_assigned in MemberDutyLoadRepository(session).get_rows():
+            counters._counters[member_id] = [
+                load, as_of.toordinal(), last_assigned.toordinal() if last_assigned else None
+            ]
+        logger.debug(f"Loaded duty load counters for {len(counters._counters)} members.")
+        return counters
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def _decay(self, days: int) -> float:
+        return 0.5 ** (days / self.half_life_days)
+
+    def load_on(self, member_id: int, day: date) -> float:
+        """返回會員在 day 當天的負擔。"""
+        counter = self._counters.get(member_id)
+        if counter is None:
+            return 0.0
+        load, as_of, _ = counter
+        return load * self._decay(day.toordinal() - as_of)
+
+    def last_assigned(self, member_id: int) -> date | None:
+        """返回會員上次排班的日期。"""
+        counter = self._counters.get(member_id)
+        return date.fromordinal(counter[2]) if counter and counter[2] is not None else None
+
+    def record(self, member_id: int, day: date, weight: float = 1.0):
+        """記錄一次排班，O(1) 更新負擔。
+
+        Args:
+            member_id (int): 會員 ID。
+            day (date): 排班日期。
+            weight (float): 這次排班的權重，例如較長的班次可以大於 1。
+        """
+        ordinal = day.toordinal()
+        counter = self._counters.get(member_id)
+        if counter is None:
+            self._counters[member_id] = [weight, ordinal, ordinal]
+        elif ordinal >= counter[1]:
+            counter[0] = counter[0] * self._decay(ordinal - counter[1]) + weight
+            counter[1] = ordinal
+            counter[2] = ordinal if counter[2] is None else max(counter[2], ordinal)
+        else:
+            # 補登較早的排班：換算到目前的基準日再累加
+            counter[0] += weight * self._decay(counter[1] - ordinal)
+            counter[2] = ordinal if counter[2] is None else max(counter[2], ordinal)
+        self._dirty.add(member_id)
+
+    def record_schedule(self, schedule: Schedule):
+        """將整份排班結果累加到計數器。"""
+        count = 0
+        for day, _, member_id in schedule.rows():
+            self.record(member_id, day)
+            count += 1
+        logger.debug(f"Recorded {count} assignments into duty load counters.")
+
+    def apply_to(self, problem: ScheduleProblem):
+        """把計數器換算到 problem.start，設定 problem.base_loads 與 problem.last_assigned。"""
+        start = problem.start.toordinal()
+        loads = np.zeros(problem.member_count, dtype=np.float64)
+        last_assigned = np.full(problem.member_count, NEVER_ASSIGNED, dtype=np.int64)
+        for member_index, member_id in enumerate(problem.member_ids.tolist()):
+            counter = self._counters.get(member_id)
+            if counter is None:
+                continue
+            load, as_of, last = counter
+            loads[member_index] = load * self._decay(start - as_of)
+            if last is not None:
+                last_assigned[member_index] = last - start
+        problem.base_loads = loads
+        problem.last_assigned = last_assigned
+
+    def save(self, session: Session, member_ids: Iterable[int] | None = None):
+        """將變動過的計數器寫回資料庫 (不提交)。
+
+        Args:
+            session (Session): 資料庫會話。
+            member_ids (Iterable[int] | None): 要寫入的會員；None 表示所有變動過的會員。
+        """
+        targets: List[int] = list(self._dirty if member_ids is None else member_ids)
+        rows = []
+        for member_id in targets:
+            counter = self._counters.get(member_id)
+            if counter is None:
+                continue
+            load, as_of, last = counter
+            last_assigned = date.fromordinal(last) if last is not None else None
+            rows.append((member_id, load, date.fromordinal(as_of), last_assigned))
+        MemberDutyLoadRepository(session).save_rows(rows)
+        self._dirty.difference_update(targets)
+        logger.info(f"Saved duty load counters for {len(rows)} members.")
@@ -0,0 +1,267 @@
+"""講師與研討會場次的最佳指派。
+
+每一場 (活動的一次舉行) 需要一位講師。講師是持有指定職務 (例如御書講師) 的可排班會員，
+也可以再要求具備指定的資格 (例如教學資格)。
+成本矩陣 (場次 × 講師) 由三部分組成：
+
+* 地區距離：講師所屬地區與場次主辦地區在地區樹上相隔的邊數 (RegionLcaIndex.distance_matrix)。
+* 近期負擔：講師以指數衰減累計的排班負擔 (DutyLoadCounters)；同一季每多負責一場，
+  成本再遞增，讓場次平均分配。
+* 可排班日：講師當天不可排班 (AvailabilityStore) 的配對視為不允許。
+
+每位講師最多負責 max_sessions 場，做法是把講師複製 max_sessions 份，第 k 份多加
+k × EXTRA_SESSION_COST。每一場都可以不指派 (成本 UNASSIGNED_COST，見 AssignmentSolver 的
+unassigned_cost)，找不到合適講師的場次會留空而不是被迫接受不允許的配對。求解後若同一位講師
+被排到同一天時間重疊的場次，禁止較晚的那一場再指派給他，並從上一次的解繼續求解，
+只有受影響的場次需要重新找增廣路徑。
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models.member_model import Member
+from repositories.member_filter import MemberFilterRepository, member_criteria
+from services.recurrence import occurrences_between
+from services.region_lca_index import RegionLcaIndex, RegionProximityService
+from services.scheduling.assignment import AssignmentSolver
+from services.scheduling.availability import AvailabilityStore, day_of_year
+from services.scheduling.fairness import DutyLoadCounters
+
+logger = logging.getLogger(__name__)
+
+DISTANCE_WEIGHT = 1.0
+LOAD_WEIGHT = 2.0
+# 同一位講師每多負責一場增加的成本
+EXTRA_SESSION_COST = 3.0
+# 場次沒有指派講師的成本；必須大於任何允許的配對
+UNASSIGNED_COST = 1_000.0
+# 不允許的配對 (講師不可排班或時間重疊)；必須大於 UNASSIGNED_COST
+FORBIDDEN_COST = 1_000_000.0
+# 講師或場次沒有地區時使用的距離
+UNKNOWN_REGION_DISTANCE = 6
+# 修正講師時間重疊的最多重新求解次數
+MAX_OVERLAP_ROUNDS = 10
+
+
+@dataclass(frozen=True)
+class LectureSession:
+    """需要一位講師的一場活動 (重複活動的一次舉行)。"""
+    activity_id: int
+    day: date
+    start_minute: int
+    end_minute: int
+    region_id: int | None = None
+
+    def overlaps(self, other: "LectureSession") -> bool:
+        return self.day == other.day and self.start_minute < other.end_minute and other.start_minute < self.end_minute
+
+
+@dataclass(frozen=True)
+class LecturerAssignment:
+    """一場的指派結果；member_id 為 None 表示沒有合適的講師。"""
+    session: LectureSession
+    member_id: int | None
+    cost: float
+
+
+@dataclass
+class LecturerPlan:
+    """一季場次的講師指派結果，順序與輸入的場次相同。"""
+    assignments: List[LecturerAssignment] = field(default_factory=list)
+    rounds: int = 1
+
+    @property
+    def unassigned(self) -> List[LectureSession]:
+        return [assignment.session for assignment in self.assignments if assignment.member_id is None]
+
+    @property
+    def total_cost(self) -> float:
+        return sum(assignment.cost for assignment in self.assignments if assignment.member_id is not None)
+
+    def sessions_per_lecturer(self) -> Dict[int, int]:
+        return dict(Counter(assignment.member_id for assignment in self.assignments
+                            if assignment.member_id is not None))
+
+
+def region_distances(index: RegionLcaIndex, session_regions: Sequence[int | None],
+                     lecturer_regions: Sequence[int | None]) -> np.ndarray:
+    """返回 (場次 × 講師) 的地區距離；沒有地區或地區不在索引中的一方使用 UNKNOWN_REGION_DISTANCE。"""
+    distances = np.full((len(session_regions), len(lecturer_regions)), UNKNOWN_REGION_DISTANCE, dtype=np.float64)
+    known_sessions = [i for i, region_id in enumerate(session_regions) if region_id is not None and region_id in index]
+    known_lecturers = [j for j, region_id in enumerate(lecturer_regions) if region_id is not None and region_id in index]
+    if known_sessions and known_lecturers:
+        distances[np.ix_(known_sessions, known_lecturers)] = index.distance_matrix(
+            [session_regions[i] for i in known_sessions], [lecturer_regions[j] for j in known_lecturers]
+        )
+    return distances
+
+
+def lecturer_costs(distances: np.ndarray, loads: np.ndarray, available: np.ndarray) -> np.ndarray:
+    """組合 (場次 × 講師) 的成本矩陣。
+
+    Args:
+        distances (np.ndarray): 地區距離，形狀為 (場次數, 講師數)。
+        loads (np.ndarray): 每位講師的近期負擔，長度為講師數。
+        available (np.ndarray): 講師在場次當天是否可排班，形狀同 distances。
+
+    Returns:
+        np.ndarray: 成本矩陣；不可排班的配對為 FORBIDDEN_COST。
+    """
+    cost = DISTANCE_WEIGHT * distances + LOAD_WEIGHT * np.asarray(loads, dtype=np.float64)[np.newaxis, :]
+    return np.where(available, cost, FORBIDDEN_COST)
+
+
+def solve_lecturer_assignment(sessions: Sequence[LectureSession], lecturer_ids: Sequence[int],
+                              cost: np.ndarray, max_sessions: int = 1) -> LecturerPlan:
+    """以最小成本指派求出每一場的講師。
+
+    Args:
+        sessions (Sequence[LectureSession]): 場次。
+        lecturer_ids (Sequence[int]): 講師的會員 ID。
+        cost (np.ndarray): (場次 × 講師) 的成本矩陣，見 lecturer_costs()。
+        max_sessions (int): 每位講師最多負責的場數。
+
+    Returns:
+        LecturerPlan: 指派結果。
+    """
+    session_count, lecturer_count = len(sessions), len(lecturer_ids)
+    cost = np.array(cost, dtype=np.float64).reshape(session_count, lecturer_count)
+    # 第 k 份複本 (k = 0..max_sessions-1) 的欄位為 k * 講師數 + 講師索引
+    extra = np.repeat(np.arange(max_sessions) * EXTRA_SESSION_COST, lecturer_count)
+    solver = AssignmentSolver(np.tile(cost, (1, max_sessions)) + extra, unassigned_cost=UNASSIGNED_COST)
+    copies = np.arange(max_sessions) * lecturer_count
+
+    rounds = 0
+    while True:
+        rounds += 1
+        rows, cols = solver.solve()
+        lecturer_of = np.full(session_count, -1, dtype=np.int64)
+        chosen = solver.cost[rows, cols] < FORBIDDEN_COST
+        lecturer_of[rows[chosen]] = cols[chosen] % lecturer_count
+
+        overlaps = _overlapping(sessions, lecturer_of)
+        if not overlaps or rounds >= MAX_OVERLAP_ROUNDS:
+            break
+        # 禁止該場使用這位講師的所有複本
+        for session_index, lecturer_index in overlaps:
+            cost[session_index, lecturer_index] = FORBIDDEN_COST
+            solver.raise_costs([session_index] * max_sessions, copies + lecturer_index, FORBIDDEN_COST)
+    if overlaps:
+        # 仍有重疊時，較晚的場次改為不指派
+        for session_index, _ in overlaps:
+            lecturer_of[session_index] = -1
+
+    plan = LecturerPlan(rounds=rounds)
+    sessions_taken = Counter()
+    for session_index, lecturer_index in enumerate(lecturer_of.tolist()):
+        if lecturer_index < 0:
+            plan.assignments.append(LecturerAssignment(sessions[session_index], None, UNASSIGNED_COST))
+            continue
+        # 總成本以複本的遞增成本計算，與求解的目標一致
+        copy = sessions_taken[lecturer_index]
+        sessions_taken[lecturer_index] += 1
+        plan.assignments.append(LecturerAssignment(
+            sessions[session_index], int(lecturer_ids[lecturer_index]),
+            float(cost[session_index, lecturer_index] + copy * EXTRA_SESSION_COST),
+        ))
+    logger.info(
+        f"Assigned lecturers to {session_count - len(plan.unassigned)}/{session_count} sessions "
+        f"from {lecturer_count} lecturers in {rounds} round(s)."
+    )
+    return plan
+
+
+def _overlapping(sessions: Sequence[LectureSession], lecturer_of: np.ndarray) -> List[tuple]:
+    """返回 (場次索引, 講師索引)：同一位講師時間重疊的場次中，較晚開始的那些。"""
+    by_lecturer: Dict[int, List[int]] = {}
+    for session_index in np.flatnonzero(lecturer_of >= 0).tolist():
+        by_lecturer.setdefault(int(lecturer_of[session_index]), []).append(session_index)
+    result = []
+    for lecturer_index, indices in by_lecturer.items():
+        if len(indices) < 2:
+            continue
+        indices.sort(key=lambda i: (sessions[i].day, sessions[i].start_minute))
+        # 當天已保留場次的最晚結束時間；重疊的場次不保留，不延長這個時間
+        last_day, last_end = None, 0
+        for session_index in indices:
+            lecture = sessions[session_index]
+            if lecture.day == last_day and lecture.start_minute < last_end:
+                result.append((session_index, lecturer_index))
+            elif lecture.day == last_day:
+                last_end = max(last_end, lecture.end_minute)
+            else:
+                last_day, last_end = lecture.day, lecture.end_minute
+    return result
+
+
+def lecture_sessions(session: Session, start: date, end: date,
+                     activity_ids: Iterable[int] | None = None) -> List[LectureSession]:
+    """列出期間內 (含首尾) 的場次；重複活動只展開這段期間。
+
+    Args:
+        session (Session): 資料庫會話。
+        start (date): 起始日。
+        end (date): 結束日。
+        activity_ids (Iterable[int] | None): 只包含這些活動；None 表示所有活動。
+    """
+    wanted = set(activity_ids) if activity_ids is not None else None
+    return [
+        LectureSession(activity.id, day, activity.start_minute, activity.end_minute, activity.region_id)
+        for day, activity in occurrences_between(session, start, end)
+        if wanted is None or activity.id in wanted
+    ]
+
+
+def _qualified_lecturers(session: Session, position_ids: Iterable[int], qualification_mask: int = 0) -> List[tuple]:
+    criteria = member_criteria(position_ids=position_ids, qualification_mask=qualification_mask)
+    return MemberFilterRepository(session).get_rows(criteria, Member.id, Member.region_id)
+
+
+def _availability(session: Session, sessions: Sequence[LectureSession], lecturer_ids: Sequence[int]) -> np.ndarray:
+    """返回 (場次 × 講師) 的布林矩陣：講師在場次當天是否可排班。"""
+    store = AvailabilityStore(session)
+    available = np.ones((len(sessions), len(lecturer_ids)), dtype=bool)
+    for year in sorted({lecture.day.year for lecture in sessions}):
+        indices = [i for i, lecture in enumerate(sessions) if lecture.day.year == year]
+        days = np.array([day_of_year(sessions[i].day) for i in indices], dtype=np.int64)
+        packed = store.packed(year, lecturer_ids)
+        available[indices] = ((packed[:, days // 8] >> (days % 8)) & 1).astype(bool).T
+    return available
+
+
+def plan_lecturers(session: Session, start: date, end: date, position_ids: Iterable[int],
+                   activity_ids: Iterable[int] | None = None, max_sessions: int = 2,
+                   qualification_mask: int = 0) -> LecturerPlan:
+    """為期間內的場次指派講師 (不寫入資料庫)。
+
+    Args:
+        session (Session): 資料庫會話。
+        start (date): 起始日 (含)。
+        end (date): 結束日 (含)。
+        position_ids (Iterable[int]): 具備講師資格的職務；持有任一職務的可排班會員皆可擔任講師。
+        activity_ids (Iterable[int] | None): 只為這些活動的場次指派；None 表示期間內所有活動。
+        max_sessions (int): 每位講師最多負責的場數。
+        qualification_mask (int): 講師還必須具備的資格遮罩 (例如教學資格)；0 表示不限資格。
+
+    Returns:
+        LecturerPlan: 指派結果。
+    """
+    sessions = lecture_sessions(session, start, end, activity_ids)
+    lecturers = _qualified_lecturers(session, position_ids, qualification_mask)
+    if not sessions or not lecturers:
+        return LecturerPlan([LecturerAssignment(lecture, None, UNASSIGNED_COST) for lecture in sessions])
+
+    lecturer_ids = [member_id for member_id, _ in lecturers]
+    distances = region_distances(RegionProximityService.for_session(session).index,
+                                 [lecture.region_id for lecture in sessions],
+                                 [region_id for _, region_id in lecturers])
+    counters = DutyLoadCounters.load(session)
+    loads = np.array([counters.load_on(member_id, start) for member_id in lecturer_ids])
+    cost = lecturer_costs(distances, loads, _availability(session, sessions, lecturer_ids))
+    return solve_lecturer_assignment(sessions, lecturer_ids, cost, max_sessions)
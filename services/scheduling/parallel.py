@@ -0,0 +1,149 @@
+"""以多個行程平行求解互不相干的排班子問題。
+
+兩個班別只要合格會員有交集，就必須在同一個子問題中求解 (同一位會員的排班次數與
+時段衝突會互相影響)。partition_problem() 以合格會員位元集合的交集做聯集-查找，
+把班別分成沒有共用會員的群組——通常就是各頂層地區——再把每組縮成只含該組會員的
+精簡 ScheduleProblem (會員 ID 陣列 + 位元集合)，可以低成本 pickle 給子行程。
+
+子行程求解後只回傳各班次的會員索引，由主行程對應回原本的會員索引並合併。
+任一不限地區、不限職務的班別會讓所有會員連成一組，此時不會分割，直接在本行程求解。
+"""
+
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Dict, List
+
+import numpy as np
+
+from services.scheduling.problem import ScheduleProblem, bitset_from_mask, mask_from_bitset
+from services.scheduling.solver import Schedule, ScheduleSolver, SlotKey
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProblemPartition:
+    """一個可獨立求解的子問題。
+
+    Attributes:
+        problem (ScheduleProblem): 只含本組會員與班別的子問題。
+        member_indices (np.ndarray): 子問題會員索引 -> 原問題會員索引。
+        definition_indices (List[int]): 子問題班別索引 -> 原問題班別索引。
+    """
+    problem: ScheduleProblem
+    member_indices: np.ndarray
+    definition_indices: List[int]
+
+
+def _definition_groups(problem: ScheduleProblem) -> List[List[int]]:
+    """將合格會員有交集的班別歸為同一組 (聯集-查找)。"""
+    parent = list(range(len(problem.definitions)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, bits in enumerate(problem.eligible):
+        for j in range(i + 1, len(problem.eligible)):
+            if bits & problem.eligible[j]:
+                parent[find(j)] = find(i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(problem.definitions)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def _subset_bits(bits: int, size: int, member_indices: np.ndarray) -> int:
+    return bitset_from_mask(mask_from_bitset(bits, size)[member_indices])
+
+
+def partition_problem(problem: ScheduleProblem) -> List[ProblemPartition]:
+    """把排班問題分割成沒有共用會員的子問題，依會員數由大到小排列。
+
+    Args:
+        problem (ScheduleProblem): 原排班問題。
+
+    Returns:
+        List[ProblemPartition]: 子問題；無法分割時只有一個 (內容與原問題相同的) 子問題。
+    """
+    size = problem.member_count
+    groups = _definition_groups(problem)
+    if len(groups) <= 1:
+        return [ProblemPartition(problem, np.arange(size), list(range(len(problem.definitions))))]
+
+    partitions = []
+    for definition_indices in groups:
+        members = 0
+        for i in definition_indices:
+            members |= problem.eligible[i]
+        member_indices = np.flatnonzero(mask_from_bitset(members, size))
+        availability = None
+        if problem.availability is not None:
+            availability = [_subset_bits(bits, size, member_indices) for bits in problem.availability]
+        partitions.append(ProblemPartition(
+            problem=ScheduleProblem(
+                start=problem.start,
+                end=problem.end,
+                definitions=[problem.definitions[i] for i in definition_indices],
+                member_ids=problem.member_ids[member_indices],
+                member_top_regions=problem.member_top_regions[member_indices],
+                eligible=[_subset_bits(problem.eligible[i], size, member_indices) for i in definition_indices],
+                availability=availability,
+                base_loads=problem.base_loads[member_indices] if problem.base_loads is not None else None,
+                last_assigned=problem.last_assigned[member_indices] if problem.last_assigned is not None else None,
+            ),
+            member_indices=member_indices,
+            definition_indices=definition_indices,
+        ))
+    partitions.sort(key=lambda partition: partition.problem.member_count, reverse=True)
+    return partitions
+
+
+def _solve_partition(problem: ScheduleProblem) -> Dict[SlotKey, List[int]]:
+    """在子行程中求解，只回傳排班 (避免把整個 Schedule 傳回主行程)。"""
+    return ScheduleSolver(problem).solve().assignments
+
+
+def solve_parallel(problem: ScheduleProblem, max_workers: int | None = None,
+                   executor: Executor | None = None) -> Schedule:
+    """分割排班問題並以行程池平行求解，再合併結果。
+
+    Args:
+        problem (ScheduleProblem): 排班問題。
+        max_workers (int | None): 行程數上限，預設為 CPU 核心數；1 表示在本行程依序求解。
+        executor (Executor | None): 重複使用的行程池；None 表示臨時建立一個。
+
+    Returns:
+        Schedule: 合併後的排班結果，會員與班別索引對應原問題。
+    """
+    started = perf_counter()
+    partitions = partition_problem(problem)
+    workers = min(max_workers or os.cpu_count() or 1, len(partitions))
+
+    if workers <= 1 and executor is None:
+        results = [_solve_partition(partition.problem) for partition in partitions]
+    elif executor is not None:
+        results = list(executor.map(_solve_partition, [partition.problem for partition in partitions]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_solve_partition, [partition.problem for partition in partitions]))
+
+    assignments: Dict[SlotKey, List[int]] = {}
+    for partition, partial in zip(partitions, results):
+        for (day_index, local_definition), members in partial.items():
+            key = (day_index, partition.definition_indices[local_definition])
+            assignments[key] = partition.member_indices[members].tolist()
+
+    elapsed_ms = (perf_counter() - started) * 1000
+    schedule = ScheduleSolver.from_schedule(Schedule(problem, assignments)).result(elapsed_ms)
+    logger.info(
+        f"Solved {len(partitions)} partitions with {workers} workers: "
+        f"{schedule.metrics.assigned}/{schedule.metrics.required} assignments in {elapsed_ms:.0f} ms."
+    )
+    return schedule
@@ -0,0 +1,384 @@
+"""排班問題的輸入資料。
+
+排班以「會員索引」(0..n-1) 表示候選人，每個班別的合格候選人與每天的可排班會員
+都是以 Python int 表示的位元集合 (bitset)：第 i 個位元代表第 i 位會員。
+交集、聯集與計數 (int.bit_count) 都由 C 實作完成，一萬名會員的集合運算只需數微秒。
+
+ScheduleProblem 只包含整數、位元集合與 NumPy 陣列，可直接 pickle 傳給其他行程。
+"""
+
+from dataclasses import dataclass, field, replace
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.member_model import Member
+from models.member_position_model import MemberPosition
+from models.region_model import Region
+from services.scheduling.availability import AvailabilityStore
+
+ALL_WEEKDAYS = frozenset(range(7))
+MINUTES_PER_DAY = 24 * 60
+
+
+@dataclass(frozen=True)
+class SlotDefinition:
+    """一種班別的定義，例如「週日上午會館值班，需要 2 位幹部」。
+
+    Attributes:
+        key (str): 班別代碼，在同一個排班問題中必須唯一。
+        name (str): 顯示名稱。
+        required (int): 每次需要的人數。
+        position_ids (frozenset[int]): 合格的職務；空集合表示不限職務。
+        region_id (int | None): 限定此地區 (含所有子地區) 的會員；None 表示不限地區。
+        weekdays (frozenset[int]): 開設班別的星期 (0 = 週一 ... 6 = 週日)。
+        start_minute (int): 當天開始時間 (自午夜起算的分鐘數)。
+        end_minute (int): 當天結束時間 (自午夜起算的分鐘數)。
+    """
+    key: str
+    name: str
+    required: int = 1
+    position_ids: frozenset = frozenset()
+    region_id: int | None = None
+    weekdays: frozenset = ALL_WEEKDAYS
+    start_minute: int = 0
+    end_minute: int = MINUTES_PER_DAY
+
+
+@dataclass
+class ScheduleProblem:
+    """一次排班所需的全部輸入。
+
+    Attributes:
+        start (date): 排班起始日 (含)。
+        end (date): 排班結束日 (含)。
+        definitions (List[SlotDefinition]): 班別定義。
+        member_ids (np.ndarray): 候選會員 ID，索引即為位元集合中的位元位置。
+        member_top_regions (np.ndarray): 每位會員所屬的頂層地區 ID (0 表示無地區)，用於分割問題。
+        eligible (List[int]): 每個班別的合格會員位元集合。
+        availability (List[int] | None): 每天可排班會員的位元集合；None 表示全部可排班。
+        base_loads (np.ndarray | None): 每位會員的歷史排班負擔，排序時加在本次次數之上；None 表示全為 0。
+        last_assigned (np.ndarray | None): 每位會員上次排班日相對於 start 的天數 (過去為負數)；
+            None 表示都沒有紀錄。
+    """
+    start: date
+    end: date
+    definitions: List[SlotDefinition]
+    member_ids: np.ndarray
+    member_top_regions: np.ndarray
+    eligible: List[int]
+    availability: List[int] | None = None
+    base_loads: np.ndarray | None = None
+    last_assigned: np.ndarray | None = None
+    _all_members: int = field(default=0, repr=False)
+
+    def __post_init__(self):
+        self._all_members = (1 << len(self.member_ids)) - 1
+
+    @property
+    def day_count(self) -> int:
+        return (self.end - self.start).days + 1
+
+    @property
+    def member_count(self) -> int:
+        return len(self.member_ids)
+
+    def copy(self) -> "ScheduleProblem":
+        """複製一份可獨立修改資格與可排班日的問題 (位元集合本身是不可變的 int，只複製清單)。"""
+        return replace(self, eligible=list(self.eligible),
+                       availability=list(self.availability) if self.availability is not None else None)
+
+    def day(self, day_index: int) -> date:
+        """返回第 day_index 天的日期。"""
+        return self.start + timedelta(days=day_index)
+
+    def available_on(self, day_index: int) -> int:
+        """返回第 day_index 天可排班會員的位元集合。"""
+        if self.availability is None:
+            return self._all_members
+        return self.availability[day_index]
+
+    def slots(self) -> List[tuple[int, int]]:
+        """依日期順序列出所有要排的班次 (天索引, 班別索引)。"""
+        result = []
+        for day_index in range(self.day_count):
+            weekday = self.day(day_index).weekday()
+            for definition_index, definition in enumerate(self.definitions):
+                if weekday in definition.weekdays and definition.required > 0:
+                    result.append((day_index, definition_index))
+        return result
+
+    def index_of_members(self, member_ids: Iterable[int]) -> List[int]:
+        """將會員 ID 轉為會員索引；不在問題中的會員會被略過。"""
+        member_ids = np.asarray(list(member_ids), dtype=np.int64)
+        positions = np.searchsorted(self.member_ids, member_ids)
+        positions = np.minimum(positions, max(len(self.member_ids) - 1, 0))
+        found = self.member_ids[positions] == member_ids if len(self.member_ids) else np.zeros(len(member_ids), bool)
+        return positions[found].tolist()
+
+
+def bitset_from_mask(mask: np.ndarray) -> int:
+    """將布林陣列轉為位元集合 (第 i 個元素對應第 i 個位元)。"""
+    if len(mask) == 0:
+        return 0
+    return int.from_bytes(np.packbits(mask.astype(bool), bitorder="little").tobytes(), "little")
+
+
+def mask_from_bitset(bits: int, size: int) -> np.ndarray:
+    """將位元集合轉回長度為 size 的布林陣列。"""
+    raw = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:size].astype(bool)
+
+
+def bit_indices(bits: int, size: int) -> np.ndarray:
+    """返回位元集合中所有索引 (由小到大)。適合列舉大型集合。"""
+    return np.flatnonzero(mask_from_bitset(bits, size))
+
+
+def iter_bits(bits: int):
+    """由小到大逐一列出位元集合中的索引。每一步都會複製整數，只適合取前幾個元素。"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _subtree_mask(member_paths: Sequence[str | None], region_path: str | None) -> np.ndarray:
+    if region_path is None:
+        return np.zeros(len(member_paths), dtype=bool)
+    return np.fromiter((path is not None and path.startswith(region_path) for path in member_paths),
+                       dtype=bool, count=len(member_paths))
+
+
+@dataclass
+class MemberSnapshot:
+    """排班所需會員資料的記憶體快照，不再依賴資料庫即可為任意班別建立排班問題。
+
+    只包含 NumPy 陣列、字串與位元集合，可 pickle 給其他行程 (見 simulation.py)。
+
+    Attributes:
+        start (date): 排班起始日 (含)。
+        end (date): 排班結束日 (含)。
+        member_ids (np.ndarray): 可排班會員 ID (遞增)。
+        member_paths (List[str | None]): 每位會員所屬地區的 path。
+        member_top_regions (np.ndarray): 每位會員所屬的頂層地區 ID (0 表示無地區)。
+        holder_index (np.ndarray): 每筆職務紀錄的會員索引。
+        holder_positions (np.ndarray): 每筆職務紀錄的職務 ID。
+        region_paths (Dict[int, str]): 地區 ID -> path。
+        availability (List[int] | None): 每天可排班會員的位元集合。
+    """
+    start: date
+    end: date
+    member_ids: np.ndarray
+    member_paths: List[str | None]
+    member_top_regions: np.ndarray
+    holder_index: np.ndarray
+    holder_positions: np.ndarray
+    region_paths: Dict[int, str]
+    availability: List[int] | None = None
+
+    @property
+    def member_count(self) -> int:
+        return len(self.member_ids)
+
+    def subtree_mask(self, region_id: int) -> np.ndarray:
+        """屬於 region_id 子樹 (含自身) 的會員。"""
+        return _subtree_mask(self.member_paths, self.region_paths.get(region_id))
+
+    def eligibility_mask(self, definition: SlotDefinition) -> np.ndarray:
+        """符合班別職務與地區限制的會員 (布林陣列)。"""
+        mask = np.ones(self.member_count, dtype=bool)
+        if definition.position_ids:
+            position_mask = np.zeros(self.member_count, dtype=bool)
+            holds = np.isin(self.holder_positions, list(definition.position_ids))
+            position_mask[self.holder_index[holds]] = True
+            mask &= position_mask
+        if definition.region_id is not None:
+            mask &= self.subtree_mask(definition.region_id)
+        return mask
+
+    def problem(self, definitions: Sequence[SlotDefinition], excluded: np.ndarray | None = None) -> ScheduleProblem:
+        """為指定的班別建立排班問題。
+
+        Args:
+            definitions (Sequence[SlotDefinition]): 班別定義。
+            excluded (np.ndarray | None): 要排除 (視為不可排班) 的會員布林陣列。
+
+        Returns:
+            ScheduleProblem: 排班問題，會員索引與快照相同。
+
+        Raises:
+            ValueError: 班別代碼重複。
+        """
+        if len({d.key for d in definitions}) != len(definitions):
+            raise ValueError("班別代碼不可重複。")
+        eligible = []
+        for definition in definitions:
+            mask = self.eligibility_mask(definition)
+            if excluded is not None:
+                mask &= ~excluded
+            eligible.append(bitset_from_mask(mask))
+        return ScheduleProblem(
+            start=self.start,
+            end=self.end,
+            definitions=list(definitions),
+            member_ids=self.member_ids,
+            member_top_regions=self.member_top_regions,
+            eligible=eligible,
+            availability=list(self.availability) if self.availability is not None else None,
+        )
+
+
+def load_snapshot(session: Session, start: date, end: date, load_availability: bool = True) -> MemberSnapshot:
+    """讀取可排班會員、職務、地區與可排班日，建立記憶體快照。只會執行查詢，不會寫入。
+
+    Args:
+        session (Session): 資料庫會話。
+        start (date): 排班起始日 (含)。
+        end (date): 排班結束日 (含)。
+        load_availability (bool): 是否讀取會員可排班日；False 表示全部可排班。
+
+    Returns:
+        MemberSnapshot: 快照。
+
+    Raises:
+        ValueError: 日期範圍不合法。
+    """
+    if end < start:
+        raise ValueError("排班結束日不可早於起始日。")
+
+    rows = session.execute(
+        select(Member.id, Region.path)
+        .outerjoin(Region, Member.region_id == Region.id)
+        .where(Member.is_schedulable == 1)
+        .order_by(Member.id)
+    ).all()
+    member_ids = np.fromiter((member_id for member_id, _ in rows), dtype=np.int64, count=len(rows))
+    member_paths = [path for _, path in rows]
+    # path 的第一段即為頂層地區 ID
+    member_top_regions = np.fromiter((int(path[1:path.index("/", 1)]) if path else 0 for path in member_paths),
+                                     dtype=np.int64, count=len(member_paths))
+
+    holder_rows = session.execute(
+        select(MemberPosition.member_id, MemberPosition.position_id)
+        .join(Member, Member.id == MemberPosition.member_id)
+        .where(Member.is_schedulable == 1)
+    ).all()
+    holder_members = np.fromiter((member_id for member_id, _ in holder_rows), dtype=np.int64, count=len(holder_rows))
+    holder_positions = np.fromiter((position_id for _, position_id in holder_rows), dtype=np.int64,
+                                   count=len(holder_rows))
+
+    return MemberSnapshot(
+        start=start,
+        end=end,
+        member_ids=member_ids,
+        member_paths=member_paths,
+        member_top_regions=member_top_regions,
+        holder_index=np.searchsorted(member_ids, holder_members),
+        holder_positions=holder_positions,
+        region_paths=dict(session.execute(select(Region.id, Region.path)).all()),
+        availability=AvailabilityStore(session).day_bitsets(member_ids, start, end) if load_availability else None,
+    )
+
+
+def build_problem(session: Session, start: date, end: date, definitions: Sequence[SlotDefinition],
+                  availability: List[int] | None = None) -> ScheduleProblem:
+    """由資料庫中可排班的會員建立排班問題。
+
+    Args:
+        session (Session): 資料庫會話。
+        start (date): 排班起始日 (含)。
+        end (date): 排班結束日 (含)。
+        definitions (Sequence[SlotDefinition]): 班別定義。
+        availability (List[int] | None): 每天可排班會員的位元集合，索引須與 member_ids 一致。
+            None 表示由 AvailabilityStore 讀取資料庫中的會員可排班日。
+
+    Returns:
+        ScheduleProblem: 排班問題。
+
+    Raises:
+        ValueError: 日期範圍不合法或班別代碼重複。
+    """
+    snapshot = load_snapshot(session, start, end, load_availability=availability is None)
+    problem = snapshot.problem(definitions)
+    if availability is not None:
+        problem.availability = availability
+    return problem
+
+
+def refresh_members(session: Session, problem: ScheduleProblem, member_ids: Iterable[int]) -> List[int]:
+    """以資料庫目前的資料，就地更新指定會員在排班問題中的資格與可排班日。
+
+    只重新計算這幾位會員的位元，不重建整個問題。不再可排班的會員會從所有班別的
+    合格集合中移除；原本不在問題中的會員 (例如剛改為可排班) 無法加入，需重新 build_problem()。
+
+    Args:
+        session (Session): 資料庫會話。
+        problem (ScheduleProblem): 要更新的排班問題。
+        member_ids (Iterable[int]): 資料有變動的會員 ID。
+
+    Returns:
+        List[int]: 已更新的會員索引。
+    """
+    member_ids = list(member_ids)
+    indices = problem.index_of_members(member_ids)
+    if not indices:
+        return []
+    index_of = {int(problem.member_ids[i]): i for i in indices}
+
+    rows = session.execute(
+        select(Member.id, Member.is_schedulable, Region.path)
+        .outerjoin(Region, Member.region_id == Region.id)
+        .where(Member.id.in_(index_of))
+    ).all()
+    states = {member_id: (bool(schedulable), path) for member_id, schedulable, path in rows}
+    held = {}
+    for member_id, position_id in session.execute(
+            select(MemberPosition.member_id, MemberPosition.position_id).where(MemberPosition.member_id.in_(index_of))):
+        held.setdefault(member_id, set()).add(position_id)
+    region_paths = dict(session.execute(
+        select(Region.id, Region.path).where(Region.id.in_({d.region_id for d in problem.definitions if d.region_id}))
+    ).all())
+
+    for member_id, member_index in index_of.items():
+        # 已刪除的會員視為不可排班
+        schedulable, path = states.get(member_id, (False, None))
+        bit = 1 << member_index
+        for definition_index, definition in enumerate(problem.definitions):
+            eligible = schedulable
+            if eligible and definition.position_ids:
+                eligible = bool(definition.position_ids & held.get(member_id, set()))
+            if eligible and definition.region_id is not None:
+                region_path = region_paths.get(definition.region_id)
+                eligible = path is not None and region_path is not None and path.startswith(region_path)
+            if eligible:
+                problem.eligible[definition_index] |= bit
+            else:
+                problem.eligible[definition_index] &= ~bit
+
+    _refresh_availability(session, problem, index_of)
+    return list(index_of.values())
+
+
+def _refresh_availability(session: Session, problem: ScheduleProblem, index_of: dict[int, int]):
+    ids = list(index_of)
+    store = AvailabilityStore(session)
+    for year in range(problem.start.year, problem.end.year + 1):
+        first = max(problem.start, date(year, 1, 1))
+        last = min(problem.end, date(year, 12, 31))
+        offset = (first - problem.start).days
+        matrix = store.matrix(year, ids)[:, first.timetuple().tm_yday - 1:last.timetuple().tm_yday]
+        if problem.availability is None:
+            if matrix.all():
+                continue
+            problem.availability = [problem.available_on(day) for day in range(problem.day_count)]
+        for row, member_id in enumerate(ids):
+            bit = 1 << index_of[member_id]
+            for day, available in enumerate(matrix[row].tolist()):
+                if available:
+                    problem.availability[offset + day] |= bit
+                else:
+                    problem.availability[offset + day] &= ~bit
@@ -0,0 +1,41 @@
+"""會員資料變動後的增量排班修補。
+
+會員被設為不可排班、失去職務、移到其他地區或新增不可排班日時，只有他已排入的班次會失效。
+repair_schedule() 只重新計算這幾位會員的資格位元，移除失效的排班並為那些班次找替代者，
+其他人的排班完全不變；相較於重新求解整年的排班，既快又不會打亂大家已知的班表。
+"""
+
+import logging
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from services.scheduling.problem import refresh_members
+from services.scheduling.solver import Schedule, ScheduleRepair, ScheduleSolver
+
+logger = logging.getLogger(__name__)
+
+
+def repair_schedule(session: Session, schedule: Schedule, member_ids: Iterable[int]) -> ScheduleRepair:
+    """依資料庫中會員的最新資料修補排班。
+
+    Args:
+        session (Session): 資料庫會話，需能讀到已提交的會員變更。
+        schedule (Schedule): 目前的排班；不會被修改。
+        member_ids (Iterable[int]): 資料有變動的會員 ID。
+
+    Returns:
+        ScheduleRepair: 修補結果，schedule 屬性為新的排班。
+    """
+    problem = schedule.problem.copy()
+    member_indices = refresh_members(session, problem, member_ids)
+    if not member_indices:
+        return ScheduleRepair(Schedule(problem, {key: list(m) for key, m in schedule.assignments.items()},
+                                       schedule.metrics), [], [])
+
+    result = ScheduleSolver.from_schedule(schedule, problem).repair(member_indices)
+    logger.info(
+        f"Repaired schedule for {len(member_indices)} members: removed {len(result.removed)}, "
+        f"added {len(result.added)} assignments in {result.schedule.metrics.elapsed_ms:.1f} ms."
+    )
+    return result
@@ -0,0 +1,172 @@
+"""排班情境模擬 (what-if)。
+
+規劃者在正式排班前想比較「如果北區少了 20 位會員」、「如果週六多開一個班」等情境。
+run_simulations() 只讀取一次資料庫，建立會員資料的記憶體快照 (MemberSnapshot)，
+之後每個情境都在工作行程中以快照建立排班問題並求解，不會再連線或寫入資料庫。
+
+快照透過行程池的 initializer 在每個工作行程只傳送一次；各情境本身只傳送很小的
+Scenario 物件。結果以同一組指標 (覆蓋率、缺人的班次、負擔標準差) 並列比較。
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from services.scheduling.fairness import DutyLoadCounters
+from services.scheduling.problem import MemberSnapshot, SlotDefinition, load_snapshot
+from services.scheduling.solver import ScheduleMetrics, ScheduleSolver
+
+logger = logging.getLogger(__name__)
+
+BASELINE_NAME = "目前"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """一個模擬情境：以目前的班別與會員為基礎，加上以下變動。
+
+    Attributes:
+        name (str): 情境名稱。
+        add_definitions (Tuple[SlotDefinition, ...]): 新增的班別。
+        remove_definition_keys (frozenset[str]): 移除的班別代碼。
+        removed_member_ids (frozenset[int]): 視為不可排班的會員。
+        region_member_losses (Tuple[Tuple[int, int], ...]): (地區 ID, 人數)：從該地區子樹隨機移除的會員數。
+        seed (int): 隨機移除會員時使用的亂數種子，相同種子結果相同。
+    """
+    name: str
+    add_definitions: Tuple[SlotDefinition, ...] = ()
+    remove_definition_keys: frozenset = frozenset()
+    removed_member_ids: frozenset = frozenset()
+    region_member_losses: Tuple[Tuple[int, int], ...] = ()
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    """單一情境的模擬結果。
+
+    Attributes:
+        name (str): 情境名稱。
+        metrics (ScheduleMetrics): 排班品質指標。
+        unfilled_slots (int): 至少缺一人的班次數。
+        removed_members (int): 情境中被移除的會員數。
+        definition_count (int): 情境中的班別數。
+    """
+    name: str
+    metrics: ScheduleMetrics
+    unfilled_slots: int
+    removed_members: int
+    definition_count: int
+
+
+@dataclass
+class _WorkerState:
+    snapshot: MemberSnapshot | None = None
+    definitions: List[SlotDefinition] = field(default_factory=list)
+    base_loads: np.ndarray | None = None
+    last_assigned: np.ndarray | None = None
+
+
+# 每個工作行程的快照 (由 initializer 設定)
+_state = _WorkerState()
+
+
+def _init_worker(snapshot: MemberSnapshot, definitions: List[SlotDefinition],
+                 base_loads: np.ndarray | None, last_assigned: np.ndarray | None):
+    _state.snapshot = snapshot
+    _state.definitions = definitions
+    _state.base_loads = base_loads
+    _state.last_assigned = last_assigned
+
+
+def _excluded_members(snapshot: MemberSnapshot, scenario: Scenario) -> np.ndarray:
+    excluded = np.isin(snapshot.member_ids, list(scenario.removed_member_ids))
+    rng = np.random.default_rng(scenario.seed)
+    for region_id, count in scenario.region_member_losses:
+        candidates = np.flatnonzero(snapshot.subtree_mask(region_id) & ~excluded)
+        if len(candidates):
+            excluded[rng.choice(candidates, size=min(count, len(candidates)), replace=False)] = True
+    return excluded
+
+
+def _run_scenario(scenario: Scenario) -> ScenarioResult:
+    """在工作行程中求解一個情境。"""
+    snapshot = _state.snapshot
+    definitions = [d for d in _state.definitions if d.key not in scenario.remove_definition_keys]
+    definitions += list(scenario.add_definitions)
+    excluded = _excluded_members(snapshot, scenario)
+
+    problem = snapshot.problem(definitions, excluded=excluded)
+    problem.base_loads = _state.base_loads
+    problem.last_assigned = _state.last_assigned
+    schedule = ScheduleSolver(problem).solve()
+    return ScenarioResult(
+        name=scenario.name,
+        metrics=schedule.metrics,
+        unfilled_slots=len(schedule.unfilled_slots()),
+        removed_members=int(excluded.sum()),
+        definition_count=len(definitions),
+    )
+
+
+def run_simulations(session: Session, start: date, end: date, definitions: Sequence[SlotDefinition],
+                    scenarios: Sequence[Scenario], max_workers: int | None = None,
+                    counters: DutyLoadCounters | None = None, include_baseline: bool = True) -> List[ScenarioResult]:
+    """以記憶體快照平行模擬多個排班情境。資料庫只會被讀取一次，不會寫入。
+
+    Args:
+        session (Session): 資料庫會話 (只用於建立快照)。
+        start (date): 排班起始日 (含)。
+        end (date): 排班結束日 (含)。
+        definitions (Sequence[SlotDefinition]): 目前的班別定義。
+        scenarios (Sequence[Scenario]): 要比較的情境。
+        max_workers (int | None): 行程數上限，預設為 CPU 核心數；1 表示在本行程依序執行。
+        counters (DutyLoadCounters | None): 歷史負擔；提供時各情境都從相同的歷史開始。
+        include_baseline (bool): 是否在最前面加入不做任何變動的「目前」情境。
+
+    Returns:
+        List[ScenarioResult]: 與情境順序相同的結果。
+    """
+    snapshot = load_snapshot(session, start, end)
+    base_loads = last_assigned = None
+    if counters is not None:
+        reference = snapshot.problem([])
+        counters.apply_to(reference)
+        base_loads, last_assigned = reference.base_loads, reference.last_assigned
+
+    scenarios = ([Scenario(BASELINE_NAME)] if include_baseline else []) + list(scenarios)
+    initargs = (snapshot, list(definitions), base_loads, last_assigned)
+    workers = min(max_workers or os.cpu_count() or 1, len(scenarios))
+    if workers <= 1:
+        _init_worker(*initargs)
+        results = [_run_scenario(scenario) for scenario in scenarios]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            results = list(pool.map(_run_scenario, scenarios))
+
+    for result in results:
+        logger.info(
+            f"Scenario {result.name}: coverage {result.metrics.coverage:.1%}, "
+            f"{result.unfilled_slots} unfilled slots, load std {result.metrics.load_std}."
+        )
+    return results
+
+
+def format_comparison(results: Sequence[ScenarioResult]) -> str:
+    """將模擬結果排成並列比較的文字表格。"""
+    header = f"{'情境':<20}{'班別':>6}{'移除會員':>10}{'覆蓋率':>10}{'缺人次':>8}{'缺人班次':>10}{'負擔標準差':>12}{'最多':>6}"
+    lines = [header]
+    for result in results:
+        metrics = result.metrics
+        lines.append(
+            f"{result.name:<20}{result.definition_count:>6}{result.removed_members:>10}"
+            f"{metrics.coverage:>10.1%}{metrics.unfilled:>8}{result.unfilled_slots:>10}"
+            f"{metrics.load_std:>12.3f}{metrics.load_max:>6}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,499 @@
+"""排班求解器：貪婪演算法 + 區域搜尋。
+
+1. 貪婪階段：依日期先後處理每一天，同一天內先排候選人最少的班別 (最難排的先排)。
+   每個班別維護一個 (排班次數, 最近排班日, 會員索引) 的 lazy heap，每次取出次數最少、
+   最久沒排班的合格會員；次數已變動的過期項目在取出時才重新放回，不必逐一更新。
+2. 補缺階段：仍缺人的班次嘗試一層交換——把當天在其他時段重疊班次的合格會員換過來，
+   再為那個班次找一位當天有空的替代者。
+3. 平衡階段：把排班次數高於平均的會員的班次，轉給低於平均、當天有空的合格會員。
+
+既有排班可透過 from_schedule() 載入，再以 repair() 只修補失效的班次 (見 repair.py)。
+
+候選人篩選全部以位元集合 (見 problem.py) 運算，不需逐一檢查會員。
+同一位會員在同一天內不會被排入時間重疊的兩個班次。
+"""
+
+import heapq
+import logging
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from services.scheduling.problem import ScheduleProblem, bit_indices, iter_bits
+
+logger = logging.getLogger(__name__)
+
+# (天索引, 班別索引)
+SlotKey = Tuple[int, int]
+
+# 補缺與平衡時，每個班次最多比較的候選人數
+CANDIDATE_SAMPLE = 64
+# 沒有排班紀錄的會員的「最近排班日」，排在所有真實日期之前
+NEVER_ASSIGNED = -(10 ** 6)
+# 每次抽樣起點的位移量 (質數，讓起點均勻分布在所有會員之間)
+SAMPLE_STRIDE = 7919
+
+
+@dataclass(frozen=True)
+class ScheduleMetrics:
+    """排班結果的品質指標。
+
+    Attributes:
+        slot_count (int): 班次總數。
+        required (int): 需要的總人次。
+        assigned (int): 已排入的總人次。
+        unfilled (int): 仍缺少的人次。
+        load_mean (float): 有資格排班的會員平均排班次數。
+        load_std (float): 排班次數的標準差，越小越公平。
+        load_max (int): 單一會員最多的排班次數。
+        elapsed_ms (float): 求解耗時 (毫秒)。
+    """
+    slot_count: int
+    required: int
+    assigned: int
+    unfilled: int
+    load_mean: float
+    load_std: float
+    load_max: int
+    elapsed_ms: float = 0.0
+
+    @property
+    def coverage(self) -> float:
+        """已排入人次佔需要人次的比例。"""
+        return self.assigned / self.required if self.required else 1.0
+
+
+@dataclass
+class Schedule:
+    """排班結果。
+
+    Attributes:
+        problem (ScheduleProblem): 對應的排班問題。
+        assignments (Dict[SlotKey, List[int]]): (天索引, 班別索引) -> 排入的會員索引。
+        metrics (ScheduleMetrics | None): 品質指標。
+    """
+    problem: ScheduleProblem
+    assignments: Dict[SlotKey, List[int]]
+    metrics: ScheduleMetrics | None = None
+
+    def loads(self) -> np.ndarray:
+        """每位會員 (依會員索引) 的排班次數。"""
+        loads = np.zeros(self.problem.member_count, dtype=np.int64)
+        for members in self.assignments.values():
+            np.add.at(loads, members, 1)
+        return loads
+
+    def unfilled_slots(self) -> Dict[SlotKey, int]:
+        """仍缺人的班次 -> 缺少的人數。"""
+        definitions = self.problem.definitions
+        return {
+            key: definitions[key[1]].required - len(members)
+            for key, members in self.assignments.items()
+            if len(members) < definitions[key[1]].required
+        }
+
+    def rows(self) -> Iterator[tuple]:
+        """依日期列出 (日期, 班別代碼, 會員 ID)，方便寫入資料庫或匯出。"""
+        member_ids = self.problem.member_ids
+        for (day_index, definition_index) in sorted(self.assignments):
+            day = self.problem.day(day_index)
+            key = self.problem.definitions[definition_index].key
+            for member_index in self.assignments[(day_index, definition_index)]:
+                yield day, key, int(member_ids[member_index])
+
+
+@dataclass
+class ScheduleRepair:
+    """增量修補的結果。
+
+    Attributes:
+        schedule (Schedule): 修補後的排班。
+        removed (List[Tuple[SlotKey, int]]): 因失效而移除的 (班次, 會員索引)。
+        added (List[Tuple[SlotKey, int]]): 新排入的 (班次, 會員索引)，包含交換時的替代者。
+        conflicts (list): 新排入的班次與同一會員其他時段重疊的 Conflict (由 repair_stored_duties 檢查)。
+    """
+    schedule: Schedule
+    removed: List[Tuple[SlotKey, int]]
+    added: List[Tuple[SlotKey, int]]
+    conflicts: list = field(default_factory=list)
+
+    @property
+    def changed(self) -> int:
+        """變動的人次 (移除 + 新排入)。"""
+        return len(self.removed) + len(self.added)
+
+
+class _TotalLoads:
+    """以索引讀取「歷史負擔 + 本次次數」，讓平衡階段不必另外維護一份清單。"""
+
+    def __init__(self, base: List[float], loads: List[int]):
+        self._base = base
+        self._loads = loads
+
+    def __getitem__(self, member_index: int) -> float:
+        return self._base[member_index] + self._loads[member_index]
+
+
+class ScheduleSolver:
+    """貪婪 + 區域搜尋排班求解器。"""
+
+    def __init__(self, problem: ScheduleProblem):
+        """初始化求解器。
+
+        Args:
+            problem (ScheduleProblem): 排班問題。
+        """
+        self.problem = problem
+        member_count = problem.member_count
+        # 本次排入的次數；排序時另加上 problem.base_loads (歷史負擔，見 fairness.py)
+        self.loads: List[int] = [0] * member_count
+        self._base = problem.base_loads.tolist() if problem.base_loads is not None else [0] * member_count
+        self.last_day: List[int] = (problem.last_assigned.tolist() if problem.last_assigned is not None
+                                    else [NEVER_ASSIGNED] * member_count)
+        self.assignments: Dict[SlotKey, List[int]] = {}
+        self._assigned_bits: Dict[SlotKey, int] = {}
+        definitions = problem.definitions
+        # 每個班別與哪些班別 (含自己) 時間重疊；同一天內重疊的班次不能由同一人擔任
+        self._overlaps = [
+            [j for j, other in enumerate(definitions)
+             if other.start_minute < definition.end_minute and definition.start_minute < other.end_minute]
+            for definition in definitions
+        ]
+        self._sample_start = 0
+        # 修補時記錄 (是否為新增, 班次, 會員索引)；None 表示不記錄
+        self._changes: List[Tuple[bool, SlotKey, int]] | None = None
+        self._eligible_any = 0
+        for bits in problem.eligible:
+            self._eligible_any |= bits
+
+    @classmethod
+    def from_schedule(cls, schedule: Schedule, problem: ScheduleProblem | None = None) -> "ScheduleSolver":
+        """以既有的排班結果建立求解器，用於增量修補。
+
+        Args:
+            schedule (Schedule): 既有的排班。
+            problem (ScheduleProblem | None): 更新過的排班問題 (會員索引須與原問題相同)；
+                None 表示沿用 schedule.problem。
+
+        Returns:
+            ScheduleSolver: 狀態與 schedule 相同的求解器。
+        """
+        solver = cls(problem or schedule.problem)
+        for key, members in sorted(schedule.assignments.items()):
+            solver.assignments[key] = []
+            for member_index in members:
+                solver._assign(key, member_index)
+        return solver
+
+    # ---- 基本操作 ----
+
+    def _busy(self, day_index: int, definition_index: int) -> int:
+        """當天已排入與此班別時間重疊之班次的會員。"""
+        busy = 0
+        for other in self._overlaps[definition_index]:
+            busy |= self._assigned_bits.get((day_index, other), 0)
+        return busy
+
+    def _free_candidates(self, day_index: int, definition_index: int) -> int:
+        return (self.problem.eligible[definition_index]
+                & self.problem.available_on(day_index)
+                & ~self._busy(day_index, definition_index))
+
+    def _assign(self, key: SlotKey, member_index: int):
+        self.assignments[key].append(member_index)
+        self._assigned_bits[key] = self._assigned_bits.get(key, 0) | (1 << member_index)
+        if self._changes is not None:
+            self._changes.append((True, key, member_index))
+        self.loads[member_index] += 1
+        if key[0] > self.last_day[member_index]:
+            self.last_day[member_index] = key[0]
+
+    def _unassign(self, key: SlotKey, member_index: int):
+        self.assignments[key].remove(member_index)
+        self._assigned_bits[key] &= ~(1 << member_index)
+        self.loads[member_index] -= 1
+        if self._changes is not None:
+            self._changes.append((False, key, member_index))
+
+    def _least_loaded(self, candidates: int) -> int | None:
+        """從候選位元集合中挑出排班次數最少的會員。
+
+        只比較 CANDIDATE_SAMPLE 位；起點每次輪替，避免索引較小的會員總是先被選中。
+        """
+        start = self._sample_start
+        self._sample_start = (start + SAMPLE_STRIDE) % max(self.problem.member_count, 1)
+        upper = (candidates >> start) << start
+        best, best_load, count = None, None, 0
+        for part in (upper, candidates ^ upper):
+            for member_index in iter_bits(part):
+                load = self._base[member_index] + self.loads[member_index]
+                if best is None or load < best_load:
+                    best, best_load = member_index, load
+                count += 1
+                if count >= CANDIDATE_SAMPLE:
+                    return best
+        return best
+
+    # ---- 貪婪階段 ----
+
+    def _greedy(self):
+        problem = self.problem
+        definitions = problem.definitions
+        heaps = []
+        for bits in problem.eligible:
+            indices = bit_indices(bits, problem.member_count).tolist()
+            heap = [(self._base[i] + self.loads[i], self.last_day[i], i) for i in indices]
+            heapq.heapify(heap)
+            heaps.append(heap)
+
+        slots_by_day: Dict[int, List[int]] = {}
+        for day_index, definition_index in problem.slots():
+            slots_by_day.setdefault(day_index, []).append(definition_index)
+
+        for day_index in sorted(slots_by_day):
+            available = problem.available_on(day_index)
+            # 候選人越少的班別越先排
+            order = sorted(slots_by_day[day_index], key=lambda d: (problem.eligible[d] & available).bit_count())
+            for definition_index in order:
+                key = (day_index, definition_index)
+                self.assignments.setdefault(key, [])
+                needed = definitions[definition_index].required - len(self.assignments[key])
+                if needed <= 0:
+                    continue
+                free = self._free_candidates(day_index, definition_index)
+                for member_index in self._pop_least_loaded(heaps[definition_index], free, needed):
+                    self._assign(key, member_index)
+                    heapq.heappush(heaps[definition_index], (self._base[member_index] + self.loads[member_index],
+                                                             self.last_day[member_index], member_index))
+
+    def _pop_least_loaded(self, heap: list, free: int, needed: int) -> List[int]:
+        """從 heap 取出最多 needed 位在 free 中的會員；不符合的項目會放回。"""
+        needed = min(needed, free.bit_count())
+        chosen, held = [], []
+        while heap and len(chosen) < needed:
+            entry = heapq.heappop(heap)
+            load, last_day, member_index = entry
+            current = self._base[member_index] + self.loads[member_index]
+            if load != current or last_day != self.last_day[member_index]:
+                # 過期項目：以目前的負擔重新放回
+                heapq.heappush(heap, (current, self.last_day[member_index], member_index))
+                continue
+            if (free >> member_index) & 1:
+                chosen.append(member_index)
+            else:
+                held.append(entry)
+        for entry in held:
+            heapq.heappush(heap, entry)
+        return chosen
+
+    # ---- 區域搜尋 ----
+
+    def _fill_unfilled(self) -> int:
+        """以一層交換補上缺人的班次，返回補上的人次。"""
+        return sum(self._fill_slot(key) for key in list(self.assignments))
+
+    def _fill_slot(self, key: SlotKey) -> int:
+        """補上單一班次缺少的人數：先找當天有空的合格會員，沒有時再嘗試交換。"""
+        day_index, definition_index = key
+        members = self.assignments[key]
+        required = self.problem.definitions[definition_index].required
+        filled = 0
+        while len(members) < required:
+            free = self._free_candidates(day_index, definition_index)
+            if free:
+                self._assign(key, self._least_loaded(free))
+            elif not self._swap_into(key):
+                break
+            filled += 1
+        return filled
+
+    def _swap_into(self, key: SlotKey) -> bool:
+        """把當天在重疊班次中的合格會員移到 key，並為原班次找替代者。"""
+        problem = self.problem
+        day_index, definition_index = key
+        blocked = (problem.eligible[definition_index] & problem.available_on(day_index)
+                   & ~self._assigned_bits.get(key, 0))
+        for other in self._overlaps[definition_index]:
+            other_key = (day_index, other)
+            if other_key == key:
+                continue
+            movable = blocked & self._assigned_bits.get(other_key, 0)
+            for member_index in iter_bits(movable):
+                # 移走後，該會員在 key 的時段內不能還有其他班次
+                if ((self._busy(day_index, definition_index) & ~self._assigned_bits[other_key]) >> member_index) & 1:
+                    continue
+                replacement = self._free_candidates(day_index, other) & ~(1 << member_index)
+                replacement_index = self._least_loaded(replacement)
+                if replacement_index is None:
+                    continue
+                self._unassign(other_key, member_index)
+                self._assign(other_key, replacement_index)
+                self._assign(key, member_index)
+                return True
+        return False
+
+    def _balance(self, max_passes: int) -> int:
+        """把負擔高於平均 (無條件進位) 者的班次轉給低於此值者，返回移動的人次。
+
+        只在兩人負擔相差至少 2 時移動，因此每次移動都會讓標準差下降。
+        負擔包含歷史負擔 (problem.base_loads)。
+        """
+        eligible_indices = bit_indices(self._eligible_any, self.problem.member_count).tolist()
+        if not eligible_indices:
+            return 0
+        loads = _TotalLoads(self._base, self.loads)
+        mean = sum(loads[i] for i in eligible_indices) / len(eligible_indices)
+        high = int(np.ceil(mean))
+
+        member_slots: Dict[int, List[SlotKey]] = {}
+        for key, members in self.assignments.items():
+            for member_index in members:
+                member_slots.setdefault(member_index, []).append(key)
+
+        under = 0
+        for member_index in eligible_indices:
+            if loads[member_index] < high:
+                under |= 1 << member_index
+
+        moved = 0
+        for _ in range(max_passes):
+            moved_this_pass = 0
+            over = [i for i in eligible_indices if loads[i] > high]
+            for member_index in over:
+                for key in list(member_slots.get(member_index, ())):
+                    if loads[member_index] <= high or not under:
+                        break
+                    replacement = self._free_candidates(*key) & under
+                    replacement_index = self._least_loaded(replacement)
+                    if replacement_index is None or loads[replacement_index] > loads[member_index] - 2:
+                        continue
+                    self._unassign(key, member_index)
+                    self._assign(key, replacement_index)
+                    member_slots[member_index].remove(key)
+                    member_slots.setdefault(replacement_index, []).append(key)
+                    if loads[replacement_index] >= high:
+                        under &= ~(1 << replacement_index)
+                    moved_this_pass += 1
+            moved += moved_this_pass
+            if not moved_this_pass:
+                break
+        return moved
+
+    # ---- 增量修補 ----
+
+    def invalid_assignments(self, member_indices=None) -> List[Tuple[SlotKey, int]]:
+        """找出已不合法的排班：會員已失去該班別的資格，或當天不可排班。
+
+        Args:
+            member_indices (Iterable[int] | None): 只檢查這些會員；None 表示檢查全部。
+
+        Returns:
+            List[Tuple[SlotKey, int]]: 不合法的 (班次, 會員索引)。
+        """
+        problem = self.problem
+        only = None
+        if member_indices is not None:
+            only = 0
+            for member_index in member_indices:
+                only |= 1 << member_index
+        invalid = []
+        for key, bits in self._assigned_bits.items():
+            day_index, definition_index = key
+            bad = bits & ~(problem.eligible[definition_index] & problem.available_on(day_index))
+            if only is not None:
+                bad &= only
+            invalid.extend((key, member_index) for member_index in iter_bits(bad))
+        return invalid
+
+    def repair(self, member_indices=None, refill=()) -> ScheduleRepair:
+        """移除失效的排班，只為受影響的班次找替代者，其餘排班保持不變。
+
+        替代者優先選當天有空、排班次數最少的合格會員；沒有時才與同一天的重疊班次交換一人。
+
+        Args:
+            member_indices (Iterable[int] | None): 資料有變動的會員索引；None 表示檢查全部。
+            refill (Iterable[SlotKey]): 另外要補人的班次，例如載入時已移除不在問題中的會員的班次。
+
+        Returns:
+            ScheduleRepair: 修補結果。
+        """
+        started = perf_counter()
+        self._changes = []
+        try:
+            invalid = self.invalid_assignments(member_indices)
+            for key, member_index in invalid:
+                self._unassign(key, member_index)
+            for key in dict.fromkeys([key for key, _ in invalid] + list(refill)):
+                self._fill_slot(key)
+            changes = self._changes
+        finally:
+            self._changes = None
+        removed = [(key, member_index) for is_added, key, member_index in changes if not is_added]
+        added = [(key, member_index) for is_added, key, member_index in changes if is_added]
+        return ScheduleRepair(self.result((perf_counter() - started) * 1000), removed, added)
+
+    # ---- 對外介面 ----
+
+    def solve(self, local_search: bool = True, max_passes: int = 3) -> Schedule:
+        """求解整個排班問題。
+
+        Args:
+            local_search (bool): 是否在貪婪階段後執行補缺與平衡。
+            max_passes (int): 平衡階段最多的輪數。
+
+        Returns:
+            Schedule: 排班結果。
+        """
+        started = perf_counter()
+        self._greedy()
+        if local_search:
+            filled = self._fill_unfilled()
+            moved = self._balance(max_passes)
+            logger.debug(f"Local search filled {filled} and rebalanced {moved} assignments.")
+        return self.result((perf_counter() - started) * 1000)
+
+    def result(self, elapsed_ms: float = 0.0) -> Schedule:
+        """以目前的排班狀態建立 Schedule (複製一份，不受後續修改影響)。"""
+        assignments = {key: list(members) for key, members in self.assignments.items()}
+        return Schedule(self.problem, assignments, self.metrics(elapsed_ms))
+
+    def metrics(self, elapsed_ms: float = 0.0) -> ScheduleMetrics:
+        """計算目前排班狀態的品質指標。"""
+        definitions = self.problem.definitions
+        required = sum(definitions[d].required for _, d in self.assignments)
+        assigned = sum(len(members) for members in self.assignments.values())
+        eligible_indices = bit_indices(self._eligible_any, self.problem.member_count)
+        eligible_loads = np.asarray(self.loads, dtype=np.float64)[eligible_indices]
+        if len(eligible_loads) == 0:
+            eligible_loads = np.zeros(1)
+        return ScheduleMetrics(
+            slot_count=len(self.assignments),
+            required=required,
+            assigned=assigned,
+            unfilled=required - assigned,
+            load_mean=round(float(eligible_loads.mean()), 3),
+            load_std=round(float(eligible_loads.std()), 3),
+            load_max=int(eligible_loads.max()),
+            elapsed_ms=round(elapsed_ms, 3),
+        )
+
+
+def solve(problem: ScheduleProblem, local_search: bool = True) -> Schedule:
+    """以 ScheduleSolver 求解排班問題。
+
+    Args:
+        problem (ScheduleProblem): 排班問題。
+        local_search (bool): 是否執行補缺與平衡。
+
+    Returns:
+        Schedule: 排班結果。
+    """
+    schedule = ScheduleSolver(problem).solve(local_search=local_search)
+    metrics = schedule.metrics
+    logger.info(
+        f"Scheduled {metrics.assigned}/{metrics.required} assignments over {problem.day_count} days "
+        f"for {problem.member_count} members in {metrics.elapsed_ms:.0f} ms (load std {metrics.load_std})."
+    )
+    return schedule
@@ -0,0 +1,206 @@
+"""排班結果的儲存、載入與已儲存排班的修補。
+
+班別定義存於 duty_slots (以代碼為鍵)，排班紀錄存於 duty_assignments，以整數日鍵
+(自 1970-01-01 起算的天數) 記錄 (day, slot_id, member_id)。寫入一律分批 executemany；
+修補只寫入差異 (刪除失效的紀錄、新增替代者)，不會重寫整段期間。
+
+會員資料變動後，repair_stored_duties() 只載入這些會員「今天到最後一次排班」的期間，
+以目前的會員資料建立排班問題，移除失效的排班並為那些班次找替代者。寫入前以 ConflictIndex
+檢查替代者在同一時段是否已有其他排班或活動，重疊的排班會記錄在修補結果中。
+"""
+
+import logging
+from datetime import date
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.duty_slot_model import DutySlot
+from repositories.duty_assignment_repository import AssignmentRow, DutyAssignmentRepository, day_from_key, day_key
+from repositories.duty_slot_repository import DutySlotRepository
+from services.scheduling.conflicts import SOURCE_DUTY, Booking, ConflictIndex, check_added, minute_key
+from services.scheduling.problem import SlotDefinition, build_problem
+from services.scheduling.solver import Schedule, ScheduleRepair, ScheduleSolver, SlotKey
+
+logger = logging.getLogger(__name__)
+
+
+def _weekday_mask(weekdays: Iterable[int]) -> int:
+    mask = 0
+    for weekday in weekdays:
+        mask |= 1 << weekday
+    return mask
+
+
+def _definition_row(definition: SlotDefinition) -> dict:
+    return {
+        "key": definition.key,
+        "name": definition.name,
+        "required": definition.required,
+        "region_id": definition.region_id,
+        "weekdays": _weekday_mask(definition.weekdays),
+        "start_minute": definition.start_minute,
+        "end_minute": definition.end_minute,
+    }
+
+
+def save_definitions(session: Session, definitions: Sequence[SlotDefinition]) -> Dict[str, int]:
+    """寫入 (新增或覆寫) 班別定義，不提交。返回班別代碼 -> 班別 ID。"""
+    return DutySlotRepository(session).save_slots(
+        [_definition_row(definition) for definition in definitions],
+        {definition.key: definition.position_ids for definition in definitions},
+    )
+
+
+def load_definitions(session: Session) -> Tuple[List[SlotDefinition], List[int]]:
+    """讀取所有班別定義。
+
+    Returns:
+        Tuple[List[SlotDefinition], List[int]]: 班別定義與對應的班別 ID (依 ID 排序)。
+    """
+    repository = DutySlotRepository(session)
+    slots: List[DutySlot] = sorted(repository.get_all(), key=lambda slot: slot.id)
+    positions = repository.get_position_ids(slot.id for slot in slots)
+    definitions = [
+        SlotDefinition(
+            key=slot.key,
+            name=slot.name,
+            required=slot.required,
+            position_ids=frozenset(positions.get(slot.id, ())),
+            region_id=slot.region_id,
+            weekdays=frozenset(weekday for weekday in range(7) if slot.weekdays >> weekday & 1),
+            start_minute=slot.start_minute,
+            end_minute=slot.end_minute,
+        )
+        for slot in slots
+    ]
+    return definitions, [slot.id for slot in slots]
+
+
+def _rows(schedule: Schedule, slot_ids: Sequence[int], entries: Iterable[Tuple[SlotKey, int]]) -> List[AssignmentRow]:
+    problem = schedule.problem
+    first = day_key(problem.start)
+    return [
+        (first + day_index, slot_ids[definition_index], int(problem.member_ids[member_index]))
+        for (day_index, definition_index), member_index in entries
+    ]
+
+
+def _entries(schedule: Schedule) -> set[Tuple[SlotKey, int]]:
+    return {(key, member_index) for key, members in schedule.assignments.items() for member_index in members}
+
+
+def save_schedule(session: Session, schedule: Schedule) -> int:
+    """儲存排班結果，取代期間內相同班別的既有紀錄 (不提交)。
+
+    Args:
+        session (Session): 資料庫會話。
+        schedule (Schedule): 排班結果。
+
+    Returns:
+        int: 寫入的排班紀錄數。
+    """
+    problem = schedule.problem
+    ids = save_definitions(session, problem.definitions)
+    slot_ids = [ids[definition.key] for definition in problem.definitions]
+    repository = DutyAssignmentRepository(session)
+    deleted = repository.delete_range(day_key(problem.start), day_key(problem.end), slot_ids)
+    entries = ((key, member_index) for key in sorted(schedule.assignments)
+               for member_index in schedule.assignments[key])
+    count = repository.bulk_insert(_rows(schedule, slot_ids, entries))
+    logger.info(f"Saved {count} duty assignments ({deleted} replaced) from {problem.start} to {problem.end}.")
+    return count
+
+
+def _load(session: Session, start: date, end: date) -> Tuple[Schedule, List[int], List[AssignmentRow]]:
+    definitions, slot_ids = load_definitions(session)
+    problem = build_problem(session, start, end, definitions)
+    index_of_slot = {slot_id: i for i, slot_id in enumerate(slot_ids)}
+    assignments: Dict[SlotKey, List[int]] = {key: [] for key in problem.slots()}
+
+    rows = DutyAssignmentRepository(session).get_range(day_key(start), day_key(end))
+    member_indices = problem.index_of_members(member_id for _, _, member_id in rows)
+    index_of_member = {int(problem.member_ids[i]): i for i in member_indices}
+    first = day_key(start)
+    dropped = []
+    for row in rows:
+        day, slot_id, member_id = row
+        key = (day - first, index_of_slot[slot_id])
+        member_index = index_of_member.get(member_id)
+        # 已不可排班的會員不在問題中；班別已不在當天開設的紀錄也一併移除
+        if member_index is None or key not in assignments:
+            dropped.append(row)
+        else:
+            assignments[key].append(member_index)
+    schedule = ScheduleSolver.from_schedule(Schedule(problem, assignments)).result()
+    return schedule, slot_ids, dropped
+
+
+def load_schedule(session: Session, start: date, end: date) -> Schedule:
+    """以已儲存的班別與排班紀錄重建排班結果。
+
+    排班問題以目前的會員資料建立；已不可排班的會員的紀錄不會載入，對應的班次顯示為缺人。
+
+    Args:
+        session (Session): 資料庫會話。
+        start (date): 起始日 (含)。
+        end (date): 結束日 (含)。
+
+    Returns:
+        Schedule: 排班結果。
+    """
+    schedule, _, dropped = _load(session, start, end)
+    if dropped:
+        logger.info(f"Skipped {len(dropped)} stored assignments that are no longer valid.")
+    return schedule
+
+
+def repair_stored_duties(session: Session, member_ids: Iterable[int], today: date) -> ScheduleRepair | None:
+    """依會員的最新資料修補已儲存的未來排班，只寫入差異 (不提交)。
+
+    Args:
+        session (Session): 資料庫會話，需能讀到已提交的會員變更。
+        member_ids (Iterable[int]): 資料有變動的會員 ID。
+        today (date): 從這一天 (含) 起修補。
+
+    Returns:
+        ScheduleRepair | None: 修補結果；這些會員沒有未來的排班時返回 None。
+            conflicts 為新排入的班次與替代者其他排班或活動時段重疊的情況。
+    """
+    member_ids = list(member_ids)
+    repository = DutyAssignmentRepository(session)
+    last = repository.last_day(member_ids, day_key(today))
+    if last is None:
+        return None
+
+    schedule, slot_ids, dropped = _load(session, today, day_from_key(last))
+    problem = schedule.problem
+    first = day_key(today)
+    index_of_slot = {slot_id: i for i, slot_id in enumerate(slot_ids)}
+    refill = [key for key in ((day - first, index_of_slot[slot_id]) for day, slot_id, _ in dropped)
+              if key in schedule.assignments]
+    result = ScheduleSolver.from_schedule(schedule).repair(problem.index_of_members(member_ids), refill=refill)
+
+    # 只寫入淨差異：交換過程中先排入又移出的會員不會留下紀錄
+    before = _entries(schedule)
+    after = _entries(result.schedule)
+    removed = dropped + _rows(schedule, slot_ids, before - after)
+    repository.delete_rows(removed)
+    added_rows = _rows(schedule, slot_ids, after - before)
+    # 索引在刪除失效紀錄之後建立，只載入替代者的時段
+    index = ConflictIndex.from_calendar(session, today, day_from_key(last),
+                                        {member_id for _, _, member_id in added_rows})
+    definition_of_slot = dict(zip(slot_ids, problem.definitions))
+    result.conflicts = check_added(index, (
+        Booking(minute_key(day, definition_of_slot[slot_id].start_minute),
+                minute_key(day, definition_of_slot[slot_id].end_minute), member_id, SOURCE_DUTY, (day, slot_id))
+        for day, slot_id, member_id in added_rows
+    ))
+    added = repository.bulk_insert(added_rows)
+    logger.info(
+        f"Repaired stored duties for {len(member_ids)} members: removed {len(removed)}, "
+        f"added {added} assignments."
+    )
+    if result.conflicts:
+        logger.warning(f"{len(result.conflicts)} repaired duties overlap other bookings of the same member.")
+    return result
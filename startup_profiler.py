@@ -0,0 +1,193 @@
+"""啟動效能量測模組。
+
+提供 StartupProfiler，用於量測應用程式啟動時每個模組的匯入時間，
+以及從啟動到主視窗第一次繪製 (first paint) 的各階段時間點。
+
+啟用方式：設定環境變數 ``SGIPLAN_PROFILE_STARTUP=1``。若其值以 ``.json``
+結尾，報告除了寫入 log 之外，也會另存為該路徑的 JSON 檔案。
+"""
+
+import importlib.abc
+import json
+import logging
+import os
+import sys
+from time import perf_counter
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV_VAR = "SGIPLAN_PROFILE_STARTUP"
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """包裝原本的 loader，量測模組建立與執行所花費的時間。"""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        # 其餘屬性 (get_data、is_package 等) 一律交給原本的 loader
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._profiler._timed(spec.name, self._loader.create_module, spec)
+
+    def exec_module(self, module):
+        self._profiler._timed(module.__name__, self._loader.exec_module, module)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """放在 sys.meta_path 最前端，替找到的模組換上 _TimingLoader。"""
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimingLoader(spec.loader, self._profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    """記錄啟動期間的模組匯入時間與階段時間點。
+
+    未啟用時所有方法皆為空操作，因此 main.py 可以無條件呼叫。
+
+    Attributes:
+        enabled (bool): 是否啟用量測。
+        output_path (str | None): JSON 報告的輸出路徑。
+    """
+
+    def __init__(self, enabled: bool = False, output_path: str | None = None):
+        """初始化啟動量測器。
+
+        Args:
+            enabled (bool): 是否啟用量測。
+            output_path (str | None): 若提供，報告會另存為此 JSON 檔案。
+        """
+        self.enabled = enabled
+        self.output_path = output_path
+        self._start = perf_counter()
+        self._marks: list[tuple[str, float]] = []
+        # 模組名稱 -> [累計時間, 自身時間]
+        self._imports: dict[str, list[float]] = {}
+        self._child_time_stack: list[float] = []
+        self._finder = None
+        self._reported = False
+
+    @classmethod
+    def from_environment(cls) -> "StartupProfiler":
+        """依據環境變數 SGIPLAN_PROFILE_STARTUP 建立量測器。"""
+        value = os.environ.get(PROFILE_ENV_VAR, "").strip()
+        if not value or value == "0":
+            return cls(enabled=False)
+        output_path = value if value.lower().endswith(".json") else None
+        return cls(enabled=True, output_path=output_path)
+
+    def install(self):
+        """開始攔截模組匯入。應在匯入任何重量級模組之前呼叫。"""
+        if not self.enabled or self._finder is not None:
+            return
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        """停止攔截模組匯入。"""
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def mark(self, label: str):
+        """記錄一個啟動階段的時間點。
+
+        Args:
+            label (str): 階段名稱，例如 "window_shown"。
+        """
+        if self.enabled:
+            self._marks.append((label, perf_counter() - self._start))
+
+    def watch_first_paint(self, widget):
+        """在 widget 第一次繪製時記錄 first_paint 時間點。
+
+        Args:
+            widget (QWidget): 要監看的視窗。
+        """
+        if not self.enabled:
+            return
+        from PySide6.QtCore import QEvent, QObject
+
+        profiler = self
+
+        class _FirstPaintFilter(QObject):
+            def eventFilter(self, watched, event):
+                if event.type() == QEvent.Type.Paint:
+                    watched.removeEventFilter(self)
+                    profiler.mark("first_paint")
+                return False
+
+        self._paint_filter = _FirstPaintFilter(widget)
+        widget.installEventFilter(self._paint_filter)
+
+    def _timed(self, name, func, arg):
+        self._child_time_stack.append(0.0)
+        started = perf_counter()
+        try:
+            return func(arg)
+        finally:
+            elapsed = perf_counter() - started
+            child_time = self._child_time_stack.pop()
+            if self._child_time_stack:
+                self._child_time_stack[-1] += elapsed
+            entry = self._imports.setdefault(name, [0.0, 0.0])
+            entry[0] += elapsed
+            entry[1] += elapsed - child_time
+
+    def as_dict(self, top: int = 25) -> dict:
+        """將量測結果整理為字典。
+
+        Args:
+            top (int): 依自身時間排序後保留的模組數量。
+
+        Returns:
+            dict: 包含 marks (各階段時間點，毫秒) 與 imports (模組匯入時間，毫秒)。
+        """
+        slowest = sorted(self._imports.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        return {
+            "marks": {label: round(at * 1000, 2) for label, at in self._marks},
+            "imports": [
+                {"module": name, "self_ms": round(self_t * 1000, 2), "cumulative_ms": round(cum * 1000, 2)}
+                for name, (cum, self_t) in slowest
+            ],
+            "total_import_ms": round(sum(self_t for _, self_t in self._imports.values()) * 1000, 2),
+            "modules_imported": len(self._imports),
+        }
+
+    def report(self):
+        """將量測結果寫入 log (及 JSON 檔案)。只會輸出一次。"""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        self.uninstall()
+        data = self.as_dict()
+
+        lines = ["Startup timing report:"]
+        for label, at_ms in data["marks"].items():
+            lines.append(f"  {label:<24} {at_ms:>10.1f} ms")
+        lines.append(f"  {data['modules_imported']} modules imported in {data['total_import_ms']:.1f} ms, slowest (self / cumulative):")
+        for entry in data["imports"]:
+            lines.append(f"    {entry['module']:<48} {entry['self_ms']:>8.1f} / {entry['cumulative_ms']:>8.1f} ms")
+        logger.info("\n".join(lines))
+
+        if self.output_path:
+            try:
+                with open(self.output_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                logger.warning(f"Could not write startup report to {self.output_path}: {e}")
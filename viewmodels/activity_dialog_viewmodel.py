@@ -0,0 +1,125 @@
+import calendar
+import logging
+from dataclasses import replace
+from datetime import date
+from PySide6.QtCore import QObject, Signal
+from models.activity_model import Activity
+from repositories.activity_repository import ActivityRepository
+from repositories.region_repository import RegionRepository
+from services.recurrence import WEEKDAY_CODES, RecurrenceRule, describe, normalize, recurrence_end
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityDialogViewModel(QObject):
+    saved_successfully = Signal()
+    save_failed = Signal(str)
+    regions_loaded = Signal(list)
+
+    def __init__(self, db_session, activity_data: Activity = None, parent=None):
+        super().__init__(parent)
+        self.session = db_session
+        self.activity_repo = ActivityRepository(db_session)
+        self.region_repo = RegionRepository(db_session)
+        self._activity_data = activity_data
+
+        if self.is_editing():
+            self.name = activity_data.name
+            self.description = activity_data.description or ""
+            self.activity_date = activity_data.activity_date
+            self.start_minute = activity_data.start_minute
+            self.end_minute = activity_data.end_minute
+            self.region_id = activity_data.region_id
+            # 結束日期另外以日期欄位編輯，規則本身不含 UNTIL
+            self.recurrence = None
+            self.recurrence_until = None
+            if activity_data.recurrence:
+                rule = RecurrenceRule.parse(activity_data.recurrence)
+                self.recurrence = replace(rule, until=None).to_text()
+                self.recurrence_until = rule.until
+        else:
+            self.name = ""
+            self.description = ""
+            self.activity_date = date.today()
+            self.start_minute = 14 * 60
+            self.end_minute = 16 * 60
+            self.region_id = None
+            self.recurrence = None
+            self.recurrence_until = None
+
+    def is_editing(self) -> bool:
+        """檢查是否為編輯模式。"""
+        return self._activity_data is not None
+
+    def recurrence_presets(self, activity_date: date):
+        """依活動日期返回可選的週期規則，例如每週同一天、每月同一週次。
+
+        Returns:
+            List[Tuple[str, str | None]]: (顯示文字, 規則文字)；第一項為不重複。
+        """
+        weekday = WEEKDAY_CODES[activity_date.weekday()]
+        ordinal = (activity_date.day - 1) // 7 + 1
+        rules = [
+            None,
+            f"FREQ=WEEKLY;BYDAY={weekday}",
+            f"FREQ=WEEKLY;INTERVAL=2;BYDAY={weekday}",
+            f"FREQ=MONTHLY;BYDAY={-1 if ordinal == 5 else ordinal}{weekday}",
+            f"FREQ=MONTHLY;BYMONTHDAY={activity_date.day}",
+        ]
+        if ordinal == 4 and activity_date.day + 7 > calendar.monthrange(activity_date.year, activity_date.month)[1]:
+            rules.append(f"FREQ=MONTHLY;BYDAY=-1{weekday}")
+        # 編輯時保留原有但不在預設選項中的規則
+        if self.recurrence and self.recurrence not in rules:
+            rules.append(self.recurrence)
+        return [(describe(rule), rule) for rule in rules]
+
+    def load_regions(self):
+        """載入地區 (依樹狀順序) 供選擇主辦地區。"""
+        try:
+            self.regions_loaded.emit(self.region_repo.get_all_in_tree_order())
+        except Exception as e:
+            logger.error(f"Error loading regions: {e}")
+            self.regions_loaded.emit([])
+
+    def save(self):
+        """儲存活動資料 (新增或更新)。"""
+        if not self.name or not self.name.strip():
+            self.save_failed.emit("活動名稱不能為空。")
+            return
+        if self.end_minute <= self.start_minute:
+            self.save_failed.emit("結束時間必須晚於開始時間。")
+            return
+        try:
+            rule_text = self.recurrence
+            if rule_text and self.recurrence_until:
+                rule_text += f";UNTIL={self.recurrence_until:%Y%m%d}"
+            recurrence = normalize(rule_text, self.activity_date)
+        except ValueError as e:
+            self.save_failed.emit(f"重複規則錯誤：{e}")
+            return
+        if recurrence and self.recurrence_until and self.recurrence_until < self.activity_date:
+            self.save_failed.emit("重複結束日期不能早於活動日期。")
+            return
+
+        try:
+            if self.is_editing():
+                activity = self._activity_data
+                logger.info(f"Updating activity ID: {activity.id}")
+            else:
+                activity = Activity()
+                self.activity_repo.add(activity)
+                logger.info(f"Creating new activity with name: {self.name}")
+            activity.name = self.name.strip()
+            activity.description = self.description.strip() or None
+            activity.activity_date = self.activity_date
+            activity.start_minute = self.start_minute
+            activity.end_minute = self.end_minute
+            activity.region_id = self.region_id
+            activity.recurrence = recurrence
+            activity.recurrence_end = recurrence_end(recurrence, self.activity_date)
+            self.session.commit()
+            self.saved_successfully.emit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error saving activity: {e}", exc_info=True)
+            self.save_failed.emit(f"儲存活動時發生錯誤：{e}")
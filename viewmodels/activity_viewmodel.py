@@ -0,0 +1,281 @@
+import logging
+from datetime import date, timedelta
+from PySide6.QtCore import QObject, Signal, QAbstractTableModel, QModelIndex, Qt
+from repositories.activity_participant_repository import ActivityParticipantRepository
+from repositories.activity_repository import ActivityRepository
+from repositories.duty_assignment_repository import day_key
+from repositories.member_filter import member_criteria
+from repositories.position_repository import PositionRepository
+from repositories.qualification_repository import QualificationRepository
+from repositories.region_repository import RegionRepository
+from services.attendance import AttendanceStats, record_attendance
+from services.eligibility import EligibilityService
+from services.recurrence import activity_occurrences
+from services.scheduling.conflicts import (SOURCE_ACTIVITY, ConflictIndex, activity_booking, check_added,
+                                           find_duty_conflicts, load_activity_bookings)
+
+logger = logging.getLogger(__name__)
+
+# 重複活動記錄出席時，往前找最近一次舉行的天數
+ATTENDANCE_LOOKBACK_DAYS = 62
+# 重複活動只檢查今天 (或第一次舉行) 起這幾天內的舉行
+RECURRING_CONFLICT_DAYS = 28
+
+
+class ParticipantTableModel(QAbstractTableModel):
+    """活動參與者表格。
+
+    資料列是 repository 返回的 tuple；QTableView 只會向 model 要求畫面上看得到的儲存格，
+    數千位參與者也不需要預先建立任何 QTableWidgetItem。
+    """
+    HEADERS = ["姓名", "電話", "地區"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            # 第 0 欄是會員 ID，不顯示
+            return self.rows[index.row()][index.column() + 1] or ""
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def member_id(self, row):
+        return self.rows[row][0]
+
+
+class ActivityViewModel(QObject):
+    items_loaded = Signal(list)
+    regions_loaded = Signal(list)
+    positions_loaded = Signal(list)
+    qualifications_loaded = Signal(list)
+    participants_changed = Signal(int)
+    matching_counted = Signal(int)
+    conflicts_found = Signal(list)
+    attendance_recorded = Signal(str, int, int)
+    error_occurred = Signal(str)
+
+    def __init__(self, db_session, parent=None):
+        super().__init__(parent)
+        self.session = db_session
+        self.activity_repo = ActivityRepository(db_session)
+        self.participant_repo = ActivityParticipantRepository(db_session)
+        self.region_repo = RegionRepository(db_session)
+        self.position_repo = PositionRepository(db_session)
+        self.qualification_repo = QualificationRepository(db_session)
+        self.participants = ParticipantTableModel()
+        self.participant_counts = {}
+        self.current_search_term = ""
+        self.current_activity = None
+
+    def load_activities(self, search_term=None):
+        """載入活動列表與各活動的參與者數。"""
+        if search_term is not None:
+            self.current_search_term = search_term
+        try:
+            activities = self.activity_repo.search(self.current_search_term)
+            self.participant_counts = self.activity_repo.participant_counts()
+            self.items_loaded.emit(activities)
+        except Exception as e:
+            logger.error(f"Error loading activities: {e}", exc_info=True)
+            self.error_occurred.emit(f"載入活動時發生錯誤: {e}")
+
+    def load_filters(self):
+        """載入批次指派用的地區、職務與資格選項。"""
+        try:
+            self.regions_loaded.emit(self.region_repo.get_all_in_tree_order())
+            self.positions_loaded.emit(self.position_repo.get_all_sorted())
+            self.qualifications_loaded.emit(self.qualification_repo.get_all_sorted())
+        except Exception as e:
+            logger.error(f"Error loading filters: {e}", exc_info=True)
+            self.error_occurred.emit(f"載入地區、職務與資格時發生錯誤: {e}")
+
+    def select_activity(self, activity):
+        """切換目前的活動並載入其參與者。"""
+        self.current_activity = activity
+        self._reload_participants()
+
+    def _reload_participants(self):
+        rows = self.participant_repo.get_rows(self.current_activity.id) if self.current_activity else []
+        self.participants.set_rows(rows)
+        if self.current_activity is not None:
+            self.participant_counts[self.current_activity.id] = len(rows)
+        self.participants_changed.emit(len(rows))
+
+    def count_matching(self, region_id=None, position_id=None, qualification_mask=0):
+        """計算符合批次指派條件的可排班會員數 (在快取的欄位陣列上求值，變更條件時即時更新)。"""
+        criteria = member_criteria(region_id, None if position_id is None else [position_id], qualification_mask)
+        try:
+            self.matching_counted.emit(len(EligibilityService.for_session(self.session).evaluate(criteria)))
+        except Exception as e:
+            logger.error(f"Error counting matching members: {e}", exc_info=True)
+            self.matching_counted.emit(-1)
+
+    def assign_matching(self, region_id=None, position_id=None, qualification_mask=0):
+        """將符合條件的可排班會員批次加入目前的活動。"""
+        if self.current_activity is None:
+            self.error_occurred.emit("請先選擇活動。")
+            return
+        existing = {row[0] for row in self.participants.rows}
+        try:
+            added = self.participant_repo.assign_matching(self.current_activity.id, region_id, position_id,
+                                                          qualification_mask=qualification_mask)
+            self.session.commit()
+            logger.info(f"Assigned {added} participants to activity ID: {self.current_activity.id}")
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error assigning participants: {e}", exc_info=True)
+            self.error_occurred.emit(f"指派參與者時發生錯誤: {e}")
+            return
+        self._reload_participants()
+        self._check_added_participants([row[0] for row in self.participants.rows if row[0] not in existing])
+
+    def add_participants(self, member_ids):
+        """將指定的會員加入目前的活動，並檢查新加入者的時段衝突。"""
+        if self.current_activity is None:
+            self.error_occurred.emit("請先選擇活動。")
+            return
+        existing = {row[0] for row in self.participants.rows}
+        try:
+            added = self.participant_repo.add_members(self.current_activity.id, member_ids)
+            self.session.commit()
+            logger.info(f"Added {added} participants to activity ID: {self.current_activity.id}")
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error adding participants: {e}", exc_info=True)
+            self.error_occurred.emit(f"加入參與者時發生錯誤: {e}")
+            return
+        self._reload_participants()
+        self._check_added_participants([member_id for member_id in dict.fromkeys(member_ids)
+                                        if member_id not in existing])
+
+    def remove_participants(self, rows):
+        """移除目前活動中指定表格列的參與者。"""
+        if self.current_activity is None or not rows:
+            return
+        try:
+            member_ids = [self.participants.member_id(row) for row in rows]
+            self.participant_repo.remove_members(self.current_activity.id, member_ids)
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error removing participants: {e}", exc_info=True)
+            self.error_occurred.emit(f"移除參與者時發生錯誤: {e}")
+            return
+        self._reload_participants()
+
+    def _attendance_day(self, activity):
+        """返回今天 (含) 以前最近一次舉行的日期；尚未舉行時返回 None。"""
+        today = date.today()
+        days = activity_occurrences(activity, today - timedelta(days=ATTENDANCE_LOOKBACK_DAYS), today)
+        return days[-1] if days else None
+
+    def record_attendance(self, rows):
+        """將指定表格列的參與者記為目前活動最近一次舉行的出席者 (覆寫該次的紀錄)。"""
+        activity = self.current_activity
+        if activity is None:
+            self.error_occurred.emit("請先選擇活動。")
+            return
+        day = self._attendance_day(activity)
+        if day is None:
+            self.error_occurred.emit("此活動最近沒有已舉行的場次，無法記錄出席。")
+            return
+        try:
+            rate = record_attendance(self.session, activity.id, day,
+                                     [self.participants.member_id(row) for row in rows])
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error recording attendance: {e}", exc_info=True)
+            self.error_occurred.emit(f"記錄出席時發生錯誤: {e}")
+            return
+        AttendanceStats.for_session(self.session).attendance_recorded()
+        self.attendance_recorded.emit(day.isoformat(), rate.attended, rate.expected)
+
+    def _conflict_window(self, activity):
+        if not activity.recurrence:
+            return activity.activity_date, activity.activity_date
+        start = max(activity.activity_date, date.today())
+        end = start + timedelta(days=RECURRING_CONFLICT_DAYS - 1)
+        if activity.recurrence_end is not None:
+            end = min(end, activity.recurrence_end)
+        return start, end
+
+    def check_conflicts(self):
+        """檢查目前活動的舉行時段，參與者是否有時段重疊的排班或其他活動。
+
+        不重複的活動檢查當天；重複的活動只展開近期 RECURRING_CONFLICT_DAYS 天內的舉行，
+        同一期間其他 (重複) 活動也只展開這段期間。
+        """
+        activity = self.current_activity
+        if activity is None:
+            return
+        window_start, window_end = self._conflict_window(activity)
+        try:
+            if not activity_occurrences(activity, window_start, window_end):
+                return
+            bookings = load_activity_bookings(self.session, window_start, window_end)
+            conflicts = find_duty_conflicts(self.session, window_start, window_end, bookings)
+        except Exception as e:
+            logger.error(f"Error checking conflicts: {e}", exc_info=True)
+            return
+        # 只回報與目前活動有關的衝突
+        conflicts = [c for c in conflicts
+                     if any(b.source == SOURCE_ACTIVITY and b.ref[0] == activity.id for b in (c.first, c.second))]
+        if conflicts:
+            self.conflicts_found.emit(conflicts)
+
+    def _check_added_participants(self, member_ids):
+        """只檢查新加入的參與者：以他們在期間內的其他排班與活動建立 ConflictIndex，再逐筆加入本活動的時段。"""
+        activity = self.current_activity
+        if activity is None or not member_ids:
+            return
+        window_start, window_end = self._conflict_window(activity)
+        try:
+            days = [day_key(day) for day in activity_occurrences(activity, window_start, window_end)]
+            if not days:
+                return
+            index = ConflictIndex.from_calendar(self.session, window_start, window_end, member_ids,
+                                                exclude_activity_ids=[activity.id])
+            conflicts = check_added(index, (
+                activity_booking(activity.id, day, activity.start_minute, activity.end_minute, member_id)
+                for member_id in member_ids for day in days
+            ))
+        except Exception as e:
+            logger.error(f"Error checking conflicts of new participants: {e}", exc_info=True)
+            return
+        if conflicts:
+            self.conflicts_found.emit(conflicts)
+
+    def delete_activity(self, activity_id):
+        """刪除活動與其所有參與者。"""
+        try:
+            activity = self.activity_repo.get_by_id(activity_id)
+            if activity:
+                self.activity_repo.delete(activity)
+                self.session.commit()
+                # 活動的出席紀錄一併刪除，彙總快取不能再計入
+                AttendanceStats.for_session(self.session).invalidate()
+                if self.current_activity is not None and self.current_activity.id == activity_id:
+                    self.select_activity(None)
+                self.load_activities()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error deleting activity: {e}", exc_info=True)
+            self.error_occurred.emit(f"刪除活動時發生錯誤: {e}")
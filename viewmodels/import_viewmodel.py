@@ -29,7 +29,12 @@ class ImportWorker(QObject):
             else:
                 failure_count += 1
         
-        summary = {'success': success_count, 'failure': failure_count}
+        report = self.importer.last_integrity_report
+        summary = {
+            'success': success_count,
+            'failure': failure_count,
+            'integrity_issues': len(report.issues) if report else 0,
+        }
         self.finished.emit(summary)
 
     def stop(self):
@@ -95,5 +100,7 @@ class ImportViewModel(QObject):
         self.worker_thread.wait()
         
         summary_text = f"匯入完成！成功: {summary['success']} 筆, 失敗: {summary['failure']} 筆。"
+        if summary['integrity_issues']:
+            summary_text += f"\n發現 {summary['integrity_issues']} 筆資料完整性問題，詳情請見記錄檔。"
         self.import_finished.emit(summary_text)
 
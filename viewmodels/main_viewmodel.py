@@ -20,7 +20,7 @@ class MainViewModel(QObject):
         self.item_repo = ItemRepository(db_session)
         self._items = []
         self._item_list_model = ItemListModel(self._items)
-        self.load_items()
+        # 資料在項目列表分頁第一次開啟時才載入 (見 MainWindow._build_item_list_tab)
 
     @Signal
     def items_changed(self):
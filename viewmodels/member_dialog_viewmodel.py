@@ -1,4 +1,5 @@
 import logging
+from datetime import date
 from PySide6.QtCore import QObject, Signal
 from sqlalchemy.exc import IntegrityError
 from models.member_model import Member
@@ -10,6 +11,11 @@ from repositories.region_repository import RegionRepository
 from repositories.department_repository import DepartmentRepository
 from repositories.position_repository import PositionRepository
 from repositories.member_position_repository import MemberPositionRepository
+from repositories.qualification_repository import QualificationRepository
+from services.attendance import AttendanceStats
+from services.eligibility import EligibilityService
+from services.region_rollup_service import RegionRollupService
+from services.scheduling.storage import repair_stored_duties
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +30,7 @@ class MemberDialogViewModel(QObject):
     saved_successfully = Signal()
     save_failed = Signal(str)
     positions_loaded = Signal(list)
+    qualifications_loaded = Signal(list)
     assigned_positions_changed = Signal(list)
 
     def __init__(self, db_session, member_data=None, parent=None):
@@ -37,6 +44,7 @@ class MemberDialogViewModel(QObject):
         self.department_repo = DepartmentRepository(db_session)
         self.position_repo = PositionRepository(db_session)
         self.member_position_repo = MemberPositionRepository(db_session)
+        self.qualification_repo = QualificationRepository(db_session)
 
         self._all_positions = []
         self._assigned_positions = []
@@ -48,6 +56,7 @@ class MemberDialogViewModel(QObject):
             self._is_schedulable = bool(self._member_data.is_schedulable)
             self._region_id = self._member_data.region_id
             self._department_id = self._member_data.department_id
+            self._qualification_mask = self._member_data.qualification_mask or 0
             self._assigned_positions = list(self._member_data.positions)
         else:  # Add mode
             logger.debug("Initializing MemberDialogViewModel in add mode.")
@@ -56,6 +65,7 @@ class MemberDialogViewModel(QObject):
             self._is_schedulable = True
             self._region_id = None
             self._department_id = None
+            self._qualification_mask = 0
 
     @property
     def name(self):
@@ -97,6 +107,14 @@ class MemberDialogViewModel(QObject):
     def department_id(self, value):
         self._department_id = value
 
+    @property
+    def qualification_mask(self):
+        return self._qualification_mask
+
+    @qualification_mask.setter
+    def qualification_mask(self, value):
+        self._qualification_mask = value
+
     @property
     def all_positions(self) -> list[Position]:
         return self._all_positions
@@ -135,6 +153,18 @@ class MemberDialogViewModel(QObject):
             logger.error(f"Error loading positions: {e}")
             self.positions_loaded.emit([])
 
+    def load_qualifications(self):
+        logger.debug("Loading qualifications.")
+        try:
+            qualification_data = [
+                (qualification.mask, qualification.name, bool(self._qualification_mask & qualification.mask))
+                for qualification in self.qualification_repo.get_all_sorted()
+            ]
+            self.qualifications_loaded.emit(qualification_data)
+        except Exception as e:
+            logger.error(f"Error loading qualifications: {e}")
+            self.qualifications_loaded.emit([])
+
     def add_position(self, position_id: int, is_primary: bool = False):
         if any(mp.position_id == position_id for mp in self._assigned_positions):
             logger.warning(f"Attempted to add already assigned position ID: {position_id}")
@@ -186,11 +216,13 @@ class MemberDialogViewModel(QObject):
             if self.is_editing():
                 logger.info(f"Updating member ID: {self._member_data.id}")
                 member = self._member_data
+                old_region_id, old_schedulable = member.region_id, member.is_schedulable
                 member.name = self._name
                 member.phone_number = self._phone_number
                 member.is_schedulable = self._is_schedulable
                 member.region_id = self._region_id
                 member.department_id = self._department_id
+                member.qualification_mask = self._qualification_mask
             else:
                 logger.info(f"Creating new member with name: {self._name}")
                 member = Member(
@@ -198,7 +230,8 @@ class MemberDialogViewModel(QObject):
                     phone_number=self._phone_number,
                     is_schedulable=self._is_schedulable,
                     region_id=self._region_id,
-                    department_id=self._department_id
+                    department_id=self._department_id,
+                    qualification_mask=self._qualification_mask
                 )
                 self.member_repo.add(member)
             
@@ -230,6 +263,15 @@ class MemberDialogViewModel(QObject):
                     self.member_position_repo.add(new_mp)
 
             self.session.commit()
+            rollup_service = RegionRollupService.for_session(self.session)
+            if self.is_editing():
+                rollup_service.member_changed(old_region_id, old_schedulable, self._region_id, self._is_schedulable)
+            else:
+                rollup_service.member_added(self._region_id, self._is_schedulable)
+            EligibilityService.for_session(self.session).members_changed()
+            AttendanceStats.for_session(self.session).members_changed()
+            if self.is_editing():
+                self._repair_duties(member.id)
             logger.info(f"Successfully saved member ID: {member.id}")
             self.saved_successfully.emit()
             
@@ -245,5 +287,14 @@ class MemberDialogViewModel(QObject):
             logger.error(f"Unexpected error saving member data: {e}", exc_info=True)
             self.save_failed.emit(f"發生未預期的錯誤：{e}")
 
+    def _repair_duties(self, member_id):
+        # 會員資料已提交；修補失敗只記錄，不影響這次儲存
+        try:
+            if repair_stored_duties(self.session, [member_id], date.today()) is not None:
+                self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Failed to repair stored duties for member ID {member_id}: {e}", exc_info=True)
+
     def is_editing(self) -> bool:
         return self._member_data is not None
@@ -1,6 +1,9 @@
 from PySide6.QtCore import QObject, Signal, Qt
 from repositories.member_repository import MemberRepository
 from repositories.region_repository import RegionRepository
+from services.attendance import AttendanceStats
+from services.eligibility import EligibilityService
+from services.region_rollup_service import RegionRollupService
 
 class MemberListViewModel(QObject):
     items_loaded = Signal(list)
@@ -41,15 +44,21 @@ class MemberListViewModel(QObject):
 
     def load_regions(self):
         try:
-            regions = self.region_repo.get_all()
+            regions = self.region_repo.get_all_in_tree_order()
             self.regions_loaded.emit(regions)
         except Exception as e:
             print(f"Error loading regions: {e}")
 
     def delete_member(self, member_id):
         try:
-            if self.member_repo.delete_by_id(member_id):
+            member = self.member_repo.get_by_id(member_id)
+            if member:
+                region_id, is_schedulable = member.region_id, member.is_schedulable
+                self.member_repo.delete(member)
                 self.session.commit()
+                RegionRollupService.for_session(self.session).member_removed(region_id, is_schedulable)
+                EligibilityService.for_session(self.session).members_changed()
+                AttendanceStats.for_session(self.session).members_changed()
                 self.load_members(
                     search_term=self.current_search_term, 
                     region_id=self.current_region_id, 
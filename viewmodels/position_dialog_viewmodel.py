@@ -3,6 +3,7 @@ from PySide6.QtCore import QObject, Signal
 from models.position_model import Position
 from repositories.position_repository import PositionRepository
 from sqlalchemy.exc import IntegrityError
+from services.hierarchy_guard import HierarchyError, HierarchyGuard
 
 logger = logging.getLogger(__name__)
 
@@ -54,18 +55,29 @@ class PositionDialogViewModel(QObject):
                 self.error_occurred.emit("職務名稱不能為空。")
                 return
 
+            guard = HierarchyGuard.for_session(self.session, Position)
+            guard.check_parent(self._id, self._parent_id)
+
             if self.is_editing():
+                position = self._position_data
                 self._position_data.name = self._name
-                self._position_data.parent_id = self._parent_id
+                if self._position_data.parent_id != self._parent_id:
+                    self._position_data.parent_id = self._parent_id
+                    self.position_repo.rebuild_sort_keys()
                 logger.info(f"Updating position ID: {self._id} with name: {self._name}")
             else:
-                new_position = Position(name=self._name, parent_id=self._parent_id)
-                self.position_repo.add(new_position)
+                position = Position(name=self._name, parent_id=self._parent_id)
+                self.position_repo.add(position)
                 logger.info(f"Adding new position with name: {self._name}")
 
             self.session.commit()
+            guard.parent_changed(position.id, self._parent_id)
             logger.info("Position saved successfully.")
             self.position_saved.emit()
+        except HierarchyError as e:
+            self.session.rollback()
+            logger.warning(f"Invalid position hierarchy on save: {e}")
+            self.error_occurred.emit(str(e))
         except IntegrityError as e:
             self.session.rollback()
             logger.error(f"Integrity error saving position: {e}")
@@ -1,6 +1,10 @@
 import logging
 from PySide6.QtCore import QObject, Signal, Qt
+from models.position_model import Position
 from repositories.position_repository import PositionRepository
+from services.attendance import AttendanceStats
+from services.eligibility import EligibilityService
+from services.hierarchy_guard import HierarchyError, HierarchyGuard
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +40,9 @@ class PositionListViewModel(QObject):
 
                 self.position_repo.delete(position)
                 self.session.commit()
+                HierarchyGuard.for_session(self.session, Position).invalidate()
+                EligibilityService.for_session(self.session).members_changed()
+                AttendanceStats.for_session(self.session).members_changed()
                 self.load_positions()  # 使用當前的過濾和排序設定重新載入
             else:
                 self.error_occurred.emit("找不到要刪除的職務。")
@@ -46,12 +53,24 @@ class PositionListViewModel(QObject):
     def update_positions_hierarchy(self, hierarchy_data: list):
         """更新職務的層級和排序。"""
         try:
+            guard = HierarchyGuard.for_session(self.session, Position)
+            guard.check_parents({item['id']: item['parent_id'] for item in hierarchy_data})
+
             for item_data in hierarchy_data:
                 position = self.position_repo.get_by_id(item_data['id'])
                 if position:
                     position.parent_id = item_data['parent_id']
                     position.rank = item_data['rank']
+            self.position_repo.rebuild_sort_keys()
             self.session.commit()
+            for item_data in hierarchy_data:
+                guard.parent_changed(item_data['id'], item_data['parent_id'])
+            self.load_positions()
+        except HierarchyError as e:
+            self.session.rollback()
+            logger.warning(f"Rejected position hierarchy update: {e}")
+            self.error_occurred.emit(str(e))
+            # 還原拖放前的樹狀顯示
             self.load_positions()
         except Exception as e:
             self.session.rollback()
@@ -3,6 +3,8 @@ from PySide6.QtCore import QObject, Signal
 from sqlalchemy.exc import IntegrityError
 from models.region_model import Region
 from repositories.region_repository import RegionRepository
+from services.hierarchy_events import notify_region_hierarchy_changed
+from services.hierarchy_guard import HierarchyError, HierarchyGuard
 
 logger = logging.getLogger(__name__)
 
@@ -55,19 +57,28 @@ class RegionDialogViewModel(QObject):
                 self.save_failed.emit("地區名稱不能為空。")
                 return
 
+            guard = HierarchyGuard.for_session(self.session, Region)
+            guard.check_parent(self._id, self._parent_id)
+
             if self.is_editing():
                 self._region_data.name = self._name
-                self._region_data.parent_id = self._parent_id
+                if self._region_data.parent_id != self._parent_id:
+                    self.region_repo.move_subtree(self._region_data, self._parent_id)
                 logger.info(f"Updating region ID: {self._id} with name: {self._name}")
             else:
-                new_region = Region(name=self._name, parent_id=self._parent_id)
-                self.region_repo.add(new_region)
+                region = Region(name=self._name, parent_id=self._parent_id)
+                self.region_repo.add(region)
                 logger.info(f"Adding new region with name: {self._name}")
 
             self.session.commit()
+            notify_region_hierarchy_changed(self.session)
             logger.info("Region saved successfully.")
             self.saved_successfully.emit()
 
+        except HierarchyError as e:
+            self.session.rollback()
+            logger.warning(f"Invalid region hierarchy on save: {e}")
+            self.save_failed.emit(str(e))
         except IntegrityError as e:
             self.session.rollback()
             logger.warning(f"Integrity error on save: {e}")
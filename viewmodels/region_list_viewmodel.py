@@ -1,9 +1,13 @@
 from PySide6.QtCore import QObject, Signal, Qt
 from repositories.region_repository import RegionRepository
+from services.hierarchy_events import notify_region_hierarchy_changed
+from services.region_rollup_service import RegionRollupService
 
 class RegionListViewModel(QObject):
     items_loaded = Signal(list)
     error_occurred = Signal(str)
+    # 會員新增、移動或刪除使子樹人數改變時發出，可能來自背景執行緒 (例如匯入)
+    rollups_changed = Signal()
 
     def __init__(self, db_session, parent=None):
         super().__init__(parent)
@@ -12,6 +16,9 @@ class RegionListViewModel(QObject):
         self.current_search_term = None
         self.current_sort_column = None
         self.current_sort_order = Qt.AscendingOrder
+        self.rollup_service = RegionRollupService.for_session(db_session)
+        self.rollup_service.add_listener(self._on_rollups_changed)
+        self.member_rollups = {}
 
     def load_regions(self, search_term=None, sort_column=None, sort_order=None):
         try:
@@ -27,6 +34,7 @@ class RegionListViewModel(QObject):
                 sort_column=self.current_sort_column, 
                 sort_order=self.current_sort_order
             )
+            self.member_rollups = self.rollup_service.get_rollups()
             self.items_loaded.emit(regions)
         except Exception as e:
             self.error_occurred.emit(f"載入地區時發生錯誤: {e}")
@@ -42,6 +50,7 @@ class RegionListViewModel(QObject):
 
                 self.region_repo.delete(region)
                 self.session.commit()
+                notify_region_hierarchy_changed(self.session)
                 self.load_regions(search_term=self.current_search_term, sort_column=self.current_sort_column, sort_order=self.current_sort_order)
             else:
                 self.error_occurred.emit("找不到要刪除的地區。")
@@ -49,6 +58,16 @@ class RegionListViewModel(QObject):
             self.error_occurred.emit(f"刪除地區時發生錯誤: {e}")
             self.session.rollback()
                
+    def refresh_rollups(self):
+        """重新取得各地區子樹的會員人數 (快取已是最新，不會重新查詢整個資料庫)。"""
+        try:
+            self.member_rollups = self.rollup_service.get_rollups()
+        except Exception as e:
+            self.error_occurred.emit(f"計算地區會員數時發生錯誤: {e}")
+
+    def _on_rollups_changed(self):
+        self.rollups_changed.emit()
+
     def sort_regions(self, column_index, order):
         self.load_regions(sort_column=column_index, sort_order=order)
 
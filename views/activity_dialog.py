@@ -0,0 +1,122 @@
+from PySide6.QtCore import QDate, QTime
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QComboBox,
+    QDateEdit, QTimeEdit, QCheckBox
+)
+
+class ActivityDialog(QDialog):
+
+    def __init__(self, viewmodel, parent=None):
+        super().__init__(parent)
+        self.viewmodel = viewmodel
+        self.init_ui()
+        self.viewmodel.save_failed.connect(self._on_save_failed)
+        self.viewmodel.saved_successfully.connect(self.accept)
+        self.viewmodel.regions_loaded.connect(self.populate_regions)
+
+        self.setWindowTitle("編輯活動" if self.viewmodel.is_editing() else "新增活動")
+        self.name_input.setText(self.viewmodel.name)
+        self.description_input.setText(self.viewmodel.description)
+        activity_date = self.viewmodel.activity_date
+        self.date_input.setDate(QDate(activity_date.year, activity_date.month, activity_date.day))
+        self.start_input.setTime(QTime(*divmod(self.viewmodel.start_minute, 60)))
+        self.end_input.setTime(QTime(*divmod(min(self.viewmodel.end_minute, 24 * 60 - 1), 60)))
+        self._populate_recurrence(self.viewmodel.recurrence)
+        until = self.viewmodel.recurrence_until or activity_date
+        self.until_input.setDate(QDate(until.year, until.month, until.day))
+        self.until_check.setChecked(self.viewmodel.recurrence_until is not None)
+        self._update_until_enabled()
+        self.date_input.dateChanged.connect(lambda: self._populate_recurrence(self.recurrence_combo.currentData()))
+
+        self.viewmodel.load_regions()
+
+    def init_ui(self):
+        self.setMinimumWidth(380)
+        layout = QVBoxLayout(self)
+
+        self.name_input = QLineEdit()
+        self.description_input = QLineEdit()
+        self.date_input = QDateEdit()
+        self.date_input.setCalendarPopup(True)
+        self.date_input.setDisplayFormat("yyyy-MM-dd")
+        self.start_input = QTimeEdit()
+        self.start_input.setDisplayFormat("HH:mm")
+        self.end_input = QTimeEdit()
+        self.end_input.setDisplayFormat("HH:mm")
+        self.region_combo = QComboBox()
+        self.recurrence_combo = QComboBox()
+        self.until_check = QCheckBox("結束於")
+        self.until_input = QDateEdit()
+        self.until_input.setCalendarPopup(True)
+        self.until_input.setDisplayFormat("yyyy-MM-dd")
+
+        for label, widget in (("活動名稱:", self.name_input), ("說明:", self.description_input),
+                              ("日期:", self.date_input), ("開始時間:", self.start_input),
+                              ("結束時間:", self.end_input), ("主辦地區:", self.region_combo),
+                              ("重複:", self.recurrence_combo)):
+            row = QHBoxLayout()
+            row.addWidget(QLabel(label))
+            row.addWidget(widget)
+            layout.addLayout(row)
+        until_row = QHBoxLayout()
+        until_row.addWidget(self.until_check)
+        until_row.addWidget(self.until_input)
+        layout.addLayout(until_row)
+
+        button_layout = QHBoxLayout()
+        self.save_button = QPushButton("儲存")
+        self.cancel_button = QPushButton("取消")
+        button_layout.addStretch()
+        button_layout.addWidget(self.save_button)
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
+
+        self.save_button.clicked.connect(self._save_activity)
+        self.cancel_button.clicked.connect(self.reject)
+        self.recurrence_combo.currentIndexChanged.connect(self._update_until_enabled)
+        self.until_check.toggled.connect(self._update_until_enabled)
+
+    def _populate_recurrence(self, current_rule):
+        """依目前的日期重建重複選項；日期改變時盡量保留同一類規則 (例如每週)。"""
+        previous_index = self.recurrence_combo.currentIndex()
+        presets = self.viewmodel.recurrence_presets(self.date_input.date().toPython())
+        self.recurrence_combo.blockSignals(True)
+        self.recurrence_combo.clear()
+        for label, rule in presets:
+            self.recurrence_combo.addItem(label, rule)
+        index = self.recurrence_combo.findData(current_rule)
+        if index == -1:
+            index = previous_index if 0 <= previous_index < len(presets) else 0
+        self.recurrence_combo.setCurrentIndex(index)
+        self.recurrence_combo.blockSignals(False)
+        self._update_until_enabled()
+
+    def _update_until_enabled(self):
+        recurring = self.recurrence_combo.currentData() is not None
+        self.until_check.setEnabled(recurring)
+        self.until_input.setEnabled(recurring and self.until_check.isChecked())
+
+    def populate_regions(self, regions):
+        self.region_combo.clear()
+        self.region_combo.addItem("不限", None)
+        for region in regions:
+            self.region_combo.addItem("　" * region.depth + region.name, region.id)
+        if self.viewmodel.region_id:
+            index = self.region_combo.findData(self.viewmodel.region_id)
+            if index != -1:
+                self.region_combo.setCurrentIndex(index)
+
+    def _save_activity(self):
+        start, end = self.start_input.time(), self.end_input.time()
+        self.viewmodel.name = self.name_input.text()
+        self.viewmodel.description = self.description_input.text()
+        self.viewmodel.activity_date = self.date_input.date().toPython()
+        self.viewmodel.start_minute = start.hour() * 60 + start.minute()
+        self.viewmodel.end_minute = end.hour() * 60 + end.minute()
+        self.viewmodel.region_id = self.region_combo.currentData()
+        self.viewmodel.recurrence = self.recurrence_combo.currentData()
+        self.viewmodel.recurrence_until = self.until_input.date().toPython() if self.until_check.isChecked() else None
+        self.viewmodel.save()
+
+    def _on_save_failed(self, message):
+        QMessageBox.critical(self, "錯誤", message)
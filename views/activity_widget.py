@@ -0,0 +1,247 @@
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QTableWidget, QTableWidgetItem, QTableView, QAbstractItemView, QMessageBox, QSplitter,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton
+)
+from views.base_management_widget import BaseManagementWidget
+from views.activity_dialog import ActivityDialog
+from viewmodels.activity_dialog_viewmodel import ActivityDialogViewModel
+from services.recurrence import describe
+
+# 衝突訊息最多列出的筆數
+MAX_CONFLICTS_SHOWN = 10
+SOURCE_NAMES = {"duty": "排班", "activity": "活動"}
+
+
+class ActivityWidget(BaseManagementWidget):
+    """活動規劃分頁：上方為活動列表，下方為所選活動的參與者與批次指派。"""
+
+    def __init__(self, viewmodel, parent=None):
+        super().__init__(viewmodel, parent)
+        self._participant_count = 0
+        self.init_ui()
+        self.viewmodel.items_loaded.connect(self.display_items)
+        self.viewmodel.regions_loaded.connect(self.populate_region_filter)
+        self.viewmodel.positions_loaded.connect(self.populate_position_filter)
+        self.viewmodel.qualifications_loaded.connect(self.populate_qualification_filter)
+        self.viewmodel.participants_changed.connect(self._update_participant_count)
+        self.viewmodel.matching_counted.connect(self._update_matching_count)
+        self.viewmodel.conflicts_found.connect(self._show_conflicts)
+        self.viewmodel.attendance_recorded.connect(self._show_attendance)
+        self.viewmodel.error_occurred.connect(self._show_error_message)
+        self.viewmodel.load_filters()
+        for combo in (self.region_filter_combo, self.position_filter_combo, self.qualification_filter_combo):
+            combo.currentIndexChanged.connect(self._assign_filters_changed)
+        self._assign_filters_changed()
+
+    def init_ui(self):
+        self._init_base_ui()
+
+        self.table_widget = QTableWidget(self)
+        self.table_widget.setColumnCount(len(self._get_table_headers()))
+        self.table_widget.setHorizontalHeaderLabels(self._get_table_headers())
+        self.table_widget.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table_widget.setAlternatingRowColors(True)
+        self.table_widget.horizontalHeader().setStretchLastSection(True)
+        self.table_widget.verticalHeader().setVisible(False)
+        self.table_widget.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_widget.setSelectionMode(QAbstractItemView.SingleSelection)
+
+        participant_panel = QWidget(self)
+        participant_layout = QVBoxLayout(participant_panel)
+        participant_layout.setContentsMargins(0, 0, 0, 0)
+
+        assign_layout = QHBoxLayout()
+        self.region_filter_combo = QComboBox()
+        self.position_filter_combo = QComboBox()
+        self.qualification_filter_combo = QComboBox()
+        self.assign_button = QPushButton("批次指派")
+        self.matching_count_label = QLabel()
+        self.remove_button = QPushButton("移除選取")
+        self.remove_button.setObjectName("deleteButton")
+        self.attendance_button = QPushButton("記錄出席")
+        self.participant_count_label = QLabel()
+        assign_layout.addWidget(QLabel("地區:"))
+        assign_layout.addWidget(self.region_filter_combo)
+        assign_layout.addWidget(QLabel("職務:"))
+        assign_layout.addWidget(self.position_filter_combo)
+        assign_layout.addWidget(QLabel("資格:"))
+        assign_layout.addWidget(self.qualification_filter_combo)
+        assign_layout.addWidget(self.matching_count_label)
+        assign_layout.addWidget(self.assign_button)
+        assign_layout.addWidget(self.remove_button)
+        assign_layout.addWidget(self.attendance_button)
+        assign_layout.addStretch()
+        assign_layout.addWidget(self.participant_count_label)
+        participant_layout.addLayout(assign_layout)
+
+        # 參與者可能有數千人，使用 QTableView + model，只繪製看得到的列
+        self.participant_view = QTableView(self)
+        self.participant_view.setModel(self.viewmodel.participants)
+        self.participant_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.participant_view.setAlternatingRowColors(True)
+        self.participant_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.participant_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.participant_view.horizontalHeader().setStretchLastSection(True)
+        self.participant_view.verticalHeader().setVisible(False)
+        # 固定列高，捲動時不必逐列計算高度
+        self.participant_view.verticalHeader().setDefaultSectionSize(24)
+        participant_layout.addWidget(self.participant_view)
+
+        splitter = QSplitter(Qt.Vertical, self)
+        splitter.addWidget(self.table_widget)
+        splitter.addWidget(participant_panel)
+        splitter.setStretchFactor(1, 2)
+        self.main_layout.addWidget(splitter)
+
+        self.add_button.clicked.connect(self.open_add_dialog)
+        self.edit_button.clicked.connect(self.open_edit_dialog)
+        self.delete_button.clicked.connect(self._delete_selected_item)
+        self.search_input.textChanged.connect(self._filter_changed)
+        self.clear_search_button.clicked.connect(self._clear_search)
+        self.table_widget.itemSelectionChanged.connect(self._activity_selected)
+        self.assign_button.clicked.connect(self._assign_participants)
+        self.remove_button.clicked.connect(self._remove_participants)
+        self.attendance_button.clicked.connect(self._record_attendance)
+        self._update_participant_count(0)
+
+    def _get_window_title(self):
+        return "活動規劃"
+
+    def _get_search_placeholder(self):
+        return "搜尋活動名稱..."
+
+    def _get_table_headers(self):
+        return ["活動名稱", "日期", "時間", "重複", "主辦地區", "參與人數"]
+
+    def _get_status_bar_message(self):
+        return f"活動數: {len(self.items)} 筆"
+
+    def populate_region_filter(self, regions):
+        self.region_filter_combo.clear()
+        self.region_filter_combo.addItem("所有地區", None)
+        for region in regions:
+            self.region_filter_combo.addItem("　" * region.depth + region.name, region.id)
+
+    def populate_position_filter(self, positions):
+        self.position_filter_combo.clear()
+        self.position_filter_combo.addItem("所有職務", None)
+        for position in positions:
+            self.position_filter_combo.addItem(position.name, position.id)
+
+    def populate_qualification_filter(self, qualifications):
+        self.qualification_filter_combo.clear()
+        self.qualification_filter_combo.addItem("不限資格", 0)
+        for qualification in qualifications:
+            self.qualification_filter_combo.addItem(qualification.name, qualification.mask)
+
+    def _filter_changed(self):
+        self._load_items()
+
+    def _load_items(self):
+        self.viewmodel.load_activities(self.search_input.text())
+
+    def display_items(self, items):
+        selected_id = self.viewmodel.current_activity.id if self.viewmodel.current_activity else None
+        self.items = items
+        self.table_widget.blockSignals(True)
+        self.table_widget.setRowCount(len(items))
+        for row, activity in enumerate(items):
+            self._display_item_row(row, activity)
+            if activity.id == selected_id:
+                self.table_widget.selectRow(row)
+        self.table_widget.blockSignals(False)
+
+    def _display_item_row(self, row, activity):
+        time_text = f"{activity.start_minute // 60:02d}:{activity.start_minute % 60:02d}-" \
+                    f"{activity.end_minute // 60:02d}:{activity.end_minute % 60:02d}"
+        count = self.viewmodel.participant_counts.get(activity.id, 0)
+        self.table_widget.setItem(row, 0, QTableWidgetItem(activity.name))
+        self.table_widget.setItem(row, 1, QTableWidgetItem(activity.activity_date.isoformat()))
+        self.table_widget.setItem(row, 2, QTableWidgetItem(time_text))
+        self.table_widget.setItem(row, 3, QTableWidgetItem(describe(activity.recurrence) if activity.recurrence else ""))
+        self.table_widget.setItem(row, 4, QTableWidgetItem(activity.region.name if activity.region else ""))
+        self.table_widget.setItem(row, 5, QTableWidgetItem(str(count)))
+
+    def _selected_activity(self):
+        row = self.table_widget.currentRow()
+        return self.items[row] if 0 <= row < len(self.items) else None
+
+    def _activity_selected(self):
+        self.viewmodel.select_activity(self._selected_activity())
+
+    def _update_participant_count(self, count):
+        self._participant_count = count
+        self.participant_count_label.setText(f"參與者: {count} 人")
+        row = self.table_widget.currentRow()
+        if 0 <= row < len(self.items):
+            self.table_widget.setItem(row, 5, QTableWidgetItem(str(count)))
+
+    def _assign_filters_changed(self):
+        self.viewmodel.count_matching(self.region_filter_combo.currentData(),
+                                      self.position_filter_combo.currentData(),
+                                      self.qualification_filter_combo.currentData() or 0)
+
+    def _update_matching_count(self, count):
+        self.matching_count_label.setText(f"符合 {count} 人" if count >= 0 else "")
+
+    def _assign_participants(self):
+        self.viewmodel.assign_matching(self.region_filter_combo.currentData(),
+                                       self.position_filter_combo.currentData(),
+                                       self.qualification_filter_combo.currentData() or 0)
+
+    def _remove_participants(self):
+        rows = sorted({index.row() for index in self.participant_view.selectionModel().selectedRows()})
+        if not rows:
+            return
+        reply = QMessageBox.question(self, '確認移除', f'是否確定要移除選取的 {len(rows)} 位參與者?',
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.viewmodel.remove_participants(rows)
+
+    def _record_attendance(self):
+        rows = sorted({index.row() for index in self.participant_view.selectionModel().selectedRows()})
+        reply = QMessageBox.question(self, '記錄出席', f'是否將選取的 {len(rows)} 位參與者記為最近一次舉行的出席者?',
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.viewmodel.record_attendance(rows)
+
+    def _show_attendance(self, day, attended, expected):
+        QMessageBox.information(self, "記錄出席", f"{day} 出席 {attended} / {expected} 人")
+
+    def _show_conflicts(self, conflicts):
+        names = {row[0]: row[1] for row in self.viewmodel.participants.rows}
+        lines = [
+            f"{names.get(conflict.member_id, conflict.member_id)}: "
+            f"{SOURCE_NAMES.get(conflict.first.source, conflict.first.source)} / "
+            f"{SOURCE_NAMES.get(conflict.second.source, conflict.second.source)}"
+            for conflict in conflicts[:MAX_CONFLICTS_SHOWN]
+        ]
+        if len(conflicts) > MAX_CONFLICTS_SHOWN:
+            lines.append(f"... 共 {len(conflicts)} 筆")
+        QMessageBox.warning(self, "時段衝突", "以下參與者在活動時段 (重複活動為近期各次) 已有其他排班或活動:\n" + "\n".join(lines))
+
+    def _show_error_message(self, message):
+        QMessageBox.critical(self, "錯誤", message)
+
+    def _delete_selected_item(self):
+        activity = self._selected_activity()
+        if activity is None:
+            return
+        reply = QMessageBox.question(self, '確認刪除', f'是否確定要刪除 "{activity.name}" 及其所有參與者?',
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.viewmodel.delete_activity(activity.id)
+
+    def open_add_dialog(self):
+        dialog_viewmodel = ActivityDialogViewModel(db_session=self.viewmodel.session)
+        dialog_viewmodel.saved_successfully.connect(self._load_items)
+        ActivityDialog(dialog_viewmodel, self).exec()
+
+    def open_edit_dialog(self):
+        activity = self._selected_activity()
+        if activity is None:
+            return
+        dialog_viewmodel = ActivityDialogViewModel(db_session=self.viewmodel.session, activity_data=activity)
+        dialog_viewmodel.saved_successfully.connect(self._load_items)
+        ActivityDialog(dialog_viewmodel, self).exec()
@@ -1,5 +1,5 @@
 import logging
-from PySide6.QtCore import QSettings, Qt
+from PySide6.QtCore import QSettings, Qt, QTimer, Signal
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import (
     QMainWindow,
@@ -7,20 +7,18 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
     QTabWidget,
+    QLabel,
 )
 
-from views.member_list_widget import MemberListWidget
-from viewmodels.member_list_viewmodel import MemberListViewModel
-from .region_list_widget import RegionListWidget
-from viewmodels.region_list_viewmodel import RegionListViewModel
-from .position_list_widget import PositionListWidget
-from viewmodels.position_list_viewmodel import PositionListViewModel
-from views.import_widget import ImportWidget
-from viewmodels.import_viewmodel import ImportViewModel
+# 各分頁的 Widget 與 ViewModel 模組 (以及匯入分頁所需的 pandas) 都延後到
+# 分頁第一次被開啟時才匯入，以縮短啟動時間。
 
 logger = logging.getLogger(__name__)
 
 class MainWindow(QMainWindow):
+    # 視窗顯示後，第一個分頁建立完成並載入資料時發出
+    initial_tab_loaded = Signal()
+
     def __init__(self, viewmodel):
         super().__init__()
         self.setWindowTitle("SGI企劃管理系統")
@@ -29,40 +27,137 @@ class MainWindow(QMainWindow):
         self._load_settings()
         self.apply_stylesheet()
 
+        # 尚未建立的分頁: placeholder widget -> 建立真正分頁內容的函式
+        self._tab_builders = {}
+        # 視窗第一次顯示前不建立任何分頁，讓視窗能先出現
+        self._tabs_deferred = True
+
         # Create Tab Widget as the central widget
         self.tab_widget = QTabWidget()
         self.setCentralWidget(self.tab_widget)
         self.tab_widget.setTabsClosable(True)
-        self.tab_widget.tabCloseRequested.connect(self.tab_widget.removeTab)
+        self.tab_widget.tabCloseRequested.connect(self._close_tab)
         self.tab_widget.currentChanged.connect(self._on_tab_changed) # Add this line
 
         # Create the first tab, which contains the original list view
-        self.item_list_tab = QWidget()
-        self.item_list_layout = QVBoxLayout(self.item_list_tab)
-        self.item_list_view = QListView()
-        self.item_list_layout.addWidget(self.item_list_view)
-        self.tab_widget.addTab(self.item_list_tab, "項目列表")
+        self._add_deferred_tab("項目列表", self._build_item_list_tab)
 
         # Create Member List Tab
-        self.member_list_viewmodel = MemberListViewModel(self.viewmodel.session) # Pass db_session
-        self.member_list_widget = MemberListWidget(self.member_list_viewmodel)
-        self.tab_widget.addTab(self.member_list_widget, "會員列表")
-        self.tab_widget.setCurrentWidget(self.member_list_widget)
-        self.member_list_widget._load_items() # Initial load of members after connection
+        member_placeholder = self._add_deferred_tab("會員列表", self._build_member_list_tab)
+        self.tab_widget.setCurrentWidget(member_placeholder)
+
+        # Create Activity Planning Tab
+        self._add_deferred_tab("活動規劃", self._build_activity_tab)
 
         # Create a second placeholder tab
         self.placeholder_tab = QWidget() # Define the placeholder tab
         self.tab_widget.addTab(self.placeholder_tab, "分頁二")
 
-        # Bind the view to the viewmodel
-        self.item_list_view.setModel(self.viewmodel.items)
-
         # Create the menu bar
         self._create_menu_bar()
 
         # Create Status Bar
         self.statusBar().showMessage("準備就緒")
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._tabs_deferred:
+            self._tabs_deferred = False
+            # 視窗已完成第一次繪製，接著才建立目前分頁並載入資料
+            QTimer.singleShot(0, self._build_initial_tab)
+
+    def attach_watchdog(self, watchdog):
+        """讓 GUI 卡頓監測器取得目前分頁名稱；除錯模式下在狀態列顯示卡頓次數。
+
+        Args:
+            watchdog (GuiStallWatchdog): 卡頓監測器。
+        """
+        self.watchdog = watchdog
+        self._update_watchdog_tab(self.tab_widget.currentIndex())
+        self.tab_widget.currentChanged.connect(self._update_watchdog_tab)
+        if watchdog.debug:
+            self.stall_label = QLabel("卡頓: 0")
+            self.statusBar().addPermanentWidget(self.stall_label)
+            watchdog.stall_detected.connect(
+                lambda elapsed_ms, count: self.stall_label.setText(f"卡頓: {count} (最近 {elapsed_ms:.0f} ms)")
+            )
+
+    def _update_watchdog_tab(self, index):
+        # 監測執行緒不能存取 widget，因此在 GUI 執行緒中先將分頁名稱存成字串
+        self.watchdog.active_tab = self.tab_widget.tabText(index) if index >= 0 else None
+
+    def _build_initial_tab(self):
+        self._on_tab_changed(self.tab_widget.currentIndex())
+        self.initial_tab_loaded.emit()
+
+    def _add_deferred_tab(self, tab_name, builder):
+        """新增一個在第一次被切換到時才建立內容的分頁。
+
+        Args:
+            tab_name (str): 分頁名稱。
+            builder (Callable[[], QWidget]): 建立分頁內容的函式。
+
+        Returns:
+            QWidget: 暫時佔位的 widget。
+        """
+        placeholder = QLabel("載入中...")
+        placeholder.setAlignment(Qt.AlignCenter)
+        self._tab_builders[placeholder] = builder
+        self.tab_widget.addTab(placeholder, tab_name)
+        return placeholder
+
+    def _build_deferred_tab(self, index):
+        """若指定位置的分頁尚未建立，則建立它並取代佔位 widget。"""
+        placeholder = self.tab_widget.widget(index)
+        builder = self._tab_builders.pop(placeholder, None)
+        if builder is None:
+            return placeholder
+
+        tab_name = self.tab_widget.tabText(index)
+        logger.debug(f"Building tab '{tab_name}' on first activation.")
+        widget = builder()
+
+        self.tab_widget.blockSignals(True)
+        self.tab_widget.removeTab(index)
+        self.tab_widget.insertTab(index, widget, tab_name)
+        self.tab_widget.setCurrentIndex(index)
+        self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+        return widget
+
+    def _close_tab(self, index):
+        self._tab_builders.pop(self.tab_widget.widget(index), None)
+        self.tab_widget.removeTab(index)
+
+    def _build_item_list_tab(self):
+        self.item_list_tab = QWidget()
+        self.item_list_layout = QVBoxLayout(self.item_list_tab)
+        self.item_list_view = QListView()
+        self.item_list_layout.addWidget(self.item_list_view)
+
+        # Bind the view to the viewmodel
+        self.viewmodel.load_items()
+        self.item_list_view.setModel(self.viewmodel.items)
+        return self.item_list_tab
+
+    def _build_member_list_tab(self):
+        from views.member_list_widget import MemberListWidget
+        from viewmodels.member_list_viewmodel import MemberListViewModel
+
+        self.member_list_viewmodel = MemberListViewModel(self.viewmodel.session) # Pass db_session
+        self.member_list_widget = MemberListWidget(self.member_list_viewmodel)
+        self.member_list_widget._load_items() # Initial load of members after connection
+        return self.member_list_widget
+
+    def _build_activity_tab(self):
+        from views.activity_widget import ActivityWidget
+        from viewmodels.activity_viewmodel import ActivityViewModel
+
+        self.activity_viewmodel = ActivityViewModel(self.viewmodel.session)
+        self.activity_widget = ActivityWidget(self.activity_viewmodel)
+        self.activity_widget._load_items()
+        return self.activity_widget
+
     def _load_settings(self):
         self.settings = QSettings("SgiPlan", "SgiPlan2")
         geometry = self.settings.value("geometry")
@@ -105,15 +200,22 @@ class MainWindow(QMainWindow):
         help_menu.addAction(about_action)
 
     def _open_region_management_tab(self):
-        # [修改] 直接呼叫通用方法
+        from views.region_list_widget import RegionListWidget
+        from viewmodels.region_list_viewmodel import RegionListViewModel
         self._open_management_tab(RegionListWidget, RegionListViewModel, "地區管理")
 
     def _open_position_management_tab(self):
-        # [修改] 直接呼叫通用方法
+        from views.position_list_widget import PositionListWidget
+        from viewmodels.position_list_viewmodel import PositionListViewModel
         self._open_management_tab(PositionListWidget, PositionListViewModel, "職務管理")
         
     def open_import_tab(self):
-        """開啟或切換到資料匯入分頁。"""
+        """開啟或切換到資料匯入分頁。
+
+        pandas/openpyxl 只會在此時 (第一次開啟匯入分頁) 才被載入。
+        """
+        from views.import_widget import ImportWidget
+        from viewmodels.import_viewmodel import ImportViewModel
         self._open_management_tab(ImportWidget, ImportViewModel, "資料匯入")
 
     # views/main_window.py
@@ -163,7 +265,9 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage("準備就緒") # Fallback
 
     def _on_tab_changed(self, index):
-        current_widget = self.tab_widget.widget(index)
+        if index < 0 or self._tabs_deferred:
+            return
+        current_widget = self._build_deferred_tab(index)
         if hasattr(current_widget, '_get_status_bar_message'):
             self.statusBar().showMessage(current_widget._get_status_bar_message())
         else:
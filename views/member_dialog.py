@@ -40,6 +40,7 @@ class MemberDialog(QDialog):
         self.viewmodel.positions_loaded.connect(self._update_positions_view)
         self.viewmodel.assigned_positions_changed.connect(self._update_positions_view)
         self.viewmodel.departments_loaded.connect(self.populate_departments)
+        self.viewmodel.qualifications_loaded.connect(self.populate_qualifications)
 
         # 如果是編輯模式，從 ViewModel 載入資料
         if self.viewmodel.is_editing():
@@ -81,6 +82,12 @@ class MemberDialog(QDialog):
         positions_group_box = self._create_positions_group_box()
         main_layout.addWidget(positions_group_box)
 
+        qualifications_group_box = QGroupBox("資格 (勾選具備的資格)")
+        qualifications_layout = QVBoxLayout()
+        qualifications_layout.addWidget(self.qualifications_list)
+        qualifications_group_box.setLayout(qualifications_layout)
+        main_layout.addWidget(qualifications_group_box)
+
         main_layout.addWidget(self.button_box)
         self.setLayout(main_layout)
 
@@ -100,6 +107,10 @@ class MemberDialog(QDialog):
         self.add_position_button = QPushButton(">>")
         self.remove_position_button = QPushButton("<<")
 
+        # 資格相關元件
+        self.qualifications_list = QListWidget()
+        self.qualifications_list.setMaximumHeight(120)
+
 
     def _create_positions_group_box(self) -> QGroupBox:
         """建立並返回職位管理的 GroupBox。"""
@@ -136,6 +147,7 @@ class MemberDialog(QDialog):
         self.viewmodel.is_schedulable = self.is_schedulable_checkbox.isChecked()
         self.viewmodel.region_id = self.region_combo.currentData()
         self.viewmodel.department_id = self.department_combobox.currentData()
+        self.viewmodel.qualification_mask = self._checked_qualification_mask()
         # 職位分配的變更已經在 ViewModel 中處理，只需呼叫 save
         self.viewmodel.save()
 
@@ -165,6 +177,25 @@ class MemberDialog(QDialog):
             if index != -1:
                 self.department_combobox.setCurrentIndex(index)
 
+    def populate_qualifications(self, qualifications: list[tuple[int, str, bool]]):
+        """當 ViewModel 載入資格目錄後，填充可勾選的資格列表。"""
+        self.qualifications_list.clear()
+        for mask, name, checked in qualifications:
+            item = QListWidgetItem(name)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+            item.setData(Qt.ItemDataRole.UserRole, mask)
+            self.qualifications_list.addItem(item)
+
+    def _checked_qualification_mask(self) -> int:
+        """將勾選的資格合併為遮罩。"""
+        mask = 0
+        for row in range(self.qualifications_list.count()):
+            item = self.qualifications_list.item(row)
+            if item.checkState() == Qt.CheckState.Checked:
+                mask |= item.data(Qt.ItemDataRole.UserRole)
+        return mask
+
     def _update_positions_view(self):
         """更新可用和已分配的職位列表。"""
         # 獲取當前已分配職位的 ID 集合
@@ -211,4 +242,5 @@ class MemberDialog(QDialog):
         self.viewmodel.load_regions()
         self.viewmodel.load_positions()
         self.viewmodel.load_departments()
+        self.viewmodel.load_qualifications()
 
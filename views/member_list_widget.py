@@ -38,8 +38,9 @@ class MemberListWidget(BaseListWidget):
 
     def populate_region_filter(self, regions):
         self.region_filter_combo.addItem("所有地區", -1)
+        # 地區依樹狀順序排列並依深度縮排，選擇上層地區時會包含其所有子地區的會員
         for region in regions:
-            self.region_filter_combo.addItem(region.name, region.id)
+            self.region_filter_combo.addItem("　" * region.depth + region.name, region.id)
 
     def _filter_changed(self):
         self._load_items()
@@ -5,14 +5,17 @@ from PySide6.QtCore import Qt
 from .base_management_widget import BaseManagementWidget
 from views.region_dialog import RegionDialog
 from viewmodels.region_dialog_viewmodel import RegionDialogViewModel
+from services.region_rollup_service import EMPTY_ROLLUP
 
 class RegionListWidget(BaseManagementWidget):
     def __init__(self, viewmodel, parent=None):
         super().__init__(viewmodel, parent)
+        self._region_items = {}  # 映射: region.id -> QTreeWidgetItem
         self.init_ui()
 
         self.viewmodel.items_loaded.connect(self.display_items)
         self.viewmodel.error_occurred.connect(self._show_error_message)
+        self.viewmodel.rollups_changed.connect(self._update_rollup_columns)
 
     def init_ui(self):
         """建立樹狀檢視的 UI 介面。"""
@@ -42,7 +45,7 @@ class RegionListWidget(BaseManagementWidget):
         return "搜尋地區名稱..."
 
     def _get_table_headers(self):
-        return ["地區名稱", "ID"]
+        return ["地區名稱", "ID", "會員數", "可排班"]
 
     def _get_status_bar_message(self):
         return "地區列表已載入"
@@ -80,12 +83,15 @@ class RegionListWidget(BaseManagementWidget):
 
         region_items = {}  # 映射: region.id -> QTreeWidgetItem
         root_items = []
+        rollups = self.viewmodel.member_rollups
 
         # 第一輪：建立所有 QTreeWidgetItem
         for region in items:
-            tree_item = QTreeWidgetItem([region.name, str(region.id)])
+            rollup = rollups.get(region.id, EMPTY_ROLLUP)
+            tree_item = QTreeWidgetItem([region.name, str(region.id), str(rollup.members), str(rollup.schedulable)])
             tree_item.setData(0, Qt.UserRole, region)  # 將 region 物件儲存在項目中
             region_items[region.id] = tree_item
+        self._region_items = region_items
 
         # 第二輪：建立父子關係
         for region in items:
@@ -99,6 +105,15 @@ class RegionListWidget(BaseManagementWidget):
         self.tree_widget.expandAll()
         self.tree_widget.resizeColumnToContents(0)
 
+    def _update_rollup_columns(self):
+        """會員人數變動時，只更新已顯示項目的人數欄位，不重建整棵樹。"""
+        self.viewmodel.refresh_rollups()
+        rollups = self.viewmodel.member_rollups
+        for region_id, tree_item in self._region_items.items():
+            rollup = rollups.get(region_id, EMPTY_ROLLUP)
+            tree_item.setText(2, str(rollup.members))
+            tree_item.setText(3, str(rollup.schedulable))
+
     def _get_delete_confirmation_text(self, item) -> str:
         """取得刪除地區時的確認訊息文字。"""
         return f'是否確定要刪除地區 "{self._get_item_name(item)}"?\n\n注意：只有當地區底下沒有子地區時才能刪除。'